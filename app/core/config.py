@@ -1,8 +1,10 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
+EngineName = Literal["openai-whisper", "faster-whisper", "stub"]
+
 DEFAULT_CORS_ALLOWED_ORIGINS = [
     "http://localhost:8000",
     "http://127.0.0.1:8000",
@@ -39,13 +41,99 @@ class Settings(BaseSettings):
 
     # Whisper configuration
     whisper_model_cache_dir: str = "./.whisper_models"
-
-    # VerbAIze specific settings (speedup features)
+    # Inference engine; per-model overrides take precedence when set and a
+    # request may still pick its own engine.
+    whisper_engine: EngineName = "openai-whisper"
+    whisper_engine_small: EngineName | None = None
+    whisper_engine_medium: EngineName | None = None
+    whisper_engine_turbo: EngineName | None = None
+
+    # faster-whisper (CTranslate2) options
+    faster_whisper_compute_type: str = "int8"  # int8, int8_float16, float16, ...
+    faster_whisper_cpu_threads: int = 0  # 0 = inference worker thread share
+    faster_whisper_num_workers: int = 0  # 0 = one per inference worker slot
+
+    # Stub engine — the "stub" engine loads no model and answers with
+    # placeholder segments after sleeping stub_engine_rtf seconds per second
+    # of audio, so the service can be load-tested without a GPU or model
+    # downloads. Requests for it are rejected unless enabled.
+    stub_engine_enabled: bool = False
+    stub_engine_rtf: float = 0.05
+
+    # Speedup — speech is time-compressed by the model's factor, keeping its
+    # pitch, before inference; less audio means proportionally less encoder
+    # and decoder work. Segment times are reported at the original speed.
     enable_speedup: bool = False
     speed_small: float = 1.25
     speed_medium: float = 1.5
     speed_turbo: float = 1.25
 
+    # Inference scheduling — each model gets its own pool of worker slots and
+    # a bounded admission queue; requests beyond it are rejected with 503.
+    inference_workers_small: int = 1
+    inference_workers_medium: int = 1
+    inference_workers_turbo: int = 1
+    inference_torch_threads: int = 0  # 0 = split CPU cores across workers
+    inference_max_queue_size: int = 8
+    inference_retry_after_seconds: int = 5
+    # "process" loads models into long-lived worker processes (one per worker
+    # slot) instead of the API process, isolating crashes and the GIL.
+    inference_mode: Literal["thread", "process"] = "thread"
+
+    # Model residency — loaded models are estimated against this budget and
+    # the least recently used idle ones are unloaded to make room.
+    model_memory_budget_mb: int = 0  # 0 = unlimited
+
+    # Long-form mode — recordings longer than longform_min_seconds are cut at
+    # pauses into windows of at most longform_window_seconds, transcribed
+    # concurrently on the model's worker slots and stitched back together.
+    longform_enabled: bool = True
+    longform_min_seconds: int = 120
+    longform_window_seconds: float = 30.0
+    longform_overlap_seconds: float = 1.0
+    longform_search_seconds: float = 5.0
+
+    # Voice activity detection — decoded audio is reduced to its speech
+    # before inference; silences longer than vad_min_silence_ms are cut out
+    # and clips without speech never reach the model. "silero" uses the
+    # model-based detector bundled with faster-whisper. Off by default: the
+    # energy threshold is absolute, so quiet recordings would lose speech.
+    vad_enabled: bool = False
+    vad_backend: Literal["energy", "silero"] = "energy"
+    vad_threshold_db: float = -45.0  # energy backend, frame level in dBFS
+    vad_silero_threshold: float = 0.5  # silero backend, speech probability
+    vad_min_speech_ms: int = 250
+    vad_min_silence_ms: int = 2000
+    vad_padding_ms: int = 300
+
+    # Micro-batching — concurrent clips of up to 30 s for the same model are
+    # collected for a few milliseconds and decoded in a single batch.
+    enable_batching: bool = False
+    batch_max_size: int = 8
+    batch_window_ms: int = 10
+
+    # Result cache — finished transcriptions keyed by audio content hash,
+    # model, action, engine and decode options. The disk tier is enabled by
+    # setting a directory; entries of both tiers expire after the TTL.
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 256
+    result_cache_ttl_seconds: int = 7 * 24 * 3600  # 0 = never expire
+    result_cache_dir: str | None = None
+    result_cache_disk_max_bytes: int = 256 * 1024 * 1024
+
+    # Job store — background transcription and model preparation jobs.
+    # "sqlite" keeps them in a WAL-mode database at job_store_path, so every
+    # uvicorn worker on the host can report any job and unfinished jobs are
+    # resumed after a restart; "memory" keeps them in this process only.
+    job_store_backend: Literal["memory", "sqlite"] = "memory"
+    job_store_path: str = "./.verbalaize/jobs.sqlite3"
+    # Background jobs running at once; the rest wait in a priority queue
+    # (interactive before batch) where clients take turns.
+    job_max_concurrent: int = 2
+    # On shutdown, running jobs get this long to finish; the rest are left
+    # to the job store's recovery (sqlite) when a worker starts again.
+    job_shutdown_grace_seconds: float = 30.0
+
     # File upload settings
     max_file_size: int = 100 * 1024 * 1024  # 100MB
     allowed_file_types: list = [
@@ -64,7 +152,33 @@ class Settings(BaseSettings):
 
     # Real-time transcription settings
     realtime_chunk_duration: int = 5  # seconds
-    realtime_sample_rate: int = 16000
+    # Live audio is decoded as a rolling window, re-decoded as it grows;
+    # words are committed once two consecutive passes agree on them. Past
+    # realtime_trim_seconds the window is cut at the end of the last
+    # committed segment, and past realtime_max_window_seconds everything
+    # still pending is committed as heard. The committed text preceding the
+    # window (at most realtime_prompt_chars) is passed as the prompt.
+    realtime_trim_seconds: float = 12.0
+    realtime_max_window_seconds: float = 25.0
+    realtime_prompt_chars: int = 200
+    # Decoded audio waiting while the model is busy; beyond this the oldest
+    # is dropped and the client is told it is being outrun
+    realtime_max_backlog_seconds: float = 10.0
+    # Raw PCM clients send small frames; their audio is handed to inference
+    # once this much has arrived (WebM clients: every two recorder slices)
+    realtime_pcm_step_seconds: float = 2.0
+
+    # Metrics — counters and histograms in the Prometheus text format at
+    # /metrics. With VBZ_APP_SECRET set the endpoint requires the secret like
+    # any other, unless metrics_public exempts it for a scraper.
+    metrics_enabled: bool = True
+    metrics_public: bool = False
+
+    # Request tracing — traced requests record the time spent in each stage
+    # (upload read, temp-file write, model load, decode, mel, encoder,
+    # decoder, ...), return it as "timings" and log it as one JSON line.
+    # Clients opt in per request; this traces every request.
+    request_tracing: bool = False
 
     # Security — set VBZ_APP_SECRET to enable token validation.
     # When None, the middleware is disabled (Docker / web deployments).
@@ -86,6 +200,15 @@ class Settings(BaseSettings):
 
         raise ValueError("Invalid VBZ_CORS_ALLOWED_ORIGINS value")
 
+    @model_validator(mode="after")
+    def check_longform_windows(self):
+        if self.longform_overlap_seconds >= self.longform_window_seconds:
+            raise ValueError(
+                "VBZ_LONGFORM_OVERLAP_SECONDS must be shorter than"
+                " VBZ_LONGFORM_WINDOW_SECONDS"
+            )
+        return self
+
     @property
     def resolved_cors_allowed_origins(self) -> list[str]:
         origins = list(DEFAULT_CORS_ALLOWED_ORIGINS)
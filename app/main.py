@@ -2,13 +2,17 @@ import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.middleware.token import AppSecretMiddleware
-from app.routes import models, transcription
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
+from app.routes import models, system, transcription
+from app.services.job_scheduler import job_scheduler
+from app.services.job_store import flush_store_writes, job_store
+from app.services.metrics import CONTENT_TYPE, JOBS, registry
 from app.schemas.transcription import ModelType
 from app.services.whisper_service import get_whisper_service
 
@@ -27,20 +31,30 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Preload models on startup to avoid first-request delays."""
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
+    whisper_service = get_whisper_service()
     if settings.disable_startup_preload:
         logger.info("Startup preload disabled by configuration")
-        yield
-        return
+    else:
+        try:
+            logger.info("Preloading Whisper models...")
+            await whisper_service._get_model(ModelType.TURBO)
+            logger.info("Models preloaded successfully - ready for transcription")
+        except Exception as e:
+            logger.warning(f"Model preload warning: {str(e)}")
+            logger.info("Models will be loaded on first use")
+
+    # Jobs left unfinished by a worker that stopped are taken over here
+    await transcription.recover_transcription_jobs()
+    await models.recover_model_jobs()
 
     try:
-        logger.info("Preloading Whisper models...")
-        whisper_service = get_whisper_service()
-        await whisper_service._get_model(ModelType.TURBO)
-        logger.info("Models preloaded successfully - ready for transcription")
-    except Exception as e:
-        logger.warning(f"Model preload warning: {str(e)}")
-        logger.info("Models will be loaded on first use")
-    yield
+        yield
+    finally:
+        await job_scheduler.shutdown()
+        await models.wait_for_model_jobs()
+        whisper_service.shutdown()
+        flush_store_writes()
+        job_store.close()
 
 
 # Create FastAPI application
@@ -54,23 +68,35 @@ app = FastAPI(
 
 # Secret token middleware (desktop mode only — no-op when VBZ_APP_SECRET is unset)
 if settings.app_secret:
-    app.add_middleware(AppSecretMiddleware, secret=settings.app_secret)
+    app.add_middleware(
+        AppSecretMiddleware,
+        secret=settings.app_secret,
+        exempt_paths=("/metrics",) if settings.metrics_public else (),
+    )
     logger.info("AppSecretMiddleware enabled")
 else:
     logger.info("AppSecretMiddleware disabled (VBZ_APP_SECRET not set)")
 
+# Abort oversized uploads while they stream in instead of after buffering them
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_file_size=settings.max_file_size,
+    path_prefixes=("/api/v1/transcribe/upload",),
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.resolved_cors_allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "X-App-Secret"],
 )
 
 # Include routers
 app.include_router(transcription.router, prefix="/api")
 app.include_router(models.router, prefix="/api")
+app.include_router(system.router, prefix="/api")
 
 
 @app.get("/health")
@@ -97,6 +123,16 @@ async def health_check():
     return {"status": "healthy", "service": "verbalaize-api"}
 
 
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        # Job counts come from the store, shared by every worker on the host
+        JOBS.replace(job_store.count_by_status())
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 # Mount static files for frontend (after registering all API routes)
 static_files_path = Path(__file__).parent.parent / "frontend/dist"
 
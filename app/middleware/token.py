@@ -6,7 +6,8 @@ How it works:
 - WebSocket connections must include the query param:  ?secret=<token>
   (browsers don't support custom headers on WebSocket upgrades)
 - Uses hmac.compare_digest to prevent timing attacks.
-- Health and docs endpoints are always exempt.
+- Health and docs endpoints are always exempt; ``exempt_paths`` adds more
+  (e.g. /metrics when VBZ_METRICS_PUBLIC is set).
 - When app_secret is None the middleware is a no-op (Docker / web mode).
 """
 
@@ -29,9 +30,12 @@ EXEMPT_PATHS = {
 
 
 class AppSecretMiddleware:
-    def __init__(self, app: ASGIApp, secret: str) -> None:
+    def __init__(
+        self, app: ASGIApp, secret: str, exempt_paths: tuple[str, ...] = ()
+    ) -> None:
         self.app = app
         self._secret = secret.encode()
+        self._exempt_paths = EXEMPT_PATHS | set(exempt_paths)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] not in ("http", "websocket"):
@@ -40,7 +44,7 @@ class AppSecretMiddleware:
 
         path: str = scope.get("path", "")
 
-        if path in EXEMPT_PATHS:
+        if path in self._exempt_paths:
             await self.app(scope, receive, send)
             return
 
@@ -0,0 +1,100 @@
+"""
+UploadSizeLimitMiddleware — rejects oversized upload bodies while they stream in.
+
+How it works:
+- Requests to the upload paths with a Content-Length above the limit are
+  answered with 413 before any of the body is read.
+- Otherwise the body is counted as Starlette's multipart parser pulls it
+  (file parts are spooled to disk there), and the request is aborted with
+  413 as soon as the count passes the limit.
+- The limit is the configured file size plus a small allowance for the
+  multipart boundaries and form fields.
+- The time from the first body read to the last is left in the request
+  state as ``upload_read_seconds`` for request traces.
+- Every body byte read is added to the upload bytes metric.
+"""
+
+import logging
+import time
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import UPLOAD_RECEIVED_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Room for multipart boundaries, part headers and the small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def upload_limit_detail(max_file_size: int) -> str:
+    return f"File size exceeds the {max_file_size // (1024 * 1024)} MB limit"
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_file_size: int,
+        path_prefixes: tuple[str, ...],
+    ) -> None:
+        self.app = app
+        self._max_file_size = max_file_size
+        self._max_body_size = max_file_size + MULTIPART_OVERHEAD_BYTES
+        self._path_prefixes = path_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope.get("path", "").startswith(
+            self._path_prefixes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > self._max_body_size:
+            logger.warning(
+                "Rejected upload of %d bytes to %s", content_length, scope["path"]
+            )
+            response = JSONResponse(
+                {"detail": upload_limit_detail(self._max_file_size)},
+                status_code=413,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+        started: float | None = None
+
+        async def limited_receive() -> Message:
+            nonlocal received, started
+            if started is None:
+                started = time.perf_counter()
+            message = await receive()
+            if message["type"] == "http.request":
+                body_size = len(message.get("body", b""))
+                received += body_size
+                UPLOAD_RECEIVED_BYTES.inc(body_size)
+                if not message.get("more_body", False):
+                    scope.setdefault("state", {})["upload_read_seconds"] = (
+                        time.perf_counter() - started
+                    )
+                if received > self._max_body_size:
+                    # Raised inside body parsing, FastAPI turns it into a 413 response
+                    raise HTTPException(
+                        status_code=413,
+                        detail=upload_limit_detail(self._max_file_size),
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _content_length(self, scope: Scope) -> int | None:
+        for name, value in scope.get("headers", []):
+            if name.lower() == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
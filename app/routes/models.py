@@ -4,33 +4,42 @@ import time
 import uuid
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
+from app.core.config import settings
 from app.schemas.transcription import (
+    EngineType,
     ModelListResponse,
     ModelPreparationJobAccepted,
     ModelPreparationJobStatus,
     ModelPreparationRequest,
+    ModelType,
 )
+from app.services.job_events import job_events
+from app.services.job_store import WORKER_ID, job_store, store_read, store_write
 from app.services.whisper_service import whisper_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1/models", tags=["models"])
 
-model_jobs: dict[str, dict] = {}
+_JOB_KIND = "model"
 _JOB_TTL_SECONDS = 3600
+_CLEANUP_INTERVAL_SECONDS = 30
+_last_cleanup = 0.0
+_REMOTE_JOB_POLL_SECONDS = 1.0
+# The event loop only keeps weak references to tasks
+_running_jobs: set[asyncio.Task] = set()
 
 
-def _cleanup_expired_jobs() -> None:
+async def _cleanup_expired_jobs() -> None:
+    global _last_cleanup
     now = time.time()
-    expired = [
-        job_id
-        for job_id, job in model_jobs.items()
-        if now - job.get("created_at", now) > _JOB_TTL_SECONDS
-    ]
+    if now - _last_cleanup < _CLEANUP_INTERVAL_SECONDS:
+        return
+    _last_cleanup = now
 
-    for job_id in expired:
-        model_jobs.pop(job_id, None)
+    await store_write(job_store.purge_expired, _JOB_KIND, now - _JOB_TTL_SECONDS)
 
 
 @router.get("", response_model=ModelListResponse)
@@ -40,19 +49,24 @@ async def list_models():
 
 @router.post("/prepare", response_model=ModelPreparationJobAccepted)
 async def prepare_model(request: ModelPreparationRequest):
-    _cleanup_expired_jobs()
+    await _cleanup_expired_jobs()
 
     job_id = str(uuid.uuid4())
-    model_jobs[job_id] = {
-        "job_id": job_id,
-        "model": request.model,
-        "status": "queued",
-        "stage": "checking_cache",
-        "error": None,
-        "created_at": time.time(),
-    }
+    await store_write(
+        job_store.create,
+        {
+            "job_id": job_id,
+            "kind": _JOB_KIND,
+            "model": request.model.value,
+            "engine": request.engine.value if request.engine else None,
+            "status": "queued",
+            "stage": "checking_cache",
+            "error": None,
+            "created_at": time.time(),
+        }
+    )
 
-    asyncio.create_task(_run_prepare_model_job(job_id, request.model))
+    _start_prepare_model_job(job_id, request.model, request.engine)
 
     return ModelPreparationJobAccepted(
         job_id=job_id,
@@ -64,12 +78,37 @@ async def prepare_model(request: ModelPreparationRequest):
 
 @router.get("/jobs/{job_id}", response_model=ModelPreparationJobStatus)
 async def get_prepare_model_job_status(job_id: str):
-    _cleanup_expired_jobs()
-    job = model_jobs.get(job_id)
+    await _cleanup_expired_jobs()
+    job = await store_read(job_store.get, job_id)
 
     if job is None:
         raise HTTPException(status_code=404, detail="Model preparation job not found")
 
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_prepare_model_job_events(job_id: str):
+    """Stream a model preparation job's stage changes as Server-Sent Events"""
+    job = await store_read(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Model preparation job not found")
+
+    async def snapshot() -> dict | None:
+        job = await store_read(job_store.get, job_id)
+        return _job_status(job).model_dump(mode="json") if job is not None else None
+
+    remote = job.get("owner") != WORKER_ID
+    return StreamingResponse(
+        job_events.stream(
+            job_id, snapshot, _REMOTE_JOB_POLL_SECONDS if remote else None
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _job_status(job: dict) -> ModelPreparationJobStatus:
     return ModelPreparationJobStatus(
         job_id=job["job_id"],
         status=job["status"],
@@ -79,27 +118,75 @@ async def get_prepare_model_job_status(job_id: str):
     )
 
 
-async def _run_prepare_model_job(job_id, model_type):
-    job = model_jobs[job_id]
-    job["status"] = "processing"
+def _publish_status(job: dict | None) -> None:
+    if job is not None:
+        job_events.publish(
+            job["job_id"], "status", _job_status(job).model_dump(mode="json")
+        )
+
+
+async def _update_job(job_id: str, **changes) -> dict | None:
+    job = await store_write(job_store.update, job_id, **changes)
+    _publish_status(job)
+    return job
+
+
+async def _run_prepare_model_job(job_id, model_type, engine=None):
+    if await _update_job(job_id, status="processing") is None:
+        return
 
     def on_stage_change(stage: str):
-        current_job = model_jobs.get(job_id)
-        if current_job is None:
-            return
-        current_job["stage"] = stage
+        # Queued behind earlier writes and published once applied
+        store_write(job_store.update, job_id, stage=stage).add_done_callback(
+            lambda write: _publish_status(
+                None if write.cancelled() or write.exception() else write.result()
+            )
+        )
 
     try:
-        await whisper_service.prepare_model(model_type, on_stage_change=on_stage_change)
-        job["status"] = "completed"
-        job["stage"] = "ready"
+        await whisper_service.prepare_model(
+            model_type, on_stage_change=on_stage_change, engine=engine
+        )
+        await _update_job(job_id, status="completed", stage="ready")
     except HTTPException as exc:
         logger.error("Model preparation failed for %s: %s", model_type.value, exc.detail)
-        job["status"] = "failed"
-        job["stage"] = "failed"
-        job["error"] = exc.detail
+        await _update_job(job_id, status="failed", stage="failed", error=exc.detail)
     except Exception as exc:
         logger.error("Model preparation crashed for %s: %s", model_type.value, exc)
-        job["status"] = "failed"
-        job["stage"] = "failed"
-        job["error"] = str(exc)
+        await _update_job(job_id, status="failed", stage="failed", error=str(exc))
+
+
+def _start_prepare_model_job(
+    job_id: str, model_type: ModelType, engine: EngineType | None
+) -> None:
+    task = asyncio.create_task(_run_prepare_model_job(job_id, model_type, engine))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+
+
+async def wait_for_model_jobs(timeout: float | None = None) -> None:
+    """Wait up to ``timeout`` for the preparations still running."""
+    if not _running_jobs:
+        return
+
+    grace = settings.job_shutdown_grace_seconds if timeout is None else timeout
+    _, pending = await asyncio.wait(set(_running_jobs), timeout=grace)
+    if pending:
+        logger.warning(
+            "Stopping with %d model preparation(s) still running", len(pending)
+        )
+
+
+async def recover_model_jobs() -> int:
+    """Restart the preparations a worker that is no longer running left unfinished."""
+    orphans = await store_write(job_store.claim_orphans, _JOB_KIND)
+    for job in orphans:
+        await _update_job(job["job_id"], status="queued", stage="checking_cache")
+        _start_prepare_model_job(
+            job["job_id"],
+            ModelType(job["model"]),
+            EngineType(job["engine"]) if job.get("engine") else None,
+        )
+    if orphans:
+        logger.info("Resumed %d interrupted model preparation job(s)", len(orphans))
+    return len(orphans)
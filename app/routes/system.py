@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+
+from app.schemas.transcription import (
+    InferenceStatsResponse,
+    ModelResidencyResponse,
+    ResultCacheStats,
+    VadStatsResponse,
+)
+from app.core.config import settings
+from app.services.vad import vad_stats
+from app.services.whisper_service import whisper_service
+
+router = APIRouter(prefix="/v1/system", tags=["system"])
+
+
+@router.get("/inference", response_model=InferenceStatsResponse)
+async def get_inference_stats():
+    """Worker slot occupancy and admission queue depth per model"""
+    return InferenceStatsResponse(models=whisper_service.inference_stats())
+
+
+@router.get("/cache", response_model=ResultCacheStats)
+async def get_result_cache_stats():
+    """Hit/miss counters and occupancy of the transcription result cache"""
+    return whisper_service.result_cache_stats()
+
+
+@router.get("/models", response_model=ModelResidencyResponse)
+async def get_model_residency():
+    """Loaded models, their estimated memory and recent load/evict events"""
+    return whisper_service.model_residency()
+
+
+@router.get("/vad", response_model=VadStatsResponse)
+async def get_vad_stats():
+    """Audio seen by voice activity detection and how much was skipped"""
+    return VadStatsResponse(
+        enabled=settings.vad_enabled,
+        backend=settings.vad_backend,
+        **vad_stats.snapshot(),
+    )
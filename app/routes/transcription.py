@@ -2,65 +2,223 @@ import asyncio
 import json
 import logging
 import os
-import tempfile
+import threading
 import time
 import uuid
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from fastapi import (
     APIRouter,
     File,
     Form,
     HTTPException,
+    Query,
+    Request,
     UploadFile,
     WebSocket,
     WebSocketDisconnect,
 )
+from fastapi.responses import StreamingResponse
 from starlette.websockets import WebSocketState
 
 from app.schemas.transcription import (
     ActionType,
+    EngineType,
+    JobPriority,
     ModelType,
+    RealtimeAudioFormat,
     RealtimeTranscriptionMessage,
     TranscriptionJobAccepted,
     TranscriptionJobStatus,
     TranscriptionResponse,
+    TranscriptionSegment,
 )
 from app.core.config import settings
+from app.middleware.upload_limit import upload_limit_detail
+from app.services.audio import SAMPLE_RATE, spool_to_file
+from app.services.job_events import job_events
+from app.services.job_scheduler import client_key, job_scheduler
+from app.services.job_store import WORKER_ID, job_store, store_read, store_write
+from app.services.metrics import WEBSOCKET_RECEIVED_BYTES, WEBSOCKET_SESSIONS
+from app.services.result_cache import digest_stream
+from app.services.realtime import (
+    AudioBacklog,
+    RealtimeAudioSession,
+    StreamingTranscriber,
+)
+from app.services.tracing import Trace, span, start_trace, use_trace
 from app.services.whisper_service import whisper_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1/transcribe", tags=["transcription"])
-transcription_jobs: dict[str, dict] = {}
 
-# Jobs older than this are purged automatically
+_JOB_KIND = "transcription"
+# Finished jobs are purged this long after they finish
 _JOB_TTL_SECONDS = 3600  # 1 hour
+# Expired jobs are purged at most this often
+_CLEANUP_INTERVAL_SECONDS = 30
+_last_cleanup = 0.0
+# Status streams of jobs running in another worker re-read the store
+_REMOTE_JOB_POLL_SECONDS = 1.0
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
+# Jobs running in this worker: the event that stops the job's inference at
+# the next segment; the job then finishes on its own, its slot freed once
+# the worker thread returns
+_active_jobs: dict[str, threading.Event] = {}
 
-def _cleanup_expired_jobs() -> None:
+
+async def _cleanup_expired_jobs() -> None:
+    global _last_cleanup
     now = time.time()
-    expired = [
-        jid for jid, job in transcription_jobs.items()
-        if now - job.get("created_at", now) > _JOB_TTL_SECONDS
-    ]
-    for jid in expired:
-        job = transcription_jobs.pop(jid, {})
-        temp_path = job.get("temp_path")
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
+    if now - _last_cleanup < _CLEANUP_INTERVAL_SECONDS:
+        return
+    _last_cleanup = now
+
+    expired = await store_write(
+        job_store.purge_expired, _JOB_KIND, now - _JOB_TTL_SECONDS
+    )
+    for job in expired:
+        _discard_job_audio(job)
     if expired:
         logger.info("Purged %d expired transcription job(s)", len(expired))
 
 
+def _discard_job_audio(job: dict | None) -> None:
+    audio_path = job.get("audio_path") if job else None
+    if audio_path and os.path.exists(audio_path):
+        os.unlink(audio_path)
+
+
+def _job_status(job: dict, segments_from: int | None = None) -> TranscriptionJobStatus:
+    segments = job.get("segments", [])
+    return TranscriptionJobStatus(
+        job_id=job["job_id"],
+        status=job["status"],
+        progress=job["progress"],
+        stage=job["stage"],
+        model=job["model"],
+        action=job["action"],
+        engine=job["engine"],
+        text=job["text"],
+        error=job["error"],
+        speed_factor=job.get("speed_factor"),
+        timings=job.get("timings"),
+        segments=segments[segments_from:] if segments_from is not None else [],
+        segment_count=len(segments),
+        priority=job.get("priority"),
+        queue_position=job.get("queue_position"),
+    )
+
+
+def _publish_status(job: dict | None) -> None:
+    if job is not None:
+        job_events.publish(job["job_id"], "status", _job_status(job).model_dump())
+
+
+async def _update_job(job_id: str, **changes) -> dict | None:
+    """Apply ``changes`` to a stored job and push its new state to subscribers."""
+    job = await store_write(job_store.update, job_id, **changes)
+    _publish_status(job)
+    return job
+
+
+async def _transition_job(job_id: str, from_statuses: tuple[str, ...], **changes):
+    """Like ``_update_job``, but only from one of ``from_statuses``."""
+    job = await store_write(job_store.transition, job_id, from_statuses, **changes)
+    _publish_status(job)
+    return job
+
+
+def _on_job_written(
+    write: asyncio.Future, then: Callable[[Any], None] = _publish_status
+) -> None:
+    """Pass the result of a write issued from a synchronous callback to ``then``.
+
+    Progress and segment callbacks cannot await the store; their writes
+    are queued in order and applied off the event loop.
+    """
+
+    def done(future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error("Job store write failed", exc_info=future.exception())
+            return
+        then(future.result())
+
+    write.add_done_callback(done)
+
+
+def _schedule_job(job: dict) -> None:
+    """Queue a stored job behind the jobs of higher priority and other clients."""
+    job_id = job["job_id"]
+
+    def on_position(position: int | None) -> None:
+        _on_job_written(
+            store_write(job_store.update, job_id, queue_position=position)
+        )
+
+    job_scheduler.submit(
+        job_id,
+        job.get("client", "unknown"),
+        JobPriority(job.get("priority", JobPriority.INTERACTIVE)),
+        lambda: _run_transcription_job(
+            job_id=job_id,
+            model=ModelType(job["model"]),
+            action=ActionType(job["action"]),
+            engine=EngineType(job["engine"]) if job["engine"] else None,
+            content_digest=job.get("content_digest"),
+        ),
+        on_position,
+    )
+
+
+def _append_job_segment(job_id: str, segment: TranscriptionSegment) -> None:
+    """Record a finished segment and push it to subscribers."""
+
+    def published(index: int | None) -> None:
+        if index is not None:
+            job_events.publish(
+                job_id, "segment", {"index": index, **segment.model_dump()}
+            )
+
+    _on_job_written(
+        store_write(job_store.append_segment, job_id, segment.model_dump()),
+        published,
+    )
+
+
+def _enforce_upload_size(file: UploadFile) -> None:
+    # The middleware bounds the whole request body; this is the exact
+    # check on the file part, which Starlette has already spooled to disk.
+    if file.size is not None and file.size > settings.max_file_size:
+        raise HTTPException(
+            status_code=413,
+            detail=upload_limit_detail(settings.max_file_size),
+        )
+
+
+def _start_upload_trace(
+    name: str, requested: bool, request: Request, model: ModelType, action: ActionType
+) -> Trace | None:
+    trace = start_trace(name, requested, model=model.value, action=action.value)
+    if trace is not None:
+        # Measured by the upload size middleware while the body streamed in
+        trace.add("upload_read", getattr(request.state, "upload_read_seconds", 0.0))
+    return trace
+
+
 @router.post("/upload", response_model=TranscriptionResponse)
 async def transcribe_upload(
+    request: Request,
     file: UploadFile = File(...),
     model: ModelType = Form(...),
     action: ActionType = Form(...),
+    engine: Optional[EngineType] = Form(None),
+    trace: bool = Form(False),
 ):
     """
     Transcribe uploaded audio file
@@ -68,22 +226,23 @@ async def transcribe_upload(
     - **file**: Audio file (MP3, M4A, WAV, OPUS, OGG, FLAC, AAC, WebM, MP4, 3GP, AMR)
     - **model**: Whisper model to use (small, medium, turbo)
     - **action**: Action to perform (transcribe, translate_english)
+    - **engine**: Optional inference engine (openai-whisper, faster-whisper, stub)
+    - **trace**: Return the time spent in each stage as ``timings``
     """
 
-    content = await file.read()
-    if len(content) > settings.max_file_size:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File size exceeds the {settings.max_file_size // (1024 * 1024)} MB limit",
-        )
-    await file.seek(0)
+    _enforce_upload_size(file)
+    request_trace = _start_upload_trace("upload", trace, request, model, action)
 
     try:
-        result = await whisper_service.transcribe_file(
-            file=file,
-            model_type=model,
-            action=action,
-        )
+        with use_trace(request_trace):
+            result = await whisper_service.transcribe_file(
+                file=file,
+                model_type=model,
+                action=action,
+                engine=engine,
+            )
+        if request_trace is not None:
+            result.timings = request_trace.log()
         return result
 
     except HTTPException:
@@ -95,50 +254,95 @@ async def transcribe_upload(
 
 @router.post("/upload/start", response_model=TranscriptionJobAccepted)
 async def start_transcription_upload(
+    request: Request,
     file: UploadFile = File(...),
     model: ModelType = Form(...),
     action: ActionType = Form(...),
+    engine: Optional[EngineType] = Form(None),
+    priority: JobPriority = Form(JobPriority.INTERACTIVE),
+    trace: bool = Form(False),
 ):
-    content = await file.read()
-    if len(content) > settings.max_file_size:
+    """
+    Start a background transcription job
+
+    - **priority**: ``interactive`` (default) or ``batch``; batch jobs only
+      start when no interactive job is waiting
+    - **trace**: Report the time spent in each stage as ``timings`` once
+      the job completes
+    """
+    _enforce_upload_size(file)
+    await _cleanup_expired_jobs()
+    if priority == JobPriority.REALTIME:
         raise HTTPException(
-            status_code=413,
-            detail=f"File size exceeds the {settings.max_file_size // (1024 * 1024)} MB limit",
+            status_code=400,
+            detail="The realtime priority is reserved for live sessions",
         )
 
-    _cleanup_expired_jobs()
-
-    suffix = (
-        f".{file.filename.split('.')[-1]}" if file.filename else ".wav"
-    )
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-        temp_file.write(content)
-        temp_file.flush()
-        temp_path = temp_file.name
-
     job_id = str(uuid.uuid4())
-    transcription_jobs[job_id] = {
+    job = {
         "job_id": job_id,
+        "kind": _JOB_KIND,
         "status": "queued",
         "progress": 5,
         "stage": "queued",
         "model": model.value,
         "action": action.value,
+        "engine": engine.value if engine else None,
         "text": None,
         "error": None,
+        "segments": [],
+        "priority": priority.value,
+        "client": client_key(
+            request.headers, request.client.host if request.client else None
+        ),
+        "queue_position": None,
         "filename": file.filename or "audio.wav",
         "content_type": file.content_type,
-        "temp_path": temp_path,
         "created_at": time.time(),
+        "trace": trace,
     }
 
-    asyncio.create_task(
-        _run_transcription_job(
+    request_trace = _start_upload_trace("upload_job", trace, request, model, action)
+    with use_trace(request_trace):
+        content_digest = await whisper_service.content_digest(
+            digest_stream, file.file
+        )
+        cached = await whisper_service.cached_result(
+            content_digest, model, action, engine
+        )
+    if cached is not None:
+        await store_write(
+            job_store.create,
+            {
+                **job,
+                "status": "completed",
+                "progress": 100,
+                "stage": "completed",
+                "text": cached.text,
+                "engine": cached.engine,
+                "speed_factor": cached.speed_factor,
+                "segments": [segment.model_dump() for segment in cached.segments],
+                "timings": request_trace.log() if request_trace else None,
+            }
+        )
+        return TranscriptionJobAccepted(
             job_id=job_id,
-            model=model,
-            action=action,
+            status="completed",
+            progress=100,
         )
-    )
+
+    # The upload is closed once this request returns, so the job keeps its
+    # own copy on disk; it is copied chunk by chunk, never read whole.
+    loop = asyncio.get_running_loop()
+    with use_trace(request_trace), span("temp_file_write"):
+        job["audio_path"] = await loop.run_in_executor(
+            None, spool_to_file, file.file, os.path.splitext(file.filename or "")[1]
+        )
+    job["content_digest"] = content_digest
+    if request_trace is not None:
+        # Carried over into the job's trace when it runs
+        job["upload_timings"] = request_trace.stages()
+    _schedule_job(await store_write(job_store.create, job))
 
     return TranscriptionJobAccepted(
         job_id=job_id,
@@ -148,68 +352,230 @@ async def start_transcription_upload(
 
 
 @router.get("/upload/status/{job_id}", response_model=TranscriptionJobStatus)
-async def get_transcription_upload_status(job_id: str):
-    _cleanup_expired_jobs()
-    job = transcription_jobs.get(job_id)
+async def get_transcription_upload_status(
+    job_id: str,
+    segments_from: Optional[int] = Query(None, ge=0),
+):
+    """
+    Get a transcription job's state
+
+    - **segments_from**: Include the transcript segments from this index on.
+      Pass the previous response's ``segment_count`` to receive only the
+      segments finished since; omit it to receive none.
+    """
+    await _cleanup_expired_jobs()
+    job = await store_read(job_store.get, job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Transcription job not found")
 
-    return TranscriptionJobStatus(
-        job_id=job["job_id"],
-        status=job["status"],
-        progress=job["progress"],
-        stage=job["stage"],
-        model=job["model"],
-        action=job["action"],
-        text=job["text"],
-        error=job["error"],
+    return _job_status(job, segments_from)
+
+
+@router.get("/upload/events/{job_id}")
+async def stream_transcription_upload_events(job_id: str):
+    """
+    Stream a transcription job's updates as Server-Sent Events
+
+    Each ``status`` event carries the same payload as ``/upload/status``
+    (without segments); each ``segment`` event carries one finished segment
+    and its index. The stream closes once the job completes or fails.
+    """
+    job = await store_read(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+
+    async def snapshot() -> dict | None:
+        job = await store_read(job_store.get, job_id)
+        return _job_status(job).model_dump() if job is not None else None
+
+    remote = job.get("owner") != WORKER_ID
+    return StreamingResponse(
+        job_events.stream(
+            job_id, snapshot, _REMOTE_JOB_POLL_SECONDS if remote else None
+        ),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
     )
 
 
+@router.delete("/upload/{job_id}", response_model=TranscriptionJobStatus)
+async def cancel_transcription_upload(job_id: str):
+    """
+    Cancel a queued or running transcription job
+
+    A queued job gives up its place in the queue. A running job stops
+    decoding at its next segment and releases its inference slot. The
+    spooled upload is deleted right away.
+    """
+    job = await _transition_job(
+        job_id,
+        ("queued", "processing"),
+        status="cancelled",
+        progress=100,
+        stage="cancelled",
+        queue_position=None,
+    )
+    if job is None:
+        current = await store_read(job_store.get, job_id)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Transcription job not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Transcription job is already {current['status']}",
+        )
+
+    # A job queued or running in another worker notices the cancelled
+    # status itself: before it starts, or at its next progress update
+    job_scheduler.cancel(job_id)
+    cancel_event = _active_jobs.pop(job_id, None)
+    if cancel_event is not None:
+        cancel_event.set()
+    _discard_job_audio(job)
+    logger.info("Cancelled transcription job %s", job_id)
+    return _job_status(job)
+
+
 async def _run_transcription_job(
     job_id: str,
     model: ModelType,
     action: ActionType,
+    engine: EngineType | None = None,
+    content_digest: str | None = None,
 ):
-    job = transcription_jobs[job_id]
-    job["status"] = "processing"
-    job["progress"] = 10
-    job["stage"] = "processing"
+    job = await _transition_job(
+        job_id,
+        ("queued",),
+        status="processing",
+        progress=10,
+        stage="processing",
+        queue_position=None,
+    )
+    if job is None:
+        # Cancelled while it waited
+        return
+
+    cancel_event = threading.Event()
+    _active_jobs[job_id] = cancel_event
+
+    # Timed from submission, including the upload and the wait to start
+    trace = start_trace(
+        "job", job.get("trace", False), started_at=job["created_at"], job_id=job_id
+    )
+    if trace is not None:
+        trace.merge(job.get("upload_timings") or {})
+        trace.add("job_queue", time.time() - job["created_at"])
+
+    def published(updated: dict | None) -> None:
+        if updated is None:
+            # Cancelled through another worker
+            cancel_event.set()
+        _publish_status(updated)
 
     def on_progress(progress: int, stage: str):
-        current_job = transcription_jobs.get(job_id)
-        if current_job is None:
-            return
-        current_job["progress"] = progress
-        current_job["stage"] = stage
+        _on_job_written(
+            store_write(
+                job_store.transition,
+                job_id,
+                ("processing",),
+                progress=progress,
+                stage=stage,
+            ),
+            published,
+        )
+
+    streamed = 0
+
+    def on_segment(segment: TranscriptionSegment):
+        nonlocal streamed
+        streamed += 1
+        _append_job_segment(job_id, segment)
 
     try:
-        response = await whisper_service.transcribe_file_path(
-            file_path=job["temp_path"],
-            filename=job["filename"],
-            content_type=job["content_type"],
-            model_type=model,
-            action=action,
-            on_progress=on_progress,
+        with use_trace(trace):
+            response = await whisper_service.transcribe_file_path(
+                file_path=job["audio_path"],
+                filename=job["filename"],
+                content_type=job["content_type"],
+                model_type=model,
+                action=action,
+                on_progress=on_progress,
+                engine=engine,
+                content_digest=content_digest,
+                on_segment=on_segment,
+                cancel_event=cancel_event,
+            )
+        segments = {}
+        if not streamed:
+            # A cached result arrives whole, without streamed segments
+            segments["segments"] = [
+                segment.model_dump() for segment in response.segments
+            ]
+        # A cancelled job keeps its status even if the result raced in; the
+        # write queues behind the streamed segments
+        await _transition_job(
+            job_id,
+            ("processing",),
+            status="completed",
+            progress=100,
+            stage="completed",
+            text=response.text,
+            engine=response.engine,
+            speed_factor=response.speed_factor,
+            timings=trace.log() if trace is not None else None,
+            **segments,
         )
-        job["status"] = "completed"
-        job["progress"] = 100
-        job["stage"] = "completed"
-        job["text"] = response.text
     except HTTPException as exc:
-        job["status"] = "failed"
-        job["progress"] = 100
-        job["stage"] = "failed"
-        job["error"] = exc.detail
+        await _fail_job(job_id, exc.detail)
     except Exception as exc:
-        job["status"] = "failed"
-        job["progress"] = 100
-        job["stage"] = "failed"
-        job["error"] = str(exc)
+        await _fail_job(job_id, str(exc))
     finally:
-        temp_path = job.get("temp_path")
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+        _active_jobs.pop(job_id, None)
+        _discard_job_audio(job)
+
+
+async def _fail_job(job_id: str, error: str) -> None:
+    failed = await _transition_job(
+        job_id,
+        ("processing",),
+        status="failed",
+        progress=100,
+        stage="failed",
+        error=error,
+    )
+    if failed is None:
+        logger.info("Transcription job %s stopped after cancellation", job_id)
+
+
+async def recover_transcription_jobs() -> int:
+    """Resume the unfinished jobs of a worker that is no longer running.
+
+    Jobs whose spooled audio survived are transcribed again from the start;
+    the others can only be reported as failed.
+    """
+    recovered = 0
+    for job in await store_write(job_store.claim_orphans, _JOB_KIND):
+        job_id = job["job_id"]
+        audio_path = job.get("audio_path")
+        if not audio_path or not os.path.exists(audio_path):
+            await _update_job(
+                job_id,
+                status="failed",
+                progress=100,
+                stage="failed",
+                error="The server restarted before this job finished",
+            )
+            continue
+
+        _schedule_job(
+            await _update_job(
+                job_id, status="queued", progress=5, stage="queued", segments=[]
+            )
+        )
+        recovered += 1
+
+    if recovered:
+        logger.info("Resumed %d interrupted transcription job(s)", recovered)
+    return recovered
 
 
 @router.websocket("/realtime")
@@ -221,26 +587,40 @@ async def transcribe_realtime(websocket: WebSocket):
     {
         "type": "config",
         "model": "medium",
-        "action": "transcribe"
+        "action": "transcribe",
+        "engine": "faster-whisper",  (optional)
+        "format": "webm",  (optional; or "pcm_s16le" / "pcm_f32le")
+        "trace": true  (optional; log the stage timings of every pass)
     }
 
-    Then send audio chunks as binary data
+    Then send audio chunks as binary data: slices of one WebM recording, or
+    with a PCM format, raw little-endian mono samples at the realtime sample
+    rate (frames may split a sample).
     """
     client_id = str(uuid.uuid4())
     logger.info(f"WebSocket connection attempt from {client_id}")
 
     await websocket.accept()
     logger.info(f"WebSocket connection accepted for {client_id}")
+    WEBSOCKET_SESSIONS.inc()
 
     # Configuration variables - using lists to allow modification in nested functions
     config_state = {
         "model_type": ModelType.MEDIUM,
         "action": ActionType.TRANSCRIBE,
+        "engine": None,
+        "format": RealtimeAudioFormat.WEBM,
+        "trace": False,
     }
 
-    # Audio buffer for accumulating chunks
-    audio_buffer = bytearray()
-    # Process every 2 chunks or when buffer reaches certain size
+    # Streaming decoder and the PCM it produced for this connection
+    session = RealtimeAudioSession()
+    # Decoding runs in its own task so receiving never waits for the model
+    inference = _RealtimeInference(
+        websocket, config_state, client_id, session.sample_rate
+    )
+    inference.start()
+    # Hand audio to inference every 2 chunks
     chunk_count = 0
     chunk_threshold = 2  # Process every 2 WebM chunks
 
@@ -263,22 +643,23 @@ async def transcribe_realtime(websocket: WebSocket):
                         message,
                         config_state,
                         client_id,
-                        audio_buffer,
+                        session,
+                        inference,
                     )
                 elif "bytes" in message:
                     logger.debug(f"Processing audio bytes from {client_id}")
                     chunk_count += 1
-                    transcription = await _handle_audio_message(
+                    processed = await _handle_audio_message(
                         websocket,
                         message,
-                        audio_buffer,
+                        session,
+                        inference,
                         chunk_count,
                         chunk_threshold,
-                        config_state,
                         client_id,
                     )
-                    if transcription:
-                        # Reset chunk count after successful processing
+                    if processed:
+                        # The audio was queued for inference; count afresh
                         chunk_count = 0
                 else:
                     logger.warning(
@@ -307,9 +688,9 @@ async def transcribe_realtime(websocket: WebSocket):
             logger.error(f"Failed to send error message to {client_id}")
     finally:
         # Process any remaining audio in buffer
-        await _process_final_buffer(
-            websocket, audio_buffer, config_state, client_id
-        )
+        WEBSOCKET_SESSIONS.dec()
+        await session.finish()
+        await _process_final_buffer(websocket, session, inference, client_id)
         logger.info(f"WebSocket connection closed for {client_id}")
 
 
@@ -318,7 +699,8 @@ async def _handle_text_message(
     message,
     config_state: dict,
     client_id: str,
-    audio_buffer: Optional[bytearray] = None,
+    session: Optional[RealtimeAudioSession] = None,
+    inference: Optional["_RealtimeInference"] = None,
 ):
     """Handle text/configuration messages"""
     try:
@@ -343,22 +725,52 @@ async def _handle_text_message(
                     "transcribe, translate_english"
                 ) from exc
 
+            raw_engine = config.get("engine")
+            try:
+                config_state["engine"] = (
+                    EngineType(raw_engine) if raw_engine else None
+                )
+            except ValueError as exc:
+                raise ValueError(
+                    "Unsupported engine: "
+                    f"{raw_engine}. Available engines: "
+                    "openai-whisper, faster-whisper, stub"
+                ) from exc
+
+            config_state["trace"] = bool(config.get("trace", config_state["trace"]))
+
+            raw_format = config.get("format", config_state["format"])
+            try:
+                config_state["format"] = RealtimeAudioFormat(raw_format)
+            except ValueError as exc:
+                raise ValueError(
+                    "Unsupported format: "
+                    f"{raw_format}. Available formats: "
+                    "webm, pcm_s16le, pcm_f32le"
+                ) from exc
+
             whisper_service.validate_model_action(
                 config_state["model_type"],
                 config_state["action"],
             )
+            if session is not None:
+                await session.set_format(config_state["format"])
 
             logger.info(
-                "Configuration updated for %s: model=%s, action=%s",
+                "Configuration updated for %s: model=%s, action=%s, engine=%s, "
+                "format=%s",
                 client_id,
                 config_state["model_type"],
                 config_state["action"],
+                config_state["engine"],
+                config_state["format"],
             )
 
             # Send acknowledgment
             ack_message = {
                 "type": "config_ack",
                 "message": "Configuration received",
+                "format": config_state["format"].value,
             }
             logger.info(f"Sending config_ack to {client_id}: {ack_message}")
             await websocket.send_json(ack_message)
@@ -368,14 +780,16 @@ async def _handle_text_message(
             logger.info(f"Received flush request from {client_id}")
 
             # Process any remaining audio buffer
-            if audio_buffer and len(audio_buffer) > 0:
+            if session is not None and inference is not None:
                 await _process_final_buffer(
                     websocket,
-                    audio_buffer,
-                    config_state,
+                    session,
+                    inference,
                     client_id,
                     mark_final=True,
                 )
+                # The client may keep streaming after a flush
+                inference.start()
 
             # Send done signal to client
             if websocket.client_state == WebSocketState.CONNECTED:
@@ -408,120 +822,243 @@ async def _handle_text_message(
             )
 
 
+def _window_transcriber(config_state: dict, client_id: str):
+    """Decode realtime windows with the connection's current configuration"""
+
+    async def transcribe(audio, initial_prompt: Optional[str]) -> dict:
+        # Each pass over the window is traced on its own
+        trace = start_trace(
+            "realtime_window",
+            requested=config_state["trace"],
+            client_id=client_id,
+            audio_seconds=round(len(audio) / SAMPLE_RATE, 3),
+        )
+        with use_trace(trace):
+            result = await whisper_service.transcribe_realtime_chunk(
+                audio_data=audio,
+                model_type=config_state["model_type"],
+                action=config_state["action"],
+                engine=config_state["engine"],
+                initial_prompt=initial_prompt,
+            )
+        if trace is not None:
+            trace.log()
+        return result
+
+    return transcribe
+
+
+class _RealtimeInference:
+    """A connection's inference task, fed by the receive loop.
+
+    The receive loop queues decoded audio in a bounded ``AudioBacklog`` and
+    goes straight back to the socket; this task takes everything queued,
+    appends it to the rolling window and decodes it. Audio arriving during a
+    pass is merged into the next one, and when the client outruns the model
+    the oldest queued audio is dropped instead of latency growing.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        config_state: dict,
+        client_id: str,
+        sample_rate: int,
+    ):
+        self.websocket = websocket
+        self.config_state = config_state
+        self.client_id = client_id
+        self.streamer = StreamingTranscriber(sample_rate)
+        self.backlog = AudioBacklog(sample_rate)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.backlog = AudioBacklog(self.streamer.sample_rate)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> str:
+        """Let the pass in progress finish and move queued audio into the window
+
+        Returns the text committed because audio ahead of the queued audio
+        was dropped.
+        """
+        self.backlog.close()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        audio = self.backlog.take_all()
+        committed = self.streamer.skip(self.backlog.gap_seconds)
+        self.streamer.append(audio)
+        return committed
+
+    async def _run(self) -> None:
+        try:
+            while (audio := await self.backlog.get()) is not None:
+                # Dropped audio leaves a hole the window cannot decode across
+                committed = self.streamer.skip(self.backlog.gap_seconds)
+                connected = self.websocket.client_state == WebSocketState.CONNECTED
+                if committed and connected:
+                    await self.websocket.send_json(
+                        RealtimeTranscriptionMessage(
+                            text=committed, is_partial=False
+                        ).model_dump()
+                    )
+                self.streamer.append(audio)
+                await _decode_window(
+                    self.websocket, self.streamer, self.config_state, self.client_id
+                )
+        except Exception as e:
+            logger.error(f"Realtime inference stopped for {self.client_id}: {str(e)}")
+
+
 async def _handle_audio_message(
     websocket: WebSocket,
     message,
-    audio_buffer: bytearray,
+    session: RealtimeAudioSession,
+    inference: _RealtimeInference,
     chunk_count: int,
     chunk_threshold: int,
-    config_state: dict,
     client_id: str,
-):
-    """Handle audio data messages"""
+) -> bool:
+    """Handle audio data messages
+
+    Returns whether the decoded audio was handed to inference.
+    """
     audio_chunk = message["bytes"]
+    WEBSOCKET_RECEIVED_BYTES.inc(len(audio_chunk))
     logger.debug(
         f"Received {len(audio_chunk)} bytes of audio from {client_id}"
     )
 
     if len(audio_chunk) == 0:
         logger.warning(f"Received empty audio chunk from {client_id}")
-        return None
+        return False
 
-    audio_buffer.extend(audio_chunk)
+    try:
+        await session.feed(audio_chunk)
+    except Exception as e:
+        logger.error(f"Audio decode error for {client_id}: {str(e)}")
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json(
+                {"type": "error", "message": "Audio decoding failed"}
+            )
+        return False
 
     logger.debug(
-        f"Buffer status for {client_id}: {len(audio_buffer)} bytes total, "
-        f"chunk {chunk_count}/{chunk_threshold}"
+        f"Buffer status for {client_id}: chunk {chunk_count}/{chunk_threshold}"
     )
 
-    # Process buffer when chunk threshold is reached
-    if chunk_count >= chunk_threshold:
-        try:
-            logger.info(
-                f"Processing {len(audio_buffer)} bytes of audio "
-                f"({chunk_count} chunks) for {client_id}"
-            )
-
-            # Transcribe accumulated audio
-            transcription = await whisper_service.transcribe_realtime_chunk(
-                audio_data=bytes(audio_buffer),
-                model_type=config_state["model_type"],
-                action=config_state["action"],
+    if session.is_pcm:
+        due = session.pending_seconds >= settings.realtime_pcm_step_seconds
+    else:
+        due = chunk_count >= chunk_threshold
+    if not due:
+        return False
+
+    dropped = inference.backlog.put(await session.take_audio())
+    if dropped:
+        # The model cannot keep up; tell the client rather than fall behind
+        logger.warning(
+            f"Dropped {dropped:.1f} s of queued audio for {client_id}"
+        )
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json(
+                {
+                    "type": "backpressure",
+                    "dropped_seconds": round(dropped, 2),
+                    "backlog_seconds": round(inference.backlog.seconds, 2),
+                }
             )
+    return True
 
-            if transcription and transcription.strip():
-                # Send completed chunk result (not partial)
-                response = RealtimeTranscriptionMessage(
-                    text=transcription, is_partial=False
-                )
-
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(response.model_dump())
-                    logger.info(
-                        f"Sent transcription to {client_id}: {transcription}"
-                    )
-            else:
-                logger.debug(f"Empty transcription result for {client_id}")
-
-            # Clear buffer for next chunk
-            audio_buffer.clear()
-            return transcription
 
-        except Exception as e:
-            logger.error(f"Transcription error for {client_id}: {str(e)}")
-            if websocket.client_state == WebSocketState.CONNECTED:
-                await websocket.send_json(
-                    {"type": "error", "message": "Transcription failed"}
-                )
+async def _decode_window(
+    websocket: WebSocket,
+    streamer: StreamingTranscriber,
+    config_state: dict,
+    client_id: str,
+) -> None:
+    """Decode the rolling window once and send what it committed"""
+    try:
+        logger.info(
+            f"Processing {streamer.window_seconds:.1f} s window for {client_id}"
+        )
+        committed = await streamer.process(
+            _window_transcriber(config_state, client_id)
+        )
+    except HTTPException as e:
+        # Overload (503) — the window is kept and decoded again with the
+        # next audio instead of being lost.
+        logger.warning(f"Transcription rejected for {client_id}: {e.detail}")
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json({"type": "error", "message": e.detail})
+        return
+    except Exception as e:
+        logger.error(f"Transcription error for {client_id}: {str(e)}")
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json(
+                {"type": "error", "message": "Transcription failed"}
+            )
+        return
+
+    messages = []
+    if committed:
+        messages.append(RealtimeTranscriptionMessage(text=committed, is_partial=False))
+    # Always sent: an empty partial clears the client's previous one
+    messages.append(
+        RealtimeTranscriptionMessage(text=streamer.partial_text, is_partial=True)
+    )
 
-    return None
+    for response in messages:
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json(response.model_dump())
+    logger.info(
+        f"Sent transcription to {client_id}: "
+        f"committed={committed!r} partial={streamer.partial_text!r}"
+    )
 
 
 async def _process_final_buffer(
     websocket: WebSocket,
-    audio_buffer: bytearray,
-    config_state: dict,
+    session: RealtimeAudioSession,
+    inference: _RealtimeInference,
     client_id: str,
     mark_final: bool = False,
 ):
-    """Process any remaining audio in buffer when connection closes"""
-    if len(audio_buffer) > 0:
-        try:
-            logger.info(
-                f"Processing final buffer for {client_id}: {len(audio_buffer)} bytes"
-            )
+    """Decode what is left of the stream and commit all of it"""
+    try:
+        skipped = await inference.stop()
+        streamer = inference.streamer
+        if session.has_audio:
+            streamer.append(await session.take_audio(drain=True))
+        logger.info(
+            f"Processing final {streamer.window_seconds:.1f} s window "
+            f"for {client_id}"
+        )
 
-            transcription = await whisper_service.transcribe_realtime_chunk(
-                audio_data=bytes(audio_buffer),
-                model_type=config_state["model_type"],
-                action=config_state["action"],
+        transcription = await streamer.finish(
+            _window_transcriber(inference.config_state, client_id)
+        )
+        transcription = " ".join(text for text in (skipped, transcription) if text)
+
+        # Only send if WebSocket is still connected
+        if transcription and websocket.client_state == WebSocketState.CONNECTED:
+            final_response = RealtimeTranscriptionMessage(
+                text=transcription,
+                is_final_segment=mark_final,
+                is_partial=not mark_final,
             )
 
-            # Only send if WebSocket is still connected
-            if (
-                transcription
-                and transcription.strip()
-                and websocket.client_state == WebSocketState.CONNECTED
-            ):
-                final_response = RealtimeTranscriptionMessage(
-                    text=transcription,
-                    is_final_segment=mark_final,
-                    is_partial=not mark_final,
-                )
-
-                await websocket.send_json(final_response.model_dump())
-                logger.info(
-                    f"Sent final transcription to {client_id}: {transcription}"
-                )
-            elif websocket.client_state != WebSocketState.CONNECTED:
-                logger.debug(
-                    f"Skipping final transcription send - "
-                    f"WebSocket not connected for {client_id}"
-                )
-        except Exception as e:
-            logger.error(
-                f"Error processing final buffer for {client_id}: {str(e)}"
+            await websocket.send_json(final_response.model_dump())
+            logger.info(
+                f"Sent final transcription to {client_id}: {transcription}"
+            )
+        elif websocket.client_state != WebSocketState.CONNECTED:
+            logger.debug(
+                f"Skipping final transcription send - "
+                f"WebSocket not connected for {client_id}"
             )
-        finally:
-            # Clear buffer after processing
-            audio_buffer.clear()
+    except Exception as e:
+        logger.error(
+            f"Error processing final buffer for {client_id}: {str(e)}"
+        )
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
@@ -15,15 +15,51 @@ class ActionType(str, Enum):
     TRANSLATE_ENGLISH = "translate_english"
 
 
+class EngineType(str, Enum):
+    OPENAI_WHISPER = "openai-whisper"
+    FASTER_WHISPER = "faster-whisper"
+    # Placeholder transcripts without a model, for load tests
+    STUB = "stub"
+
+
+class JobPriority(str, Enum):
+    """Scheduling class, highest first; realtime is reserved for live sessions."""
+
+    REALTIME = "realtime"
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class RealtimeAudioFormat(str, Enum):
+    """Binary frames of the realtime WebSocket: a WebM stream or raw mono PCM."""
+
+    WEBM = "webm"
+    PCM_S16LE = "pcm_s16le"
+    PCM_F32LE = "pcm_f32le"
+
+
 class TranscriptionRequest(BaseModel):
     model: ModelType
     action: ActionType
 
 
+class TranscriptionSegment(BaseModel):
+    start: float
+    end: float
+    text: str
+
+
 class TranscriptionResponse(BaseModel):
     model: str
     action: str
     text: str
+    engine: str | None = None
+    segments: list[TranscriptionSegment] = []
+    # Time compression applied before inference; segments are already timed
+    # against the original audio
+    speed_factor: float = 1.0
+    # Seconds spent in each stage, when the request was traced
+    timings: dict[str, float] | None = None
 
 
 class TranscriptionJobAccepted(BaseModel):
@@ -39,8 +75,20 @@ class TranscriptionJobStatus(BaseModel):
     stage: str
     model: str
     action: str
+    engine: str | None = None
     text: str | None = None
     error: str | None = None
+    # Speedup applied to the audio once the job completed
+    speed_factor: float | None = None
+    # Segments from the requested offset on; pass ``segment_count`` as the
+    # next offset to fetch only what was transcribed since
+    segments: list[TranscriptionSegment] = []
+    segment_count: int = 0
+    priority: str | None = None
+    # Jobs ahead of this one while it waits to start; None once it runs
+    queue_position: int | None = None
+    # Seconds spent in each stage once a traced job completed
+    timings: dict[str, float] | None = None
 
 
 class RealtimeTranscriptionMessage(BaseModel):
@@ -60,6 +108,7 @@ class ModelListResponse(BaseModel):
 
 class ModelPreparationRequest(BaseModel):
     model: ModelType
+    engine: EngineType | None = None
 
 
 class ModelPreparationJobAccepted(BaseModel):
@@ -77,6 +126,64 @@ class ModelPreparationJobStatus(BaseModel):
     error: str | None = None
 
 
+class InferenceLaneStats(BaseModel):
+    model: ModelType
+    workers: int
+    torch_threads: int
+    active: int
+    queued: int
+    max_queue_size: int
+
+
+class InferenceStatsResponse(BaseModel):
+    models: list[InferenceLaneStats]
+
+
+class ResultCacheStats(BaseModel):
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    memory_entries: int = 0
+    max_entries: int = 0
+    disk_entries: int = 0
+    disk_bytes: int = 0
+    disk_max_bytes: int = 0
+    ttl_seconds: int = 0
+
+
+class VadStatsResponse(BaseModel):
+    enabled: bool
+    backend: str
+    input_seconds: float
+    skipped_seconds: float
+    silent_inputs: int
+
+
+class ResidentModelStats(BaseModel):
+    key: str
+    engine: EngineType
+    model: ModelType
+    estimated_bytes: int
+    in_flight: int
+    loaded_at: float
+    last_used_at: float
+
+
+class ResidencyEvent(BaseModel):
+    timestamp: float
+    event: Literal["load", "evict"]
+    key: str
+    estimated_bytes: int
+
+
+class ModelResidencyResponse(BaseModel):
+    budget_bytes: int
+    used_bytes: int
+    models: list[ResidentModelStats]
+    events: list[ResidencyEvent]
+
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
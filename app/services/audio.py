@@ -0,0 +1,318 @@
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import shutil
+import time
+from typing import BinaryIO
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Whisper decodes audio in fixed 30-second windows
+WINDOW_SAMPLES = 30 * SAMPLE_RATE
+
+# MP4-family containers may store their index (moov atom) at the end of the
+# file, which ffmpeg cannot reach on a non-seekable pipe.
+SEEKABLE_ONLY_EXTENSIONS = {".mp4", ".m4a", ".3gp", ".mov"}
+
+# Uploads are moved between files and pipes in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _ffmpeg_decode_command(source: str, sample_rate: int) -> list[str]:
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", source,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-",
+    ]
+
+
+def _pcm16_to_float32(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+def _run_ffmpeg(command: list[str], input_data: bytes | None = None) -> bytes:
+    try:
+        return subprocess.run(
+            command, input=input_data, capture_output=True, check=True
+        ).stdout
+    except subprocess.CalledProcessError as exc:
+        raise RuntimeError(f"Failed to load audio: {exc.stderr.decode()}") from exc
+
+
+def load_audio_file(file_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode any ffmpeg-readable file to mono float32 PCM."""
+    return _pcm16_to_float32(
+        _run_ffmpeg(_ffmpeg_decode_command(file_path, sample_rate))
+    )
+
+
+def decode_audio_bytes(
+    data: bytes,
+    extension: str | None = None,
+    sample_rate: int = SAMPLE_RATE,
+) -> np.ndarray:
+    """Decode an in-memory audio payload to mono float32 PCM.
+
+    The bytes are piped into ffmpeg's stdin and PCM is read back from its
+    stdout, so nothing touches the disk. Only containers that need a
+    seekable input (see ``SEEKABLE_ONLY_EXTENSIONS``) fall back to a
+    temporary file.
+    """
+    if extension and extension.lower() in SEEKABLE_ONLY_EXTENSIONS:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp_file:
+            try:
+                temp_file.write(data)
+                temp_file.flush()
+                return load_audio_file(temp_file.name, sample_rate)
+            finally:
+                if os.path.exists(temp_file.name):
+                    os.unlink(temp_file.name)
+
+    return _pcm16_to_float32(
+        _run_ffmpeg(_ffmpeg_decode_command("pipe:0", sample_rate), input_data=data)
+    )
+
+
+def spool_to_file(stream: BinaryIO, suffix: str = "") -> str:
+    """Copy a file-like payload to a named temporary file, chunk by chunk.
+
+    The caller owns the returned path and must remove it.
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            shutil.copyfileobj(stream, temp_file, UPLOAD_CHUNK_SIZE)
+        except BaseException:
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name
+
+
+def decode_audio_stream(
+    stream: BinaryIO,
+    extension: str | None = None,
+    sample_rate: int = SAMPLE_RATE,
+) -> np.ndarray:
+    """Decode a file-like payload to mono float32 PCM.
+
+    Like ``decode_audio_bytes`` but the compressed input is fed to ffmpeg
+    in ``UPLOAD_CHUNK_SIZE`` pieces, so it is never held in memory whole.
+    """
+    if extension and extension.lower() in SEEKABLE_ONLY_EXTENSIONS:
+        temp_path = spool_to_file(stream, extension)
+        try:
+            return load_audio_file(temp_path, sample_rate)
+        finally:
+            os.unlink(temp_path)
+
+    process = subprocess.Popen(
+        _ffmpeg_decode_command("pipe:0", sample_rate),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    stderr = bytearray()
+
+    def write_input() -> None:
+        try:
+            while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                process.stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            # ffmpeg gave up early; its exit status and stderr explain why
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+    def collect_stderr() -> None:
+        stderr.extend(process.stderr.read())
+
+    writer = threading.Thread(target=write_input, name="ffmpeg-upload-writer")
+    error_reader = threading.Thread(target=collect_stderr, name="ffmpeg-upload-stderr")
+    writer.start()
+    error_reader.start()
+    try:
+        output = process.stdout.read()
+    finally:
+        process.wait()
+        writer.join()
+        error_reader.join()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Failed to load audio: {bytes(stderr).decode()}")
+    return _pcm16_to_float32(output)
+
+
+# Tempo range a single ffmpeg atempo filter accepts on every release
+_ATEMPO_MAX = 2.0
+
+
+def _atempo_filter(factor: float) -> str:
+    """ffmpeg filter speeding audio up by ``factor``, chained past 2x."""
+    stages = []
+    while factor > _ATEMPO_MAX:
+        stages.append(_ATEMPO_MAX)
+        factor /= _ATEMPO_MAX
+    stages.append(factor)
+    return ",".join(f"atempo={stage:.6f}" for stage in stages)
+
+
+def time_stretch(
+    audio: np.ndarray, factor: float, sample_rate: int = SAMPLE_RATE
+) -> np.ndarray:
+    """Play mono float32 PCM ``factor`` times faster, keeping its pitch.
+
+    Uses ffmpeg's WSOLA-based ``atempo`` filter; the result is about
+    ``len(audio) / factor`` samples long.
+    """
+    if factor == 1.0 or not len(audio):
+        return audio
+
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-f", "f32le",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-i", "pipe:0",
+        "-filter:a", _atempo_filter(factor),
+        "-f", "f32le",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-",
+    ]
+    output = _run_ffmpeg(command, input_data=audio.astype("<f4", copy=False).tobytes())
+    return np.frombuffer(output, "<f4").astype(np.float32)
+
+
+_EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+
+def starts_new_container(chunk: bytes) -> bool:
+    """Whether ``chunk`` opens a new WebM/Matroska or Ogg stream.
+
+    Clients that restart their recorder send a fresh header with every
+    recording; the streaming decoder must be restarted for those.
+    """
+    if chunk.startswith(_EBML_MAGIC):
+        return True
+    # Ogg page with the "beginning of stream" flag set
+    return chunk.startswith(b"OggS") and len(chunk) > 5 and bool(chunk[5] & 0x02)
+
+
+class StreamingDecoder:
+    """Long-lived ffmpeg process turning a container byte stream into PCM.
+
+    Compressed bytes are written to ffmpeg's stdin as they arrive and a
+    reader thread collects the PCM it produces, so each chunk only costs
+    the decode of the new audio instead of a fresh process and a re-parse
+    of everything received so far.
+    """
+
+    _READ_SIZE = 16384
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.bytes_fed = 0
+        self._pcm = bytearray()
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel", "error",
+                "-fflags", "+nobuffer",
+                "-probesize", "32768",
+                "-i", "pipe:0",
+                "-f", "s16le",
+                "-ac", "1",
+                "-acodec", "pcm_s16le",
+                "-ar", str(sample_rate),
+                "-flush_packets", "1",
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._reader = threading.Thread(
+            target=self._read_output, name="ffmpeg-stream-reader", daemon=True
+        )
+        self._reader.start()
+
+    def _read_output(self) -> None:
+        stdout = self._process.stdout
+        while True:
+            data = stdout.read1(self._READ_SIZE)
+            if not data:
+                break
+            with self._lock:
+                self._pcm.extend(data)
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def feed(self, data: bytes) -> None:
+        """Write compressed bytes to the decoder (may block briefly)."""
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+            self.bytes_fed += len(data)
+        except (BrokenPipeError, ValueError) as exc:
+            raise RuntimeError("Streaming decoder is no longer running") from exc
+
+    def read(self) -> np.ndarray:
+        """Return the PCM decoded since the previous call."""
+        with self._lock:
+            # Keep a trailing odd byte until its sample is complete
+            usable = len(self._pcm) - (len(self._pcm) % 2)
+            data = bytes(self._pcm[:usable])
+            del self._pcm[:usable]
+        return _pcm16_to_float32(data)
+
+    def drain(self, settle_seconds: float = 0.05, timeout: float = 0.5) -> np.ndarray:
+        """Wait until ffmpeg stops producing output, then ``read`` it.
+
+        Used when the caller needs the audio for everything fed so far
+        (e.g. a client flush) while keeping the decoder running.
+        """
+        deadline = time.monotonic() + timeout
+        previous_size = -1
+        while time.monotonic() < deadline and self.alive:
+            with self._lock:
+                size = len(self._pcm)
+            if size == previous_size:
+                break
+            previous_size = size
+            time.sleep(settle_seconds)
+        return self.read()
+
+    def close(self, timeout: float = 5.0) -> np.ndarray:
+        """Finish the stream and return any PCM still buffered in ffmpeg."""
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+        try:
+            self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning("Streaming decoder did not exit in time, killing it")
+            self._process.kill()
+            self._process.wait()
+
+        self._reader.join(timeout=timeout)
+        return self.read()
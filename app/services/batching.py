@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces concurrent inference requests into batches.
+
+    The first request to arrive opens a batch and starts a short timer;
+    requests submitted before it fires (or until ``max_batch_size`` is
+    reached) are decoded together by ``run_batch``, and each caller's future
+    receives its own result.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[Any]], Awaitable[list[Any]]],
+        max_batch_size: int,
+        window_ms: int,
+        name: str = "batch",
+    ):
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._window_seconds = max(0, window_ms) / 1000
+        self._name = name
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        logger.debug("Running %s with %d item(s)", self._name, len(batch))
+        try:
+            results = await self._run_batch([item for item, _ in batch])
+        except BaseException as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,510 @@
+import importlib
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.schemas.transcription import EngineType, ModelType
+from app.services.audio import SAMPLE_RATE
+from app.services.inference_scheduler import (
+    torch_threads_for_model,
+    workers_for_model,
+)
+from app.services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+except ImportError:  # pragma: no cover - depends on local runtime
+    torch = None
+
+try:
+    import whisper
+except ImportError:  # pragma: no cover - depends on local runtime
+    whisper = None
+
+try:
+    import faster_whisper
+except ImportError:  # pragma: no cover - depends on local runtime
+    faster_whisper = None
+
+
+# Mirrors Whisper's own silence check: a window is dropped when the model is
+# confident there is no speech and the decoded text is unlikely.
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+
+def _batch_result(text: str, duration: float, language: str | None) -> dict:
+    text = text if text.strip() else ""
+    return {
+        "text": text,
+        "segments": [{"start": 0.0, "end": duration, "text": text}] if text else [],
+        "language": language,
+    }
+
+
+def _is_silence(no_speech_prob: float, avg_logprob: float) -> bool:
+    return no_speech_prob > NO_SPEECH_THRESHOLD and avg_logprob < LOGPROB_THRESHOLD
+
+
+# Fraction of the audio decoded so far, reported from the inference thread
+ProgressCallback = Callable[[float], None]
+# A finished ``{"start", "end", "text"}`` segment, reported from the inference thread
+SegmentCallback = Callable[[dict], None]
+
+_progress_state = threading.local()
+
+
+class InferenceCancelled(RuntimeError):
+    """Raised from a progress callback to stop decoding between segments."""
+
+
+def _segment(segment: dict) -> dict:
+    return {"start": segment["start"], "end": segment["end"], "text": segment["text"]}
+
+
+class _ProgressBar:
+    """Stand-in for the tqdm bar ``whisper.transcribe`` advances per window.
+
+    openai-whisper has no progress callback, but it updates a tqdm bar with
+    the mel frames consumed after every 30-second window. The bar forwards
+    the position to the callback registered for the current thread.
+    """
+
+    def __init__(self, total: int | None = None, **_kwargs):
+        self.total = total or 0
+        self.n = 0
+        self._callback = getattr(_progress_state, "callback", None)
+
+    def update(self, n: int = 1) -> None:
+        self.n += n
+        if self._callback is not None and self.total:
+            self._callback(min(1.0, self.n / self.total))
+
+    def __enter__(self) -> "_ProgressBar":
+        return self
+
+    def __exit__(self, *_exc) -> bool:
+        return False
+
+
+class _TqdmShim:
+    tqdm = _ProgressBar
+
+
+def _install_whisper_progress_hook() -> None:
+    if whisper is None:
+        return
+
+    # ``whisper.transcribe`` is the function; the module is looked up by name
+    transcribe_module = importlib.import_module("whisper.transcribe")
+    if transcribe_module.tqdm is not _TqdmShim:
+        transcribe_module.tqdm = _TqdmShim
+    # Mel computation shows up in request traces
+    transcribe_module.log_mel_spectrogram = traced(
+        "mel", transcribe_module.log_mel_spectrogram
+    )
+
+
+def resolve_engine(
+    model_type: ModelType, engine: EngineType | None = None
+) -> EngineType:
+    """Engine for a request: explicit choice, per-model setting, then default."""
+    if engine is not None:
+        return engine
+
+    per_model = getattr(settings, f"whisper_engine_{model_type.value}")
+    return EngineType(per_model or settings.whisper_engine)
+
+
+class WhisperModelAdapter(ABC):
+    """A loaded model, whatever the engine behind it."""
+
+    @abstractmethod
+    def transcribe(
+        self,
+        audio: Any,
+        task: str = "transcribe",
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        **options,
+    ) -> dict:
+        """Decode ``audio`` into ``{"text", "segments", "language"}``."""
+
+    @abstractmethod
+    def transcribe_batch(
+        self, audios: list[np.ndarray], task: str = "transcribe"
+    ) -> list[dict]:
+        """Decode several clips of at most 30 s in one encoder/decoder pass."""
+
+
+class OpenAIWhisperModel(WhisperModelAdapter):
+    """Adapter exposing an ``openai-whisper`` model through the engine API."""
+
+    def __init__(self, model: Any):
+        self.model = model
+        _install_whisper_progress_hook()
+        # Encoder passes show up in request traces; the decoder is the rest
+        encoder = getattr(model, "encoder", None)
+        if encoder is not None:
+            encoder.forward = traced("encoder", encoder.forward)
+
+    def transcribe(
+        self,
+        audio: Any,
+        task: str = "transcribe",
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        **options,
+    ) -> dict:
+        # fp16 is unsupported on CPU and only produces warnings there
+        options.setdefault("fp16", False)
+        _progress_state.callback = progress_callback
+        try:
+            result = self.model.transcribe(audio, task=task, **options)
+        finally:
+            _progress_state.callback = None
+
+        # openai-whisper only hands segments back once the call returns;
+        # recordings long enough to matter stream window by window through
+        # the long-form path, one call per window
+        if segment_callback is not None:
+            for segment in result["segments"]:
+                segment_callback(_segment(segment))
+        return result
+
+    def transcribe_batch(
+        self, audios: list[np.ndarray], task: str = "transcribe"
+    ) -> list[dict]:
+        """Decode several clips of at most 30 s in one encoder/decoder pass."""
+        mel = torch.stack(
+            [
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(audio)),
+                    self.model.dims.n_mels,
+                )
+                for audio in audios
+            ]
+        ).to(self.model.device)
+        results = whisper.decode(
+            self.model,
+            mel,
+            whisper.DecodingOptions(task=task, fp16=False, without_timestamps=True),
+        )
+
+        return [
+            _batch_result(
+                ""
+                if _is_silence(result.no_speech_prob, result.avg_logprob)
+                else result.text,
+                len(audio) / SAMPLE_RATE,
+                result.language,
+            )
+            for audio, result in zip(audios, results)
+        ]
+
+
+class FasterWhisperModel(WhisperModelAdapter):
+    """Adapter exposing a CTranslate2 ``faster-whisper`` model.
+
+    faster-whisper yields segments lazily; they are collected into the same
+    ``{"text", "segments", "language"}`` shape ``openai-whisper`` returns.
+    """
+
+    def __init__(self, model: Any):
+        self.model = model
+        # Feature extraction and encoder passes show up in request traces
+        for attribute, stage in (("feature_extractor", "mel"), ("encode", "encoder")):
+            if hasattr(model, attribute):
+                setattr(model, attribute, traced(stage, getattr(model, attribute)))
+
+    def transcribe(
+        self,
+        audio: Any,
+        task: str = "transcribe",
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        **options,
+    ) -> dict:
+        segments, info = self.model.transcribe(audio, task=task, **options)
+        collected = []
+        for segment in segments:
+            collected.append(
+                {"start": segment.start, "end": segment.end, "text": segment.text}
+            )
+            if segment_callback is not None:
+                segment_callback(collected[-1])
+            if progress_callback is not None and info.duration:
+                progress_callback(min(1.0, segment.end / info.duration))
+        return {
+            "text": "".join(segment["text"] for segment in collected),
+            "segments": collected,
+            "language": info.language,
+        }
+
+    def transcribe_batch(
+        self, audios: list[np.ndarray], task: str = "transcribe"
+    ) -> list[dict]:
+        """Decode several clips of at most 30 s in one encoder/decoder pass."""
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_suppressed_tokens
+
+        model = self.model
+        features = np.stack(
+            [pad_or_trim(model.feature_extractor(audio)) for audio in audios]
+        )
+        encoder_output = model.encode(features)
+
+        if model.model.is_multilingual:
+            # "<|en|>" -> "en", most probable language of each clip
+            languages = [
+                probabilities[0][0][2:-2]
+                for probabilities in model.model.detect_language(encoder_output)
+            ]
+        else:
+            languages = ["en"] * len(audios)
+
+        tokenizers = [
+            Tokenizer(
+                model.hf_tokenizer,
+                model.model.is_multilingual,
+                task=task,
+                language=language,
+            )
+            for language in languages
+        ]
+        results = model.model.generate(
+            encoder_output,
+            [
+                model.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True)
+                for tokenizer in tokenizers
+            ],
+            beam_size=5,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=get_suppressed_tokens(tokenizers[0], [-1]),
+            return_scores=True,
+            return_no_speech_prob=True,
+        )
+
+        outputs = []
+        for audio, tokenizer, language, result in zip(
+            audios, tokenizers, languages, results
+        ):
+            tokens = result.sequences_ids[0]
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            text = (
+                ""
+                if _is_silence(result.no_speech_prob, avg_logprob)
+                else tokenizer.decode(tokens)
+            )
+            outputs.append(_batch_result(text, len(audio) / SAMPLE_RATE, language))
+        return outputs
+
+
+class StubModel(WhisperModelAdapter):
+    """Model stand-in for load tests: no weights, simulated compute.
+
+    Sleeps ``rtf`` seconds per second of audio, as a native engine would
+    without holding the GIL, and answers with one numbered segment per
+    ``STUB_SEGMENT_SECONDS`` of audio. Progress and segments are reported
+    as each segment finishes, so streaming and cancellation behave as with
+    faster-whisper.
+    """
+
+    STUB_SEGMENT_SECONDS = 5.0
+
+    def __init__(self, model_type: ModelType, rtf: float):
+        self.model_type = model_type
+        self.rtf = rtf
+
+    def _text(self, task: str, number: int) -> str:
+        return f" {self.model_type.value} {task} {number}"
+
+    def transcribe(
+        self,
+        audio: Any,
+        task: str = "transcribe",
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        **_options,
+    ) -> dict:
+        duration = len(audio) / SAMPLE_RATE
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + self.STUB_SEGMENT_SECONDS)
+            time.sleep((end - start) * self.rtf)
+            segments.append(
+                {"start": start, "end": end, "text": self._text(task, len(segments) + 1)}
+            )
+            if segment_callback is not None:
+                segment_callback(segments[-1])
+            if progress_callback is not None:
+                progress_callback(end / duration)
+            start = end
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": "en",
+        }
+
+    def transcribe_batch(
+        self, audios: list[np.ndarray], task: str = "transcribe"
+    ) -> list[dict]:
+        time.sleep(max(len(audio) for audio in audios) / SAMPLE_RATE * self.rtf)
+        return [
+            _batch_result(self._text(task, 1), len(audio) / SAMPLE_RATE, "en")
+            for audio in audios
+        ]
+
+
+class WhisperEngine(ABC):
+    engine_type: EngineType
+    package_name: str
+
+    @abstractmethod
+    def _module(self) -> Any:
+        ...
+
+    def ensure_available(self) -> None:
+        if self._module() is None:
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    f"The '{self.package_name}' package is not installed in the "
+                    "current Python environment."
+                ),
+            )
+
+    @abstractmethod
+    def is_model_downloaded(self, model_type: ModelType) -> bool:
+        ...
+
+    @abstractmethod
+    def load(self, model_type: ModelType, device: str) -> WhisperModelAdapter:
+        ...
+
+
+class OpenAIWhisperEngine(WhisperEngine):
+    engine_type = EngineType.OPENAI_WHISPER
+    package_name = "openai-whisper"
+
+    def _module(self) -> Any:
+        return whisper
+
+    def model_download_path(self, model_type: ModelType) -> Path:
+        self.ensure_available()
+        model_url = whisper._MODELS[model_type.value]
+        model_filename = os.path.basename(model_url)
+        cache_dir = Path(settings.whisper_model_cache_dir).expanduser()
+        return cache_dir / model_filename
+
+    def is_model_downloaded(self, model_type: ModelType) -> bool:
+        return self.model_download_path(model_type).is_file()
+
+    def load(self, model_type: ModelType, device: str) -> OpenAIWhisperModel:
+        self.ensure_available()
+        return OpenAIWhisperModel(
+            whisper.load_model(
+                model_type.value,
+                device=device,
+                download_root=settings.whisper_model_cache_dir,
+            )
+        )
+
+
+class FasterWhisperEngine(WhisperEngine):
+    engine_type = EngineType.FASTER_WHISPER
+    package_name = "faster-whisper"
+
+    def _module(self) -> Any:
+        return faster_whisper
+
+    def is_model_downloaded(self, model_type: ModelType) -> bool:
+        self.ensure_available()
+        from faster_whisper.utils import _MODELS
+
+        repo_id = _MODELS[model_type.value]
+        cache_dir = Path(settings.whisper_model_cache_dir).expanduser()
+        snapshots = cache_dir / f"models--{repo_id.replace('/', '--')}" / "snapshots"
+        return any(snapshots.glob("*/model.bin"))
+
+    def load(self, model_type: ModelType, device: str) -> FasterWhisperModel:
+        self.ensure_available()
+        cpu_threads = (
+            settings.faster_whisper_cpu_threads
+            or torch_threads_for_model(model_type)
+        )
+        num_workers = (
+            settings.faster_whisper_num_workers or workers_for_model(model_type)
+        )
+        logger.info(
+            "Loading faster-whisper '%s' (compute_type=%s, cpu_threads=%d, num_workers=%d)",
+            model_type.value,
+            settings.faster_whisper_compute_type,
+            cpu_threads,
+            num_workers,
+        )
+        return FasterWhisperModel(
+            faster_whisper.WhisperModel(
+                model_type.value,
+                device=device,
+                compute_type=settings.faster_whisper_compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+                download_root=settings.whisper_model_cache_dir,
+            )
+        )
+
+
+class StubEngine(WhisperEngine):
+    engine_type = EngineType.STUB
+    package_name = "stub"
+
+    def _module(self) -> Any:
+        # Nothing to import; availability is the opt-in setting alone
+        return None
+
+    def ensure_available(self) -> None:
+        if not settings.stub_engine_enabled:
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    "The stub engine is for load testing and is disabled; "
+                    "set VBZ_STUB_ENGINE_ENABLED=true to use it."
+                ),
+            )
+
+    def is_model_downloaded(self, model_type: ModelType) -> bool:
+        return True
+
+    def load(self, model_type: ModelType, device: str) -> StubModel:
+        self.ensure_available()
+        return StubModel(model_type, settings.stub_engine_rtf)
+
+
+_ENGINES: dict[EngineType, WhisperEngine] = {
+    EngineType.OPENAI_WHISPER: OpenAIWhisperEngine(),
+    EngineType.FASTER_WHISPER: FasterWhisperEngine(),
+    EngineType.STUB: StubEngine(),
+}
+
+
+def get_engine(engine_type: EngineType) -> WhisperEngine:
+    return _ENGINES[engine_type]
+
+
+def load_engine_model(engine_type: EngineType, model_type: ModelType, device: str) -> Any:
+    """Module-level loader so worker processes can load models by engine."""
+    return get_engine(engine_type).load(model_type, device)
@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.schemas.transcription import InferenceLaneStats, ModelType
+from app.services.job_scheduler import (
+    current_priority,
+    priority_rank,
+    waits_for_slot,
+)
+from app.services.metrics import INFERENCE_REJECTED, QUEUE_WAIT_SECONDS
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+except ImportError:  # pragma: no cover - depends on local runtime
+    torch = None
+
+
+def workers_for_model(model_type: ModelType) -> int:
+    """Number of concurrent inference slots configured for a model."""
+    return max(1, int(getattr(settings, f"inference_workers_{model_type.value}")))
+
+
+def torch_threads_for_model(model_type: ModelType) -> int:
+    """Intra-op threads each worker of this model may use.
+
+    When not configured explicitly, the host cores are divided evenly between
+    all worker slots so concurrent inferences do not oversubscribe the CPU.
+    """
+    if settings.inference_torch_threads > 0:
+        return settings.inference_torch_threads
+
+    total_workers = sum(workers_for_model(model) for model in ModelType)
+    return max(1, (os.cpu_count() or 1) // total_workers)
+
+
+def _configure_worker_thread(num_threads: int) -> None:
+    if torch is None:
+        return
+
+    torch.set_num_threads(num_threads)
+
+
+class _ModelLane:
+    """Dedicated worker pool and admission counters for a single model.
+
+    Worker slots are handed out by priority: a caller only submits to the
+    executor once it holds a slot, and a freed slot goes to the waiting
+    caller of the highest priority (realtime chunks before upload jobs
+    before batch jobs), first come first served within a priority.
+    """
+
+    def __init__(self, model_type: ModelType, max_queue_size: int):
+        self.model_type = model_type
+        self.workers = workers_for_model(model_type)
+        self.torch_threads = torch_threads_for_model(model_type)
+        self.max_queue_size = max_queue_size
+        self.active = 0
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._free_slots = self.workers
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix=f"whisper-{model_type.value}",
+            initializer=_configure_worker_thread,
+            initargs=(self.torch_threads,),
+        )
+
+    @property
+    def queued(self) -> int:
+        return self.pending - self.active
+
+    def try_admit(self) -> bool:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue_size:
+                return False
+            self.pending += 1
+            return True
+
+    def admit(self) -> None:
+        """Count a caller that waits for a slot however long the queue is"""
+        with self._lock:
+            self.pending += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def acquire_slot(self, rank: int) -> None:
+        if self._free_slots and not self._waiters:
+            self._free_slots -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._arrivals), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted as the caller gave up; pass it on
+                self.release_slot()
+            raise
+
+    def release_slot(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._free_slots += 1
+
+    def run(self, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.active += 1
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def stats(self) -> InferenceLaneStats:
+        with self._lock:
+            return InferenceLaneStats(
+                model=self.model_type,
+                workers=self.workers,
+                torch_threads=self.torch_threads,
+                active=self.active,
+                queued=self.pending - self.active,
+                max_queue_size=self.max_queue_size,
+            )
+
+
+class InferenceScheduler:
+    """Runs blocking inference calls on bounded, per-model worker pools.
+
+    Each ``ModelType`` owns ``inference_workers_<model>`` threads, so a burst
+    of requests for the same model queues instead of running N copies of the
+    model side by side. Once ``inference_max_queue_size`` requests are waiting
+    for a slot, new ones are rejected with 503 and a ``Retry-After`` header,
+    except background jobs and the later windows of a long recording already
+    being transcribed, which wait for a slot instead (``wait=True``).
+    """
+
+    def __init__(self, max_queue_size: int | None = None):
+        self._max_queue_size = (
+            settings.inference_max_queue_size
+            if max_queue_size is None
+            else max_queue_size
+        )
+        self._lanes: dict[ModelType, _ModelLane] = {}
+        self._lanes_lock = threading.Lock()
+
+    def _lane(self, model_type: ModelType) -> _ModelLane:
+        with self._lanes_lock:
+            lane = self._lanes.get(model_type)
+            if lane is None:
+                lane = _ModelLane(model_type, self._max_queue_size)
+                self._lanes[model_type] = lane
+                logger.info(
+                    "Inference lane for '%s' ready: %d worker(s), %d torch thread(s) each",
+                    model_type.value,
+                    lane.workers,
+                    lane.torch_threads,
+                )
+            return lane
+
+    async def run(
+        self, model_type: ModelType, func: Callable[[], Any], wait: bool = False
+    ) -> Any:
+        """Run ``func`` on one of the model's worker slots.
+
+        Callers that ``wait`` (or run inside a background job) are never
+        rejected; the others get a 503 when the model's queue is full.
+        """
+        lane = self._lane(model_type)
+
+        if wait or waits_for_slot.get():
+            lane.admit()
+        elif not lane.try_admit():
+            logger.warning(
+                "Inference queue for '%s' is full (%d waiting), rejecting request",
+                model_type.value,
+                lane.queued,
+            )
+            INFERENCE_REJECTED.inc(model=model_type)
+            raise HTTPException(
+                status_code=503,
+                detail=(
+                    f"The '{model_type.value}' model is busy. "
+                    "Please retry shortly."
+                ),
+                headers={"Retry-After": str(settings.inference_retry_after_seconds)},
+            )
+
+        loop = asyncio.get_running_loop()
+        try:
+            admitted = time.perf_counter()
+            with span("queue_wait"):
+                await lane.acquire_slot(priority_rank(current_priority.get()))
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - admitted, model=model_type)
+            try:
+                work = lane.executor.submit(lane.run, func)
+            except BaseException:
+                lane.release_slot()
+                raise
+        except BaseException:
+            lane.release()
+            raise
+
+        def finished(_work) -> None:
+            # The slot is free once the worker is, not when the caller stops
+            # waiting: a cancelled caller's thread may still be decoding
+            lane.release()
+            try:
+                loop.call_soon_threadsafe(lane.release_slot)
+            except RuntimeError:
+                # The loop closed while the worker ran
+                pass
+
+        work.add_done_callback(finished)
+        return await asyncio.wrap_future(work)
+
+    def stats(self) -> list[InferenceLaneStats]:
+        return [self._lane(model_type).stats() for model_type in ModelType]
+
+    def shutdown(self) -> None:
+        with self._lanes_lock:
+            lanes = list(self._lanes.values())
+            self._lanes.clear()
+
+        for lane in lanes:
+            lane.executor.shutdown(wait=False, cancel_futures=True)
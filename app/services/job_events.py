@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class JobEventBroker:
+    """Fans job updates out to the clients streaming them.
+
+    Producers ``publish`` from the event loop; every subscriber of the job
+    gets its own bounded queue. A subscriber that falls behind loses its
+    oldest queued updates rather than slowing the job down; status events
+    carry the full job state, so the next one brings it up to date.
+    """
+
+    def __init__(self, max_queued_events: int = 256, keepalive_seconds: float = 15.0):
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._max_queued_events = max_queued_events
+        self._keepalive_seconds = keepalive_seconds
+
+    def publish(self, job_id: str, event: str, data: dict) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+    def subscriber_count(self, job_id: str) -> int:
+        return len(self._subscribers.get(job_id, ()))
+
+    async def stream(
+        self,
+        job_id: str,
+        snapshot: Callable[[], Awaitable[dict | None]],
+        poll_seconds: float | None = None,
+    ) -> AsyncIterator[str]:
+        """SSE messages for a job: its current state, then every update.
+
+        The stream ends after a status event with a terminal status, or
+        right away when ``snapshot`` resolves to ``None`` (the job is gone).
+        ``snapshot`` is a coroutine function, so it can read the job store
+        off the event loop.
+        Updates are only published in the process running the job; for a
+        job running elsewhere, pass ``poll_seconds`` to re-read ``snapshot``
+        at that interval and send a status event whenever it changed.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_queued_events)
+        # Subscribe before reading the snapshot so no update falls in between
+        self._subscribers[job_id].add(queue)
+        try:
+            state = await snapshot()
+            if state is None:
+                return
+            yield format_sse("status", state)
+            if state["status"] in TERMINAL_STATUSES:
+                return
+
+            timeout = min(
+                poll_seconds or self._keepalive_seconds, self._keepalive_seconds
+            )
+            idle = 0.0
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if poll_seconds is not None:
+                        current = await snapshot()
+                        if current is None:
+                            return
+                        if current != state:
+                            state, idle = current, 0.0
+                            yield format_sse("status", state)
+                            if state["status"] in TERMINAL_STATUSES:
+                                return
+                            continue
+
+                    idle += timeout
+                    if idle >= self._keepalive_seconds:
+                        # Comment line keeps proxies from closing an idle stream
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+                    continue
+
+                idle = 0.0
+                yield format_sse(event, data)
+                if event == "status":
+                    state = data
+                    if data["status"] in TERMINAL_STATUSES:
+                        return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+
+job_events = JobEventBroker()
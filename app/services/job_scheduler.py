@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Mapping
+
+from app.core.config import settings
+from app.schemas.transcription import JobPriority
+
+logger = logging.getLogger(__name__)
+
+# Dispatch order of the priority classes
+PRIORITY_ORDER = (JobPriority.REALTIME, JobPriority.INTERACTIVE, JobPriority.BATCH)
+
+# Priority of the work running in the current task; inference slots are
+# handed out in this order (see InferenceScheduler)
+current_priority: ContextVar[JobPriority] = ContextVar(
+    "current_priority", default=JobPriority.INTERACTIVE
+)
+
+
+# Whether inference started by the current task waits for a worker slot
+# once the model's queue is full, rather than being rejected with 503;
+# background jobs have no client that could retry them
+waits_for_slot: ContextVar[bool] = ContextVar("waits_for_slot", default=False)
+
+
+def priority_rank(priority: JobPriority) -> int:
+    return PRIORITY_ORDER.index(priority)
+
+
+def client_key(headers: Mapping[str, str], fallback: str | None) -> str:
+    """Identify the client a job is queued for.
+
+    Clients presenting an API key or the app secret are told apart by it
+    (hashed, so no credential ends up in job state); anonymous ones by
+    their address.
+    """
+    credential = headers.get("x-api-key") or headers.get("x-app-secret")
+    if credential:
+        return "key:" + hashlib.sha256(credential.encode()).hexdigest()[:16]
+    return f"addr:{fallback or 'unknown'}"
+
+
+@dataclass
+class _QueuedJob:
+    job_id: str
+    client: str
+    priority: JobPriority
+    run: Callable[[], Awaitable[None]]
+    on_position: Callable[[int | None], None] | None = None
+
+
+class JobScheduler:
+    """Starts background jobs in priority order, fairly across clients.
+
+    At most ``max_concurrent`` jobs run at once. Waiting jobs are taken from
+    the highest priority class that has any; within a class, clients take
+    turns one job at a time, so a client with fifty queued files delays
+    another client's single file by at most one job.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self._queues: dict[JobPriority, OrderedDict[str, deque[_QueuedJob]]] = {
+            priority: OrderedDict() for priority in PRIORITY_ORDER
+        }
+        self._jobs: dict[str, _QueuedJob] = {}
+        self._positions: dict[str, int] = {}
+        self._running = 0
+        # The event loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_settings(cls) -> "JobScheduler":
+        return cls(max_concurrent=settings.job_max_concurrent)
+
+    def submit(
+        self,
+        job_id: str,
+        client: str,
+        priority: JobPriority,
+        run: Callable[[], Awaitable[None]],
+        on_position: Callable[[int | None], None] | None = None,
+    ) -> None:
+        """Queue ``run`` to be started once it reaches the front.
+
+        ``on_position`` is told the number of jobs ahead whenever it changes
+        and ``None`` when the job starts or is cancelled.
+        """
+        job = _QueuedJob(job_id, client, priority, run, on_position)
+        self._queues[priority].setdefault(client, deque()).append(job)
+        self._jobs[job_id] = job
+        self._dispatch()
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that has not started yet."""
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+
+        clients = self._queues[job.priority]
+        clients[job.client].remove(job)
+        if not clients[job.client]:
+            del clients[job.client]
+        self._positions.pop(job_id, None)
+        if job.on_position is not None:
+            job.on_position(None)
+        self._publish_positions()
+        return True
+
+    def position(self, job_id: str) -> int | None:
+        return self._positions.get(job_id)
+
+    def _pop_next(self) -> _QueuedJob | None:
+        for priority in PRIORITY_ORDER:
+            clients = self._queues[priority]
+            if not clients:
+                continue
+            client, jobs = next(iter(clients.items()))
+            job = jobs.popleft()
+            # The client goes to the back of the rotation
+            del clients[client]
+            if jobs:
+                clients[client] = jobs
+            return job
+        return None
+
+    def _order(self) -> list[str]:
+        """Queued job ids in the order they will start."""
+        order = []
+        for priority in PRIORITY_ORDER:
+            rotation = [list(jobs) for jobs in self._queues[priority].values()]
+            for turn in range(max(map(len, rotation), default=0)):
+                order.extend(jobs[turn].job_id for jobs in rotation if turn < len(jobs))
+        return order
+
+    def _publish_positions(self) -> None:
+        for position, job_id in enumerate(self._order()):
+            if self._positions.get(job_id) == position:
+                continue
+            self._positions[job_id] = position
+            job = self._jobs[job_id]
+            if job.on_position is not None:
+                job.on_position(position)
+
+    def _dispatch(self) -> None:
+        while self._running < self.max_concurrent:
+            job = self._pop_next()
+            if job is None:
+                break
+            del self._jobs[job.job_id]
+            self._positions.pop(job.job_id, None)
+            self._running += 1
+            if job.on_position is not None:
+                job.on_position(None)
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._publish_positions()
+
+    async def _run(self, job: _QueuedJob) -> None:
+        # Inference started by this job waits for slots at the job's priority
+        current_priority.set(job.priority)
+        waits_for_slot.set(True)
+        try:
+            await job.run()
+        except Exception:
+            logger.exception("Background job %s failed", job.job_id)
+        finally:
+            self._running -= 1
+            self._dispatch()
+
+    async def shutdown(self, timeout: float | None = None) -> None:
+        """Start no more jobs and wait up to ``timeout`` for the running ones."""
+        for clients in self._queues.values():
+            clients.clear()
+        self._jobs.clear()
+        self._positions.clear()
+        if not self._tasks:
+            return
+
+        grace = settings.job_shutdown_grace_seconds if timeout is None else timeout
+        _, pending = await asyncio.wait(set(self._tasks), timeout=grace)
+        if pending:
+            logger.warning(
+                "Stopping with %d background job(s) still running", len(pending)
+            )
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._running,
+            "queued": {
+                priority.value: sum(len(jobs) for jobs in self._queues[priority].values())
+                for priority in PRIORITY_ORDER
+            },
+        }
+
+
+job_scheduler = JobScheduler.from_settings()
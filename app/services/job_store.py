@@ -0,0 +1,464 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses of jobs that are still owned by the worker running them
+ACTIVE_STATUSES = ("queued", "processing")
+# Statuses a job never leaves; only these expire
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Fields a running job updates on every progress tick
+_PROGRESS_FIELDS = ("progress", "stage", "queue_position")
+
+# Identifies this server process in the jobs it owns: host, pid and a
+# per-boot token, so a restarted process reusing the pid (pid 1 in a
+# container) does not mistake its predecessor's jobs for its own.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _stamp_finish(job: dict) -> dict:
+    """Record when a job reached a terminal status, for expiry."""
+    if job.get("status") in TERMINAL_STATUSES and not job.get("finished_at"):
+        job["finished_at"] = time.time()
+    return job
+
+
+def _finished_at(job: dict) -> float:
+    return job.get("finished_at") or job.get("created_at", 0.0)
+
+
+def _owner_is_gone(owner: str | None) -> bool:
+    """Whether the process that owns a job has certainly stopped."""
+    if not owner:
+        return True
+
+    host, pid = (owner.split(":") + [""])[:2]
+    if host != socket.gethostname() or not pid.isdigit():
+        # Another machine's (or malformed) owner; nothing can be checked
+        return False
+    if int(pid) == os.getpid():
+        return owner != WORKER_ID
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class MemoryJobStore:
+    """Jobs held in this process only; lost on restart.
+
+    Only finished jobs expire, counted from when they finished; queued and
+    running jobs are kept however long they take.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: dict) -> dict:
+        job = _stamp_finish({**job, "owner": WORKER_ID})
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **changes) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(changes)
+            _stamp_finish(job)
+            return dict(job)
+
+    def transition(
+        self, job_id: str, from_statuses: tuple[str, ...], **changes
+    ) -> dict | None:
+        """Apply ``changes`` only if the job is in one of ``from_statuses``."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in from_statuses:
+                return None
+            job.update(changes)
+            _stamp_finish(job)
+            return dict(job)
+
+    def append_segment(self, job_id: str, segment: dict) -> int | None:
+        """Add a segment to the job; its index, or ``None`` if the job is gone."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job["segments"] = [*job.get("segments", []), segment]
+            return len(job["segments"]) - 1
+
+    def delete(self, job_id: str) -> dict | None:
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+    def purge_expired(self, kind: str, finished_before: float) -> list[dict]:
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.get("kind") == kind
+                and job["status"] in TERMINAL_STATUSES
+                and _finished_at(job) < finished_before
+            ]
+            return [self._jobs.pop(job_id) for job_id in expired]
+
+    def claim_orphans(self, kind: str) -> list[dict]:
+        # Nothing outlives this process
+        return []
+
+    def count_by_status(self) -> dict[tuple[str, str], int]:
+        """Number of jobs per ``(kind, status)``."""
+        with self._lock:
+            return dict(
+                Counter(
+                    (job.get("kind", ""), job["status"])
+                    for job in self._jobs.values()
+                )
+            )
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobStore:
+    """Jobs in a SQLite database shared by every worker on the host.
+
+    The database runs in WAL mode so status reads from any worker never
+    block the writes of the worker running the job. Each job is one row:
+    the fields queried on (kind, status, owner, created_at, finished_at)
+    and the ones updated on every progress tick (progress, stage,
+    queue_position) are columns, with an index on ``(kind, finished_at)``
+    for expiry, and the rest of the job is a JSON document. Segments are rows
+    of their own, so streaming one is a single insert however long the
+    transcript grows. Updates run inside an immediate transaction, so
+    concurrent writers never lose each other's changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection serialised by the lock; autocommit with explicit
+        # transactions where a read feeds a write
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=10.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                created_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_segments (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+            """
+        )
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Bring a database written by an earlier version up to date."""
+        with self._transaction():
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")
+            }
+            if "finished_at" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN finished_at REAL")
+                # Jobs that finished before the column existed expire by age
+                placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+                self._conn.execute(
+                    f"UPDATE jobs SET finished_at = created_at"
+                    f" WHERE status IN ({placeholders})",
+                    tuple(TERMINAL_STATUSES),
+                )
+            self._conn.execute("DROP INDEX IF EXISTS jobs_finished_at")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_kind_finished_at"
+                " ON jobs (kind, finished_at)"
+            )
+            if "progress" in columns:
+                return
+
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN progress INTEGER")
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN stage TEXT")
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN queue_position INTEGER")
+            # Move progress and segments out of the documents
+            rows = self._conn.execute("SELECT data, finished_at FROM jobs").fetchall()
+            for data, finished_at in rows:
+                job = json.loads(data)
+                if finished_at is not None:
+                    job["finished_at"] = finished_at
+                self._write(job)
+                self._insert_segments(job["job_id"], job.get("segments") or [])
+
+    def _write(self, job: dict) -> None:
+        _stamp_finish(job)
+        document = {
+            key: value
+            for key, value in job.items()
+            if key != "segments" and key not in _PROGRESS_FIELDS
+        }
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, kind, status, owner, created_at,"
+            " finished_at, progress, stage, queue_position, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job["job_id"],
+                job.get("kind", ""),
+                job["status"],
+                job.get("owner"),
+                job.get("created_at", 0.0),
+                job.get("finished_at") if job["status"] in TERMINAL_STATUSES else None,
+                *(job.get(field) for field in _PROGRESS_FIELDS),
+                json.dumps(document),
+            ),
+        )
+
+    def _insert_segments(self, job_id: str, segments: list, start: int = 0) -> None:
+        self._conn.executemany(
+            "INSERT INTO job_segments (job_id, position, data) VALUES (?, ?, ?)",
+            [
+                (job_id, position, json.dumps(segment))
+                for position, segment in enumerate(segments, start)
+            ],
+        )
+
+    def _read(self, job_id: str) -> dict | None:
+        row = self._conn.execute(
+            "SELECT data, owner, progress, stage, queue_position FROM jobs"
+            " WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = json.loads(row[0])
+        job["owner"] = row[1]
+        job.update(
+            (field, value)
+            for field, value in zip(_PROGRESS_FIELDS, row[2:])
+            if value is not None
+        )
+        job["segments"] = [
+            json.loads(data)
+            for (data,) in self._conn.execute(
+                "SELECT data FROM job_segments WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            )
+        ]
+        return job
+
+    def _delete(self, job_ids: list[str]) -> None:
+        for table in ("job_segments", "jobs"):
+            self._conn.executemany(
+                f"DELETE FROM {table} WHERE job_id = ?",
+                [(job_id,) for job_id in job_ids],
+            )
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the database write lock, across processes, for the block."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _modify(
+        self, job_id: str, from_statuses: tuple[str, ...] | None, changes: dict
+    ) -> dict | None:
+        changes = dict(changes)
+        with self._transaction():
+            if changes and changes.keys() <= set(_PROGRESS_FIELDS):
+                # A progress tick: set its columns, leave the document alone
+                query = (
+                    "UPDATE jobs SET "
+                    + ", ".join(f"{field} = ?" for field in changes)
+                    + " WHERE job_id = ?"
+                )
+                params = [*changes.values(), job_id]
+                if from_statuses is not None:
+                    query += f" AND status IN ({', '.join('?' for _ in from_statuses)})"
+                    params.extend(from_statuses)
+                if self._conn.execute(query, params).rowcount == 0:
+                    return None
+                return self._read(job_id)
+
+            job = self._read(job_id)
+            if job is None or (
+                from_statuses is not None and job["status"] not in from_statuses
+            ):
+                return None
+            segments = changes.pop("segments", None)
+            job.update(changes)
+            self._write(job)
+            if segments is not None:
+                self._conn.execute(
+                    "DELETE FROM job_segments WHERE job_id = ?", (job_id,)
+                )
+                self._insert_segments(job_id, segments)
+                job["segments"] = list(segments)
+        return job
+
+    def create(self, job: dict) -> dict:
+        job = {**job, "owner": WORKER_ID}
+        with self._transaction():
+            self._write(job)
+            self._insert_segments(job["job_id"], job.get("segments") or [])
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            return self._read(job_id)
+
+    def update(self, job_id: str, **changes) -> dict | None:
+        return self._modify(job_id, None, changes)
+
+    def transition(
+        self, job_id: str, from_statuses: tuple[str, ...], **changes
+    ) -> dict | None:
+        """Apply ``changes`` only if the job is in one of ``from_statuses``."""
+        return self._modify(job_id, from_statuses, changes)
+
+    def append_segment(self, job_id: str, segment: dict) -> int | None:
+        """Add a segment to the job; its index, or ``None`` if the job is gone."""
+        with self._transaction():
+            if self._conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone() is None:
+                return None
+            (position,) = self._conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM job_segments"
+                " WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            self._insert_segments(job_id, [segment], position)
+        return position
+
+    def delete(self, job_id: str) -> dict | None:
+        with self._transaction():
+            job = self._read(job_id)
+            self._delete([job_id])
+        return job
+
+    def purge_expired(self, kind: str, finished_before: float) -> list[dict]:
+        # Only terminal jobs carry finished_at, so a range on the
+        # (kind, finished_at) index finds exactly the expired ones
+        with self._transaction():
+            job_ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE kind = ? AND finished_at < ?",
+                    (kind, finished_before),
+                )
+            ]
+            expired = [self._read(job_id) for job_id in job_ids]
+            self._delete(job_ids)
+        return expired
+
+    def claim_orphans(self, kind: str) -> list[dict]:
+        """Take over unfinished jobs whose worker process has stopped."""
+        placeholders = ", ".join("?" for _ in ACTIVE_STATUSES)
+        claimed = []
+        with self._transaction():
+            rows = self._conn.execute(
+                f"SELECT job_id, owner FROM jobs"
+                f" WHERE kind = ? AND status IN ({placeholders})",
+                (kind, *ACTIVE_STATUSES),
+            ).fetchall()
+            for job_id, owner in rows:
+                if _owner_is_gone(owner):
+                    self._conn.execute(
+                        "UPDATE jobs SET owner = ? WHERE job_id = ?",
+                        (WORKER_ID, job_id),
+                    )
+                    claimed.append(self._read(job_id))
+        return claimed
+
+    def count_by_status(self) -> dict[tuple[str, str], int]:
+        """Number of jobs per ``(kind, status)``, across every worker."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status"
+            ).fetchall()
+        return {(kind, status): count for kind, status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_store() -> MemoryJobStore | SQLiteJobStore:
+    if settings.job_store_backend == "sqlite":
+        logger.info("Keeping jobs in SQLite at %s", settings.job_store_path)
+        return SQLiteJobStore(settings.job_store_path)
+    return MemoryJobStore()
+
+
+job_store = create_job_store()
+
+# Writes issued from the event loop run here, one at a time and in the order
+# they were issued: a busy database never stalls the loop, and a job's
+# segments are stored in the order they were produced.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+
+
+def store_write(func: Callable[..., Any], *args, **kwargs) -> asyncio.Future:
+    """Run a store call on the writer thread; the future resolves to its result."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(_writer, functools.partial(func, *args, **kwargs))
+
+
+def store_read(func: Callable[..., Any], *args, **kwargs) -> asyncio.Future:
+    """Run a store read on a worker thread, off the event loop.
+
+    Reads skip the writer queue: the database serialises them against
+    writes itself, and a status poll shouldn't wait behind progress ticks.
+    """
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def flush_store_writes() -> None:
+    """Block until every write issued so far has been applied."""
+    _writer.submit(lambda: None).result()
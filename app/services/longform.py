@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from app.services.audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Frame used to look for silences when choosing cut points
+_FRAME_SAMPLES = SAMPLE_RATE // 50  # 20 ms
+# Longest run of words compared when removing text repeated across a cut
+_MAX_OVERLAP_WORDS = 8
+
+
+@dataclass(frozen=True)
+class AudioWindow:
+    """One piece of a long recording.
+
+    ``start``/``end`` delimit the audio this window is responsible for;
+    ``audio_start`` reaches back into the previous window by the overlap so
+    words spoken across the cut keep their context.
+    """
+
+    index: int
+    audio_start: int
+    start: int
+    end: int
+
+
+def _quietest_point(audio: np.ndarray, lo: int, hi: int) -> int:
+    """Sample index of the lowest-energy 20 ms frame in ``[lo, hi)``."""
+    usable = (hi - lo) // _FRAME_SAMPLES * _FRAME_SAMPLES
+    if usable <= 0:
+        return hi
+
+    frames = audio[lo : lo + usable].reshape(-1, _FRAME_SAMPLES)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    # Prefer the latest of equally quiet frames to keep windows long
+    quietest = len(energy) - 1 - int(np.argmin(energy[::-1]))
+    return lo + quietest * _FRAME_SAMPLES + _FRAME_SAMPLES // 2
+
+
+def plan_windows(
+    audio: np.ndarray,
+    window_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+) -> list[AudioWindow]:
+    """Split ``audio`` into windows of at most ``window_seconds`` (overlap
+    included), cutting at the quietest point of the last ``search_seconds``
+    before each limit so cuts fall in pauses rather than mid-word.
+    """
+    total = len(audio)
+    max_length = int(window_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    if overlap >= max_length:
+        # No window would get past the previous one's overlap
+        raise ValueError("overlap_seconds must be shorter than window_seconds")
+    search = int(search_seconds * sample_rate)
+
+    windows: list[AudioWindow] = []
+    start = 0
+    while True:
+        audio_start = max(0, start - overlap)
+        limit = audio_start + max_length
+        if limit >= total:
+            windows.append(AudioWindow(len(windows), audio_start, start, total))
+            return windows
+
+        cut = _quietest_point(audio, max(start + 1, limit - search), limit)
+        windows.append(AudioWindow(len(windows), audio_start, start, cut))
+        start = cut
+
+
+def _words(text: str) -> list[str]:
+    return text.split()
+
+
+def _normalized(word: str) -> str:
+    return word.strip(".,!?;:\"'«»¿¡").lower()
+
+
+def _repeated_prefix_length(previous: list[str], current: list[str]) -> int:
+    """Number of leading words of ``current`` that repeat the end of ``previous``."""
+    longest = min(_MAX_OVERLAP_WORDS, len(previous), len(current))
+    for length in range(longest, 0, -1):
+        if [_normalized(word) for word in previous[-length:]] == [
+            _normalized(word) for word in current[:length]
+        ]:
+            return length
+    return 0
+
+
+class WindowStitcher:
+    """Merges per-window results into the recording's segments as they arrive.
+
+    Segment timestamps are shifted to the recording's timeline. Segments
+    whose midpoint falls in a window's overlap belong to the previous
+    window and are dropped; words still repeated across the cut are
+    removed from the start of the later window. Windows may finish in any
+    order but are stitched in window order, so ``add`` returns the segments
+    that became final with that result (possibly none, possibly several
+    windows' worth).
+    """
+
+    def __init__(self, windows: list[AudioWindow], sample_rate: int = SAMPLE_RATE):
+        self._windows = windows
+        self._sample_rate = sample_rate
+        self._pending: dict[int, dict] = {}
+        self._next = 0
+        self._language: str | None = None
+        self.segments: list[dict] = []
+        self._words: list[str] = []
+
+    def add(self, index: int, result: dict) -> list[dict]:
+        self._pending[index] = result
+        emitted: list[dict] = []
+        while self._next in self._pending:
+            result = self._pending.pop(self._next)
+            emitted.extend(self._stitch(self._windows[self._next], result))
+            self._language = self._language or result.get("language")
+            self._next += 1
+        return emitted
+
+    def _stitch(self, window: AudioWindow, result: dict) -> list[dict]:
+        offset = window.audio_start / self._sample_rate
+        boundary = window.start / self._sample_rate
+        window_segments = result.get("segments") or [
+            {
+                "start": 0.0,
+                "end": (window.end - window.audio_start) / self._sample_rate,
+                "text": result.get("text", ""),
+            }
+        ]
+
+        emitted = []
+        for segment in window_segments:
+            start = offset + float(segment["start"])
+            end = offset + float(segment["end"])
+            if window.index > 0 and (start + end) / 2 < boundary:
+                continue
+
+            segment_words = _words(segment["text"])
+            if self.segments and start < boundary + 1.0:
+                # Right after a cut, drop words the previous window already had
+                segment_words = segment_words[
+                    _repeated_prefix_length(self._words, segment_words) :
+                ]
+            if not segment_words:
+                continue
+
+            self._words.extend(segment_words)
+            stitched = {"start": start, "end": end, "text": " ".join(segment_words)}
+            self.segments.append(stitched)
+            emitted.append(stitched)
+        return emitted
+
+    def result(self) -> dict:
+        return {
+            "text": " ".join(self._words),
+            "segments": self.segments,
+            "language": self._language,
+        }
+
+
+def stitch_windows(
+    windows: list[AudioWindow],
+    results: list[dict],
+    sample_rate: int = SAMPLE_RATE,
+) -> dict:
+    """Merge per-window results into one ``{"text", "segments"}`` result."""
+    stitcher = WindowStitcher(windows, sample_rate)
+    for window, result in zip(windows, results):
+        stitcher.add(window.index, result)
+    return stitcher.result()
+
+
+async def transcribe_windows(
+    audio: np.ndarray,
+    windows: list[AudioWindow],
+    run_window: Callable[[np.ndarray, Callable[[float], None]], Awaitable[dict]],
+    concurrency: int,
+    on_progress: Callable[[float], None] | None = None,
+    on_window_result: Callable[[int, dict], None] | None = None,
+) -> list[dict]:
+    """Transcribe ``windows`` with at most ``concurrency`` in flight.
+
+    ``run_window`` receives the window's audio and a callback for the
+    fraction of it decoded so far, which may be called from any thread.
+    ``on_progress`` gets the fraction of the whole recording decoded, on the
+    event loop. ``on_window_result`` gets each window's index and result as
+    soon as it finishes. Results are returned in window order.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    lengths = [window.end - window.audio_start for window in windows]
+    total = sum(lengths) or 1
+    fractions = [0.0] * len(windows)
+
+    def set_fraction(index: int, fraction: float) -> None:
+        fractions[index] = max(fractions[index], fraction)
+        if on_progress is not None:
+            on_progress(
+                sum(part * length for part, length in zip(fractions, lengths)) / total
+            )
+
+    async def run(window: AudioWindow) -> dict:
+        async with semaphore:
+            result = await run_window(
+                audio[window.audio_start : window.end],
+                lambda fraction: loop.call_soon_threadsafe(
+                    set_fraction, window.index, fraction
+                ),
+            )
+        set_fraction(window.index, 1.0)
+        if on_window_result is not None:
+            on_window_result(window.index, result)
+        return result
+
+    logger.info(
+        "Transcribing %.0f s of audio as %d window(s), %d at a time",
+        len(audio) / SAMPLE_RATE,
+        len(windows),
+        concurrency,
+    )
+    tasks = [asyncio.ensure_future(run(window)) for window in windows]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # One failed window fails the recording; stop the rest
+        for task in tasks:
+            task.cancel()
+        raise
@@ -0,0 +1,240 @@
+"""Process-wide metrics in the Prometheus text exposition format.
+
+Recording a value is a dictionary update under a lock, cheap enough to
+stay on in production. Every server process keeps its own values, so with
+several uvicorn workers each one is scraped; job counts are the exception,
+read from the shared job store when scraped.
+"""
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+
+# Seconds, from a realtime window to a long-form recording
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Processing seconds per second of audio
+REALTIME_FACTOR_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        # Enum members are labelled by their value
+        return tuple(
+            str(getattr(labels[name], "value", labels[name]))
+            for name in self.label_names
+        )
+
+    @abstractmethod
+    def _samples(self):
+        """``(suffix, label names, label values, value)`` per exposed sample"""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, names, values, value in self._samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", self.label_names, key, value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def replace(self, values: dict[tuple[str, ...], float]) -> None:
+        """Swap in a full set of samples, e.g. counts taken when scraped"""
+        with self._lock:
+            self._values = dict(values)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket counts, then the sum; cumulated when rendered
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[:-1]) if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        names = self.label_names + ("le",)
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield "_bucket", names, key + (_format_value(bound),), cumulative
+            yield "_count", self.label_names, key, cumulative
+            yield "_sum", self.label_names, key, state[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+MODEL_LOAD_SECONDS = registry.register(
+    Histogram(
+        "verbalaize_model_load_seconds",
+        "Time to load a model into memory",
+        ("model", "engine"),
+    )
+)
+DECODE_SECONDS = registry.register(
+    Histogram("verbalaize_decode_seconds", "Time to decode uploaded audio with ffmpeg")
+)
+INFERENCE_SECONDS = registry.register(
+    Histogram(
+        "verbalaize_inference_seconds",
+        "Time a worker spent on one inference call (a whole micro-batch)",
+        ("model", "task"),
+    )
+)
+AUDIO_SECONDS = registry.register(
+    Counter(
+        "verbalaize_audio_processed_seconds_total",
+        "Seconds of audio fed to the models, after VAD and speedup",
+        ("model", "task"),
+    )
+)
+REALTIME_FACTOR = registry.register(
+    Histogram(
+        "verbalaize_realtime_factor",
+        "Inference seconds per second of audio",
+        ("model", "task"),
+        REALTIME_FACTOR_BUCKETS,
+    )
+)
+QUEUE_WAIT_SECONDS = registry.register(
+    Histogram(
+        "verbalaize_queue_wait_seconds",
+        "Time an admitted inference waited for a worker slot",
+        ("model",),
+    )
+)
+INFERENCE_REJECTED = registry.register(
+    Counter(
+        "verbalaize_inference_rejected_total",
+        "Inferences rejected with 503 because the model's queue was full",
+        ("model",),
+    )
+)
+WEBSOCKET_SESSIONS = registry.register(
+    Gauge("verbalaize_websocket_sessions", "Open realtime WebSocket sessions")
+)
+WEBSOCKET_RECEIVED_BYTES = registry.register(
+    Counter(
+        "verbalaize_websocket_received_bytes_total",
+        "Audio bytes received on realtime WebSocket sessions",
+    )
+)
+UPLOAD_RECEIVED_BYTES = registry.register(
+    Counter(
+        "verbalaize_upload_received_bytes_total",
+        "Request body bytes received on upload routes, rejected uploads included",
+    )
+)
+RESULT_CACHE_LOOKUPS = registry.register(
+    Counter(
+        "verbalaize_result_cache_lookups_total",
+        "Result cache lookups by outcome (hit or miss)",
+        ("result",),
+    )
+)
+JOBS = registry.register(
+    Gauge("verbalaize_jobs", "Background jobs in the job store", ("kind", "status"))
+)
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.schemas.transcription import (
+    EngineType,
+    ModelResidencyResponse,
+    ModelType,
+    ResidencyEvent,
+    ResidentModelStats,
+)
+from app.services.inference_scheduler import workers_for_model
+
+logger = logging.getLogger(__name__)
+
+# Parameter counts of the Whisper checkpoints
+MODEL_PARAMETERS = {
+    ModelType.SMALL: 244_000_000,
+    ModelType.MEDIUM: 769_000_000,
+    ModelType.TURBO: 809_000_000,
+}
+
+# Bytes per weight for faster-whisper's CTranslate2 compute types
+_COMPUTE_TYPE_BYTES = {
+    "int8": 1,
+    "int8_float32": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "int16": 2,
+    "float16": 2,
+    "bfloat16": 2,
+    "float32": 4,
+}
+
+# Activations, decoder caches and allocator slack on top of the weights
+_RUNTIME_OVERHEAD = 1.25
+
+
+def estimate_model_bytes(engine: EngineType, model_type: ModelType) -> int:
+    """Rough resident memory of one loaded model, before it is loaded.
+
+    ``openai-whisper`` keeps fp32 weights in RAM; faster-whisper's size
+    follows its compute type. In process mode every worker process holds
+    its own copy.
+    """
+    if engine == EngineType.STUB:
+        return 0
+    if engine == EngineType.FASTER_WHISPER:
+        bytes_per_weight = _COMPUTE_TYPE_BYTES.get(
+            settings.faster_whisper_compute_type, 4
+        )
+    else:
+        bytes_per_weight = 4
+
+    estimate = MODEL_PARAMETERS[model_type] * bytes_per_weight * _RUNTIME_OVERHEAD
+    if settings.inference_mode == "process":
+        estimate *= workers_for_model(model_type)
+    return int(estimate)
+
+
+@dataclass
+class _Resident:
+    engine: EngineType
+    model_type: ModelType
+    estimated_bytes: int
+    loaded_at: float
+    last_used_at: float
+
+
+class ModelResidencyManager:
+    """Tracks loaded models against a memory budget.
+
+    The service pins a model key for the duration of every request that
+    uses it. Before a new model is loaded, ``plan_eviction`` picks the
+    least recently used resident models that are not pinned until the new
+    one fits; pinned models are never chosen. When nothing more can be
+    evicted the load proceeds over budget and a warning is logged.
+    """
+
+    def __init__(self, budget_bytes: int = 0, event_history: int = 50):
+        self.budget_bytes = max(0, budget_bytes)
+        self._resident: OrderedDict[str, _Resident] = OrderedDict()
+        self._in_flight: Counter[str] = Counter()
+        self._events: deque[ResidencyEvent] = deque(maxlen=event_history)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ModelResidencyManager":
+        return cls(budget_bytes=settings.model_memory_budget_mb * 1024 * 1024)
+
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.estimated_bytes for entry in self._resident.values())
+
+    def pin(self, key: str) -> None:
+        with self._lock:
+            self._in_flight[key] += 1
+            entry = self._resident.get(key)
+            if entry is not None:
+                entry.last_used_at = time.time()
+                self._resident.move_to_end(key)
+
+    def unpin(self, key: str) -> None:
+        with self._lock:
+            self._in_flight[key] -= 1
+            if self._in_flight[key] <= 0:
+                del self._in_flight[key]
+
+    def plan_eviction(self, key: str, needed_bytes: int) -> list[str]:
+        """Idle resident models to unload so ``needed_bytes`` fits the budget."""
+        if not self.budget_bytes:
+            return []
+
+        with self._lock:
+            used = sum(entry.estimated_bytes for entry in self._resident.values())
+            victims = []
+            for candidate, entry in self._resident.items():
+                if used + needed_bytes <= self.budget_bytes:
+                    break
+                if candidate == key or self._in_flight[candidate]:
+                    continue
+                victims.append(candidate)
+                used -= entry.estimated_bytes
+
+        if used + needed_bytes > self.budget_bytes:
+            logger.warning(
+                "Loading '%s' exceeds the model memory budget (%d of %d MB); "
+                "all other resident models are busy",
+                key,
+                (used + needed_bytes) // (1024 * 1024),
+                self.budget_bytes // (1024 * 1024),
+            )
+        return victims
+
+    def loaded(
+        self,
+        key: str,
+        engine: EngineType,
+        model_type: ModelType,
+        estimated_bytes: int,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._resident[key] = _Resident(
+                engine, model_type, estimated_bytes, now, now
+            )
+            self._resident.move_to_end(key)
+            self._record("load", key, estimated_bytes, now)
+
+    def evicted(self, key: str) -> None:
+        with self._lock:
+            entry = self._resident.pop(key, None)
+            if entry is not None:
+                self._record("evict", key, entry.estimated_bytes, time.time())
+
+    def is_idle(self, key: str) -> bool:
+        with self._lock:
+            return not self._in_flight[key]
+
+    def _record(self, event: str, key: str, estimated_bytes: int, timestamp: float):
+        self._events.append(
+            ResidencyEvent(
+                timestamp=timestamp,
+                event=event,
+                key=key,
+                estimated_bytes=estimated_bytes,
+            )
+        )
+        logger.info(
+            "Model %s: %s (~%d MB)", event, key, estimated_bytes // (1024 * 1024)
+        )
+
+    def stats(self) -> ModelResidencyResponse:
+        with self._lock:
+            return ModelResidencyResponse(
+                budget_bytes=self.budget_bytes,
+                used_bytes=sum(
+                    entry.estimated_bytes for entry in self._resident.values()
+                ),
+                models=[
+                    ResidentModelStats(
+                        key=key,
+                        engine=entry.engine,
+                        model=entry.model_type,
+                        estimated_bytes=entry.estimated_bytes,
+                        in_flight=self._in_flight[key],
+                        loaded_at=entry.loaded_at,
+                        last_used_at=entry.last_used_at,
+                    )
+                    for key, entry in self._resident.items()
+                ],
+                events=list(self._events),
+            )
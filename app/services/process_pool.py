@@ -0,0 +1,321 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from typing import Any, Callable
+
+from app.schemas.transcription import EngineType, ModelType
+from app.services.engines import InferenceCancelled, load_engine_model
+
+logger = logging.getLogger(__name__)
+
+# Workers are always spawned: forking a process that already initialised
+# torch (and its thread pools) is unsafe.
+_mp_context = multiprocessing.get_context("spawn")
+
+_RESULT_KEYS = ("text", "segments", "language")
+
+
+class InferenceWorkerCrashed(RuntimeError):
+    """Raised when a worker process dies while serving a request."""
+
+
+def _compact_result(result: dict) -> dict:
+    # Only ship what callers use back over the pipe; token lists are large.
+    compact = {key: result[key] for key in _RESULT_KEYS if key in result}
+    compact["segments"] = [
+        {
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": segment["text"],
+        }
+        for segment in compact.get("segments", [])
+    ]
+    return compact
+
+
+def _raise_if_cancelled(conn) -> None:
+    # While a request runs, the parent only ever sends "cancel"
+    if conn.poll() and conn.recv() == "cancel":
+        raise InferenceCancelled("Inference cancelled")
+
+
+def _worker_main(
+    conn,
+    loader: Callable[..., Any],
+    loader_args: tuple,
+    torch_threads: int,
+) -> None:
+    """Entry point of an inference worker process.
+
+    Loads the model once, then serves ``(method, audio, options)`` requests
+    from the pipe until it receives ``None`` or the parent goes away.
+    """
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except ImportError:  # pragma: no cover - depends on local runtime
+        pass
+
+    try:
+        model = loader(*loader_args)
+    except Exception as exc:
+        conn.send(("error", f"Failed to load model: {exc}"))
+        return
+
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if message is None:
+            break
+        if message == "cancel":
+            # Arrived after the request it was meant for had finished
+            continue
+
+        method, audio, options = message
+
+        def report_progress(fraction: float) -> None:
+            _raise_if_cancelled(conn)
+            conn.send(("progress", fraction))
+
+        def report_segment(segment: dict) -> None:
+            _raise_if_cancelled(conn)
+            conn.send(("segment", segment))
+
+        if options.pop("report_progress", False):
+            options["progress_callback"] = report_progress
+        if options.pop("report_segments", False):
+            options["segment_callback"] = report_segment
+        try:
+            result = getattr(model, method)(audio, **options)
+            if isinstance(result, list):
+                result = [_compact_result(item) for item in result]
+            else:
+                result = _compact_result(result)
+            conn.send(("ok", result))
+        except Exception as exc:
+            conn.send(("error", str(exc)))
+
+
+class InferenceWorker:
+    """A single long-lived process holding one loaded model."""
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[..., Any],
+        loader_args: tuple,
+        torch_threads: int,
+    ):
+        self.name = name
+        self._loader = loader
+        self._loader_args = loader_args
+        self._torch_threads = torch_threads
+        self._process = None
+        self._conn = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        parent_conn, child_conn = _mp_context.Pipe()
+        process = _mp_context.Process(
+            target=_worker_main,
+            args=(child_conn, self._loader, self._loader_args, self._torch_threads),
+            name=self.name,
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._process = process
+        self._conn = parent_conn
+
+        try:
+            status, payload = self._conn.recv()
+        except EOFError:
+            self.stop()
+            raise InferenceWorkerCrashed(
+                f"Inference worker {self.name} exited during startup"
+            )
+
+        if status != "ready":
+            self.stop()
+            raise RuntimeError(payload)
+
+        logger.info("Inference worker %s started (pid %s)", self.name, process.pid)
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+
+    def call(
+        self,
+        method: str,
+        audio: Any,
+        options: dict,
+        progress_callback: Callable[[float], None] | None = None,
+        segment_callback: Callable[[dict], None] | None = None,
+    ) -> Any:
+        options = {
+            **options,
+            "report_progress": progress_callback is not None,
+            "report_segments": segment_callback is not None,
+        }
+        callbacks = {"progress": progress_callback, "segment": segment_callback}
+        callback_error = None
+        try:
+            self._conn.send((method, audio, options))
+            status, payload = self._conn.recv()
+            # Progress and segment updates stream in ahead of the result
+            while status in callbacks:
+                if callback_error is None:
+                    try:
+                        callbacks[status](payload)
+                    except Exception as exc:
+                        # Typically InferenceCancelled: have the worker stop
+                        # at its next segment, then drain up to its reply
+                        callback_error = exc
+                        self._conn.send("cancel")
+                status, payload = self._conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError) as exc:
+            raise InferenceWorkerCrashed(
+                f"Inference worker {self.name} crashed "
+                f"(exit code {self._process.exitcode if self._process else None})"
+            ) from exc
+
+        if callback_error is not None:
+            raise callback_error
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+    def stop(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._conn.close()
+            self._conn = None
+
+        if self._process is not None:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+            self._process = None
+
+
+class ProcessModelPool:
+    """Model proxy whose ``transcribe`` runs in a pool of worker processes.
+
+    It exposes the same ``transcribe``/``transcribe_batch`` calls as a loaded
+    engine model, so the rest of ``WhisperService`` does not care where the
+    model lives. A worker that dies mid-request fails only that request and is
+    restarted before it is handed out again.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        size: int,
+        torch_threads: int,
+        loader: Callable[..., Any],
+        loader_args: tuple,
+    ):
+        self.model_name = model_name
+        self._workers = [
+            InferenceWorker(
+                name=f"{model_name}-proc-{index}",
+                loader=loader,
+                loader_args=loader_args,
+                torch_threads=torch_threads,
+            )
+            for index in range(max(1, size))
+        ]
+        self._idle: queue.Queue[InferenceWorker] = queue.Queue()
+        self.restarts = 0
+        self._restarts_lock = threading.Lock()
+
+    def start(self) -> "ProcessModelPool":
+        try:
+            for worker in self._workers:
+                worker.start()
+                self._idle.put(worker)
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def transcribe(
+        self,
+        audio: Any,
+        progress_callback: Callable[[float], None] | None = None,
+        segment_callback: Callable[[dict], None] | None = None,
+        **options,
+    ) -> dict:
+        return self._call(
+            "transcribe", audio, options, progress_callback, segment_callback
+        )
+
+    def transcribe_batch(self, audios: list[Any], **options) -> list[dict]:
+        return self._call("transcribe_batch", audios, options)
+
+    def _call(
+        self,
+        method: str,
+        audio: Any,
+        options: dict,
+        progress_callback: Callable[[float], None] | None = None,
+        segment_callback: Callable[[dict], None] | None = None,
+    ) -> Any:
+        worker = self._idle.get()
+        try:
+            if not worker.alive:
+                self._restart(worker)
+            return worker.call(
+                method, audio, options, progress_callback, segment_callback
+            )
+        except InferenceWorkerCrashed:
+            logger.error("%s crashed, restarting it", worker.name)
+            try:
+                self._restart(worker)
+            except Exception as exc:
+                # Retried on the next checkout via the ``alive`` check
+                logger.error("Failed to restart %s: %s", worker.name, exc)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def _restart(self, worker: InferenceWorker) -> None:
+        with self._restarts_lock:
+            self.restarts += 1
+        worker.restart()
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.stop()
+
+
+def start_engine_process_pool(
+    engine_type: EngineType,
+    model_type: ModelType,
+    size: int,
+    torch_threads: int,
+    device: str,
+) -> ProcessModelPool:
+    """Spawn ``size`` processes that each load a model with the given engine."""
+    return ProcessModelPool(
+        model_name=f"{engine_type.value}-{model_type.value}",
+        size=size,
+        torch_threads=torch_threads,
+        loader=load_engine_model,
+        loader_args=(engine_type, model_type, device),
+    ).start()
@@ -0,0 +1,410 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.transcription import RealtimeAudioFormat
+from app.services.audio import (
+    SAMPLE_RATE,
+    StreamingDecoder,
+    _pcm16_to_float32,
+    starts_new_container,
+)
+from app.services.longform import _normalized, _repeated_prefix_length
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimeAudioSession:
+    """Audio state of one realtime WebSocket connection.
+
+    Compressed chunks are fed into a single long-lived ``StreamingDecoder``
+    and the PCM it produces accumulates here until the caller takes it for
+    transcription. A chunk that starts a new container (the client restarted
+    its recorder) finishes the current decoder and starts a fresh one.
+
+    Clients that negotiated a raw PCM format skip all of that: their frames
+    already are mono samples at the models' ``SAMPLE_RATE`` and are viewed
+    as an array in place (float32) or converted in one step (int16).
+    """
+
+    def __init__(self, audio_format: RealtimeAudioFormat = RealtimeAudioFormat.WEBM):
+        self.sample_rate = SAMPLE_RATE
+        self.audio_format = audio_format
+        self._decoder: StreamingDecoder | None = None
+        self._pcm: list[np.ndarray] = []
+        self._pending_bytes = 0
+        # Trailing bytes of a PCM frame that split a sample
+        self._partial_sample = b""
+
+    @property
+    def has_audio(self) -> bool:
+        return self._pending_bytes > 0 or any(len(chunk) for chunk in self._pcm)
+
+    @property
+    def is_pcm(self) -> bool:
+        return self.audio_format != RealtimeAudioFormat.WEBM
+
+    @property
+    def pending_seconds(self) -> float:
+        """Seconds of decoded audio not taken yet."""
+        return sum(len(chunk) for chunk in self._pcm) / self.sample_rate
+
+    async def set_format(self, audio_format: RealtimeAudioFormat) -> None:
+        """Switch formats between frames, keeping the audio decoded so far."""
+        if audio_format == self.audio_format:
+            return
+        await self.finish()
+        self._partial_sample = b""
+        self.audio_format = audio_format
+
+    async def feed(self, chunk: bytes) -> None:
+        if self.is_pcm:
+            # Nothing to decode; stay on the event loop
+            self._feed_pcm(chunk)
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._feed_blocking, chunk)
+
+    def _feed_pcm(self, chunk: bytes) -> None:
+        dtype = "<f4" if self.audio_format == RealtimeAudioFormat.PCM_F32LE else "<i2"
+        width = np.dtype(dtype).itemsize
+        if self._partial_sample:
+            chunk = self._partial_sample + chunk
+        usable = len(chunk) - len(chunk) % width
+        self._partial_sample = chunk[usable:]
+
+        if dtype == "<f4":
+            samples = np.frombuffer(chunk, dtype, usable // width)
+        else:
+            samples = _pcm16_to_float32(memoryview(chunk)[:usable])
+        self._pcm.append(samples)
+
+    def _feed_blocking(self, chunk: bytes) -> None:
+        if self._decoder is not None and (
+            starts_new_container(chunk) or not self._decoder.alive
+        ):
+            self._pcm.append(self._decoder.close())
+            self._decoder = None
+
+        if self._decoder is None:
+            self._decoder = StreamingDecoder(self.sample_rate)
+
+        self._decoder.feed(chunk)
+        self._pending_bytes += len(chunk)
+        self._pcm.append(self._decoder.read())
+
+    async def take_audio(self, drain: bool = False) -> np.ndarray:
+        """Return and clear the PCM decoded so far.
+
+        With ``drain`` the decoder is given a moment to finish the bytes it
+        already received; otherwise that tail is left for the next call.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._take_blocking, drain)
+
+    def _take_blocking(self, drain: bool) -> np.ndarray:
+        if self._decoder is not None:
+            self._pcm.append(
+                self._decoder.drain() if drain else self._decoder.read()
+            )
+
+        audio = (
+            np.concatenate(self._pcm) if self._pcm else np.zeros(0, np.float32)
+        )
+        self._pcm.clear()
+        self._pending_bytes = 0
+        return audio
+
+    async def finish(self) -> None:
+        """Close the decoder, keeping whatever PCM it still had buffered."""
+        if self._decoder is None:
+            return
+
+        decoder, self._decoder = self._decoder, None
+        loop = asyncio.get_running_loop()
+        self._pcm.append(await loop.run_in_executor(None, decoder.close))
+
+
+class AudioBacklog:
+    """Decoded audio waiting for a connection's inference task.
+
+    The receive loop ``put``s without ever waiting; the inference task
+    ``get``s everything queued at once, so audio that arrived while the model
+    was busy is merged into a single pass instead of one pass per batch.
+    At most ``max_seconds`` waits: when the client outruns the model, the
+    oldest audio is dropped so latency stays bounded, and ``gap_seconds``
+    tells the taker how much of the stream is missing before what it took.
+    """
+
+    def __init__(
+        self, sample_rate: int = SAMPLE_RATE, max_seconds: float | None = None
+    ):
+        self.sample_rate = sample_rate
+        self.max_samples = int(
+            (max_seconds or settings.realtime_max_backlog_seconds) * self.sample_rate
+        )
+        self._chunks: deque[np.ndarray] = deque()
+        self._samples = 0
+        self._dropped = 0
+        # Seconds dropped right before the audio last taken
+        self.gap_seconds = 0.0
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    @property
+    def seconds(self) -> float:
+        return self._samples / self.sample_rate
+
+    def put(self, audio: np.ndarray) -> float:
+        """Queue ``audio``; return the seconds of older audio dropped for it."""
+        if not len(audio):
+            return 0.0
+
+        self._chunks.append(audio)
+        self._samples += len(audio)
+        dropped = 0
+        while self._samples > self.max_samples:
+            excess = self._samples - self.max_samples
+            oldest = self._chunks[0]
+            if len(oldest) <= excess:
+                self._chunks.popleft()
+                removed = len(oldest)
+            else:
+                self._chunks[0] = oldest[excess:]
+                removed = excess
+            self._samples -= removed
+            dropped += removed
+        self._dropped += dropped
+        self._ready.set()
+        return dropped / self.sample_rate
+
+    def take_all(self) -> np.ndarray:
+        audio = (
+            np.concatenate(self._chunks) if self._chunks else np.zeros(0, np.float32)
+        )
+        self._chunks.clear()
+        self._samples = 0
+        self.gap_seconds = self._dropped / self.sample_rate
+        self._dropped = 0
+        if not self._closed:
+            self._ready.clear()
+        return audio
+
+    async def get(self) -> np.ndarray | None:
+        """Wait for audio and take all of it; ``None`` once closed."""
+        await self._ready.wait()
+        if self._closed:
+            return None
+        return self.take_all()
+
+    def close(self) -> None:
+        """Stop ``get``; queued audio stays for ``take_all``."""
+        self._closed = True
+        self._ready.set()
+
+
+# Decodes a window of PCM given the text preceding it; ``{"text", "segments"}``
+WindowTranscriber = Callable[[np.ndarray, str | None], Awaitable[dict]]
+
+# Committed words remembered for the prompt and for spotting repeats
+_COMMITTED_WORDS = 256
+# Slack when telling re-decoded committed words from new ones by time
+_TIME_TOLERANCE = 1.0
+# Audio kept when a pass hears nothing, so a word just starting survives
+_SILENCE_KEEP_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class _Word:
+    end: float  # seconds into the session
+    text: str
+
+
+def _timed_words(segments: list[dict], offset: float) -> list[_Word]:
+    """Split segments into words, spreading each segment's span across them."""
+    words = []
+    for segment in segments:
+        texts = segment["text"].split()
+        start = offset + float(segment["start"])
+        step = (offset + float(segment["end"]) - start) / max(len(texts), 1)
+        words.extend(
+            _Word(start + step * (position + 1), text)
+            for position, text in enumerate(texts)
+        )
+    return words
+
+
+def _text(words: list[_Word]) -> str:
+    return " ".join(word.text for word in words)
+
+
+class LocalAgreement:
+    """Commits the words two consecutive hypotheses agree on.
+
+    Each pass over the growing window yields a hypothesis for all of it.
+    Words already committed are dropped from its start (by time, then by
+    matching the committed tail); of the rest, the longest prefix shared
+    with the previous pass's pending words is committed, and the remainder
+    becomes the new pending hypothesis.
+    """
+
+    def __init__(self):
+        self.committed: deque[_Word] = deque(maxlen=_COMMITTED_WORDS)
+        self.pending: list[_Word] = []
+
+    @property
+    def committed_until(self) -> float:
+        return self.committed[-1].end if self.committed else 0.0
+
+    def insert(self, hypothesis: list[_Word]) -> list[_Word]:
+        """Take one pass's hypothesis; return the words it committed."""
+        fresh = [
+            word
+            for word in hypothesis
+            if word.end > self.committed_until - _TIME_TOLERANCE
+        ]
+        fresh = fresh[
+            _repeated_prefix_length(
+                [word.text for word in self.committed], [word.text for word in fresh]
+            ) :
+        ]
+
+        agreed = 0
+        for new, previous in zip(fresh, self.pending):
+            if _normalized(new.text) != _normalized(previous.text):
+                break
+            agreed += 1
+
+        self.committed.extend(fresh[:agreed])
+        self.pending = fresh[agreed:]
+        return fresh[:agreed]
+
+    def flush(self) -> list[_Word]:
+        """Commit the pending hypothesis as it stands."""
+        flushed, self.pending = self.pending, []
+        self.committed.extend(flushed)
+        return flushed
+
+
+class StreamingTranscriber:
+    """Turns a live audio stream into committed text plus a partial tail.
+
+    Audio is appended to a rolling window that every ``process`` call
+    decodes whole, prompted with the committed text spoken before it, so
+    words cut at a chunk boundary are heard complete on the next pass and
+    an overloaded pass is retried on the same window. ``LocalAgreement``
+    decides what is stable. The window is cut at the end of the last fully
+    committed segment once it exceeds ``trim_seconds``; if nothing settles
+    before ``max_window_seconds``, the pending words are committed anyway
+    and the window restarts.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        trim_seconds: float | None = None,
+        max_window_seconds: float | None = None,
+        prompt_chars: int | None = None,
+    ):
+        self.sample_rate = sample_rate
+        self.trim_seconds = trim_seconds or settings.realtime_trim_seconds
+        self.max_window_seconds = (
+            max_window_seconds or settings.realtime_max_window_seconds
+        )
+        self.prompt_chars = prompt_chars or settings.realtime_prompt_chars
+        self._audio = np.zeros(0, np.float32)
+        # Session time of the window's first sample
+        self._offset = 0.0
+        self._agreement = LocalAgreement()
+
+    @property
+    def window_seconds(self) -> float:
+        return len(self._audio) / self.sample_rate
+
+    @property
+    def partial_text(self) -> str:
+        return _text(self._agreement.pending)
+
+    def append(self, audio: np.ndarray) -> None:
+        self._audio = np.concatenate([self._audio, audio])
+
+    def skip(self, seconds: float) -> str:
+        """Move past ``seconds`` of the stream that will never arrive.
+
+        The window cannot span the gap, so what it holds is committed as
+        last heard and dropped; returns that text.
+        """
+        if seconds <= 0:
+            return ""
+
+        committed = self._agreement.flush()
+        self._cut(self._offset + self.window_seconds)
+        self._offset += seconds
+        return _text(committed)
+
+    def prompt(self) -> str | None:
+        """Committed text spoken before the window, trimmed to whole words."""
+        # Half a sample of slack for the rounding of cut points
+        before = self._offset + 0.5 / self.sample_rate
+        text = _text([word for word in self._agreement.committed if word.end <= before])
+        if len(text) > self.prompt_chars:
+            text = text[-self.prompt_chars :].partition(" ")[2]
+        return text or None
+
+    async def process(self, transcribe: WindowTranscriber) -> str:
+        """Decode the window once; return the text it committed.
+
+        Exceptions from ``transcribe`` leave the window as it was.
+        """
+        if not len(self._audio):
+            return ""
+
+        result = await transcribe(self._audio, self.prompt())
+        segments = result.get("segments") or []
+        committed = self._agreement.insert(_timed_words(segments, self._offset))
+
+        window_end = self._offset + self.window_seconds
+        if not segments and not self._agreement.pending:
+            self._cut(window_end - _SILENCE_KEEP_SECONDS)
+        elif self.window_seconds > self.trim_seconds:
+            settled = [
+                self._offset + float(segment["end"])
+                for segment in segments
+                if self._offset + float(segment["end"])
+                <= self._agreement.committed_until
+            ]
+            if settled:
+                self._cut(max(settled))
+
+        if self.window_seconds > self.max_window_seconds:
+            logger.debug("Realtime window never settled; committing it as heard")
+            committed += self._agreement.flush()
+            self._cut(window_end)
+        return _text(committed)
+
+    async def finish(self, transcribe: WindowTranscriber) -> str:
+        """Decode what is left and commit all of it."""
+        committed = []
+        if len(self._audio):
+            result = await transcribe(self._audio, self.prompt())
+            committed = self._agreement.insert(
+                _timed_words(result.get("segments") or [], self._offset)
+            )
+        committed += self._agreement.flush()
+        self._cut(self._offset + self.window_seconds)
+        return _text(committed)
+
+    def _cut(self, until: float) -> None:
+        """Drop the window's audio before session time ``until``."""
+        samples = int(round((until - self._offset) * self.sample_rate))
+        if samples <= 0:
+            return
+        samples = min(samples, len(self._audio))
+        self._audio = self._audio[samples:]
+        self._offset += samples / self.sample_rate
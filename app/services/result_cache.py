@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+from app.core.config import settings
+from app.services.audio import UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_stream(stream: BinaryIO) -> str:
+    """SHA-256 of a file-like payload, read in bounded chunks from its start."""
+    stream.seek(0)
+    hasher = hashlib.sha256()
+    while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+    stream.seek(0)
+    return hasher.hexdigest()
+
+
+def digest_file(file_path: str) -> str:
+    with open(file_path, "rb") as handle:
+        return digest_stream(handle)
+
+
+def result_cache_key(content_digest: str, **options) -> str:
+    """Key for a transcription of ``content_digest`` under ``options``.
+
+    ``options`` holds everything that changes the result (model, action,
+    engine, decode settings); values must be JSON-serialisable.
+    """
+    payload = json.dumps(
+        {"content": content_digest, **options}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TranscriptionResultCache:
+    """Two-tier cache of finished transcriptions keyed by content and options.
+
+    The memory tier is an LRU of ``max_entries`` results. The optional disk
+    tier keeps one JSON file per result under ``disk_dir``, evicting the
+    least recently used files once ``disk_max_bytes`` is exceeded. Entries
+    of both tiers expire after ``ttl_seconds`` (0 disables expiry).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int = 0,
+        disk_dir: str | None = None,
+        disk_max_bytes: int = 0,
+    ):
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = max(0, ttl_seconds)
+        self._disk_dir = Path(disk_dir).expanduser() if disk_dir else None
+        self._disk_max_bytes = max(0, disk_max_bytes)
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls) -> "TranscriptionResultCache | None":
+        if not settings.result_cache_enabled:
+            return None
+        return cls(
+            max_entries=settings.result_cache_max_entries,
+            ttl_seconds=settings.result_cache_ttl_seconds,
+            disk_dir=settings.result_cache_dir,
+            disk_max_bytes=settings.result_cache_disk_max_bytes,
+        )
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self._ttl_seconds) and time.time() - stored_at > self._ttl_seconds
+
+    def _disk_path(self, key: str) -> Path:
+        return self._disk_dir / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value, time.time())
+            return dict(value)
+
+    def put(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, dict(value), now)
+        self._write_disk(key, value)
+
+    def _remember(self, key: str, value: dict, stored_at: float) -> None:
+        if not self._max_entries:
+            return
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> dict | None:
+        if self._disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            if self._expired(stored_at):
+                path.unlink(missing_ok=True)
+                return None
+            value = json.loads(path.read_text())
+            # Touch so disk eviction follows recency of use
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Discarding unreadable cache entry %s: %s", path, exc)
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write_disk(self, key: str, value: dict) -> None:
+        if self._disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        temp_path = path.with_suffix(".tmp")
+        try:
+            temp_path.write_text(json.dumps(value))
+            os.replace(temp_path, path)
+            self._enforce_disk_limits()
+        except OSError as exc:
+            logger.warning("Could not write cache entry %s: %s", path, exc)
+            temp_path.unlink(missing_ok=True)
+
+    def _disk_entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self._disk_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _enforce_disk_limits(self) -> None:
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for stored_at, size, path in entries:
+            over_budget = self._disk_max_bytes and total > self._disk_max_bytes
+            if not over_budget and not self._expired(stored_at):
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._disk_dir is not None:
+            for _, _, path in self._disk_entries():
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        disk_entries = self._disk_entries() if self._disk_dir is not None else []
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "max_entries": self._max_entries,
+                "disk_entries": len(disk_entries),
+                "disk_bytes": sum(size for _, size, _ in disk_entries),
+                "disk_max_bytes": self._disk_max_bytes,
+                "ttl_seconds": self._ttl_seconds,
+            }
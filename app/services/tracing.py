@@ -0,0 +1,117 @@
+"""Per-request stage timings.
+
+A request that is traced carries a ``Trace`` in a context variable for as
+long as it runs; ``span(stage)`` adds the time spent in a block to it and
+does nothing otherwise, so untraced requests pay one lookup per stage.
+
+Stages repeated within a request (the windows of a long-form recording,
+the passes of a realtime session) add up, so the timings are the time
+spent in each stage, which may exceed the wall time when windows run in
+parallel. Executor threads do not inherit context variables: work handed
+to a thread is wrapped in ``use_trace`` with the caller's trace.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+current_trace: ContextVar["Trace | None"] = ContextVar("current_trace", default=None)
+
+
+class Trace:
+    def __init__(self, name: str, started_at: float | None = None, **fields):
+        self.name = name
+        self.fields = fields
+        # Wall clock, so a job's trace can start when it was submitted
+        self.started_at = time.time() if started_at is None else started_at
+        self._stages: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def stages(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._stages)
+
+    def merge(self, stages: dict[str, float]) -> None:
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+
+    def timings(self) -> dict[str, float]:
+        """Seconds per stage, plus the ``total`` since the trace started"""
+        timings = {stage: round(value, 4) for stage, value in self.stages().items()}
+        timings["total"] = round(time.time() - self.started_at, 4)
+        return timings
+
+    def log(self) -> dict[str, float]:
+        """Emit the timings as one JSON log line and return them"""
+        timings = self.timings()
+        logger.info(
+            "trace %s",
+            json.dumps({"trace": self.name, **self.fields, "timings": timings}),
+        )
+        return timings
+
+
+def start_trace(
+    name: str, requested: bool = False, started_at: float | None = None, **fields
+) -> Trace | None:
+    """A trace when the client asked for one or every request is traced"""
+    if requested or settings.request_tracing:
+        return Trace(name, started_at, **fields)
+    return None
+
+
+@contextmanager
+def use_trace(trace: Trace | None):
+    """Make ``trace`` the current one for the block, e.g. in a worker thread"""
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str):
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, time.perf_counter() - started)
+
+
+class _Traced:
+    """Callable proxy timing each call as ``stage``; attributes pass through"""
+
+    def __init__(self, stage: str, target):
+        self._stage = stage
+        self._target = target
+
+    def __call__(self, *args, **kwargs):
+        with span(self._stage):
+            return self._target(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._target, name)
+
+
+def traced(stage: str, target):
+    """Wrap a function or callable object so traced requests time its calls"""
+    if isinstance(target, _Traced):
+        return target
+    return _Traced(stage, target)
@@ -0,0 +1,194 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+try:
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+except ImportError:  # pragma: no cover - depends on local runtime
+    VadOptions = None
+    get_speech_timestamps = None
+
+# Energy detector analysis frame
+_FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000  # 30 ms
+
+
+@dataclass
+class SpeechAudio:
+    """Speech kept by the VAD, concatenated, with a map back to the input.
+
+    ``regions`` are ``(start, end)`` sample ranges of the original audio in
+    the order they appear in ``audio``.
+    """
+
+    audio: np.ndarray
+    regions: list[tuple[int, int]]
+    input_samples: int
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def has_speech(self) -> bool:
+        return len(self.audio) > 0
+
+    @property
+    def skipped_seconds(self) -> float:
+        return (self.input_samples - len(self.audio)) / self.sample_rate
+
+    def original_time(self, seconds: float) -> float:
+        """Map a time in ``audio`` to the same instant of the input audio."""
+        position = seconds * self.sample_rate
+        consumed = 0
+        for start, end in self.regions:
+            length = end - start
+            if position <= consumed + length:
+                return (start + position - consumed) / self.sample_rate
+            consumed += length
+        return (self.regions[-1][1] if self.regions else 0) / self.sample_rate
+
+
+def _energy_speech_regions(
+    audio: np.ndarray,
+    threshold_db: float,
+    min_speech_samples: int,
+    min_silence_samples: int,
+) -> list[tuple[int, int]]:
+    usable = len(audio) // _FRAME_SAMPLES * _FRAME_SAMPLES
+    if usable == 0:
+        return []
+
+    frames = audio[:usable].reshape(-1, _FRAME_SAMPLES)
+    power = np.einsum("ij,ij->i", frames, frames) / _FRAME_SAMPLES
+    loud = 10 * np.log10(power + 1e-10) > threshold_db
+
+    # Rising/falling edges of the loud-frame mask give the speech runs
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], loud.astype(np.int8), [0]))))
+    runs = [
+        (int(start) * _FRAME_SAMPLES, int(end) * _FRAME_SAMPLES)
+        for start, end in zip(edges[::2], edges[1::2])
+    ]
+
+    merged: list[tuple[int, int]] = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_silence_samples:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    if usable < len(audio) and merged and merged[-1][1] == usable:
+        merged[-1] = (merged[-1][0], len(audio))
+
+    return [(start, end) for start, end in merged if end - start >= min_speech_samples]
+
+
+def _silero_speech_regions(
+    audio: np.ndarray,
+    min_speech_ms: int,
+    min_silence_ms: int,
+) -> list[tuple[int, int]]:
+    if get_speech_timestamps is None:
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                "The 'silero' VAD backend needs the 'faster-whisper' package, "
+                "which is not installed in the current Python environment."
+            ),
+        )
+
+    timestamps = get_speech_timestamps(
+        audio,
+        VadOptions(
+            threshold=settings.vad_silero_threshold,
+            min_speech_duration_ms=min_speech_ms,
+            min_silence_duration_ms=min_silence_ms,
+            speech_pad_ms=0,
+        ),
+    )
+    return [(chunk["start"], chunk["end"]) for chunk in timestamps]
+
+
+def _pad_and_merge(
+    regions: list[tuple[int, int]], padding: int, total: int
+) -> list[tuple[int, int]]:
+    padded: list[tuple[int, int]] = []
+    for start, end in regions:
+        start, end = max(0, start - padding), min(total, end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], max(end, padded[-1][1]))
+        else:
+            padded.append((start, end))
+    return padded
+
+
+def detect_speech(
+    audio: np.ndarray,
+    min_silence_ms: int | None = None,
+    sample_rate: int = SAMPLE_RATE,
+) -> SpeechAudio:
+    """Keep only the speech in ``audio``.
+
+    Silences shorter than ``min_silence_ms`` stay in place so natural
+    pauses are preserved; longer ones are cut out. Kept regions are padded
+    by ``vad_padding_ms`` on each side.
+    """
+    min_silence_ms = (
+        settings.vad_min_silence_ms if min_silence_ms is None else min_silence_ms
+    )
+    min_speech_samples = sample_rate * settings.vad_min_speech_ms // 1000
+
+    if settings.vad_backend == "silero":
+        regions = _silero_speech_regions(
+            audio, settings.vad_min_speech_ms, min_silence_ms
+        )
+    else:
+        regions = _energy_speech_regions(
+            audio,
+            settings.vad_threshold_db,
+            min_speech_samples,
+            sample_rate * min_silence_ms // 1000,
+        )
+
+    regions = _pad_and_merge(
+        regions, sample_rate * settings.vad_padding_ms // 1000, len(audio)
+    )
+    speech = (
+        np.concatenate([audio[start:end] for start, end in regions])
+        if regions
+        else np.zeros(0, dtype=np.float32)
+    )
+    result = SpeechAudio(speech, regions, len(audio), sample_rate)
+    vad_stats.record(result)
+    return result
+
+
+@dataclass
+class VadStats:
+    """Running totals of audio seen and skipped by the VAD."""
+
+    input_seconds: float = 0.0
+    skipped_seconds: float = 0.0
+    silent_inputs: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, result: SpeechAudio) -> None:
+        with self._lock:
+            self.input_seconds += result.input_samples / result.sample_rate
+            self.skipped_seconds += result.skipped_seconds
+            self.silent_inputs += 0 if result.has_speech else 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "input_seconds": round(self.input_seconds, 3),
+                "skipped_seconds": round(self.skipped_seconds, 3),
+                "silent_inputs": self.silent_inputs,
+            }
+
+
+vad_stats = VadStats()
@@ -1,20 +1,78 @@
 import asyncio
+import gc
 import logging
 import os
-import tempfile
+import threading
+import time
 import warnings
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from typing import Any, Callable, Dict
 
+import numpy as np
 from fastapi import HTTPException, UploadFile
 
 from app.core.config import settings
 from app.schemas.transcription import (
     ActionType,
+    EngineType,
+    InferenceLaneStats,
+    JobPriority,
     ModelAvailability,
+    ModelResidencyResponse,
     ModelType,
+    ResultCacheStats,
     TranscriptionResponse,
+    TranscriptionSegment,
+)
+from app.services.job_scheduler import current_priority, waits_for_slot
+from app.services.inference_scheduler import (
+    InferenceScheduler,
+    torch_threads_for_model,
+    workers_for_model,
+)
+from app.services.audio import (
+    SAMPLE_RATE,
+    WINDOW_SAMPLES,
+    decode_audio_bytes,
+    decode_audio_stream,
+    load_audio_file,
+    time_stretch,
+)
+from app.services.batching import MicroBatcher
+from app.services.metrics import (
+    AUDIO_SECONDS,
+    DECODE_SECONDS,
+    INFERENCE_SECONDS,
+    MODEL_LOAD_SECONDS,
+    REALTIME_FACTOR,
+    RESULT_CACHE_LOOKUPS,
+)
+from app.services.engines import (
+    InferenceCancelled,
+    ProgressCallback,
+    SegmentCallback,
+    get_engine,
+    resolve_engine,
+)
+from app.services.tracing import Trace, current_trace, span, use_trace
+from app.services.vad import SpeechAudio, detect_speech
+from app.services.longform import WindowStitcher, plan_windows, transcribe_windows
+from app.services.model_residency import (
+    ModelResidencyManager,
+    estimate_model_bytes,
+)
+from app.services.process_pool import (
+    ProcessModelPool,
+    start_engine_process_pool,
+)
+from app.services.result_cache import (
+    TranscriptionResultCache,
+    digest_bytes,
+    digest_file,
+    digest_stream,
+    result_cache_key,
 )
 
 # Suppress FP16 warnings on CPU
@@ -27,10 +85,24 @@ try:
 except ImportError:  # pragma: no cover - depends on local runtime
     torch = None
 
-try:
-    import whisper
-except ImportError:  # pragma: no cover - depends on local runtime
-    whisper = None
+
+def _trace_inference(trace: Trace, call: Trace, elapsed: float) -> None:
+    """Add one model call: its engine stages, and the rest as the decoder"""
+    stages = call.stages()
+    trace.merge(stages)
+    trace.add("inference", elapsed)
+    if "encoder" in stages:
+        trace.add("decoder", max(0.0, elapsed - sum(stages.values())))
+
+
+def _record_inference(
+    model_type: ModelType, task: str, samples: int, elapsed: float
+) -> None:
+    audio_seconds = samples / SAMPLE_RATE
+    INFERENCE_SECONDS.observe(elapsed, model=model_type, task=task)
+    AUDIO_SECONDS.inc(audio_seconds, model=model_type, task=task)
+    if audio_seconds:
+        REALTIME_FACTOR.observe(elapsed / audio_seconds, model=model_type, task=task)
 
 
 class WhisperService:
@@ -46,6 +118,10 @@ class WhisperService:
             return
         self._models: Dict[str, Any] = {}
         self._locks = defaultdict(asyncio.Lock)
+        self._scheduler = InferenceScheduler()
+        self._batchers: Dict[tuple[int, str], MicroBatcher] = {}
+        self._result_cache = TranscriptionResultCache.from_settings()
+        self._residency = ModelResidencyManager.from_settings()
         self.device = (
             "cuda"
             if torch is not None and torch.cuda.is_available()
@@ -84,23 +160,18 @@ class WhisperService:
                 ),
             )
 
-    def _model_download_path(self, model_type: ModelType) -> Path:
-        self._ensure_runtime_dependencies()
-        model_url = whisper._MODELS[model_type.value]
-        model_filename = os.path.basename(model_url)
-        cache_dir = Path(settings.whisper_model_cache_dir).expanduser()
-        return cache_dir / model_filename
-
-    def is_model_downloaded(self, model_type: ModelType) -> bool:
+    def is_model_downloaded(
+        self, model_type: ModelType, engine: EngineType | None = None
+    ) -> bool:
         try:
-            download_path = self._model_download_path(model_type)
+            return get_engine(resolve_engine(model_type, engine)).is_model_downloaded(
+                model_type
+            )
         except HTTPException:
             raise
         except Exception:
             return False
 
-        return download_path.is_file()
-
     def list_model_availability(self) -> list[ModelAvailability]:
         return [
             ModelAvailability(
@@ -114,130 +185,538 @@ class WhisperService:
         self,
         model_type: ModelType,
         on_stage_change: Callable[[str], None] | None = None,
+        engine: EngineType | None = None,
     ) -> None:
         if on_stage_change is not None:
             on_stage_change("checking_cache")
 
-        is_downloaded = self.is_model_downloaded(model_type)
+        is_downloaded = self.is_model_downloaded(model_type, engine)
         if on_stage_change is not None:
             on_stage_change("loading_model" if is_downloaded else "downloading")
 
-        await self._get_model(model_type)
+        await self._get_model(model_type, engine)
 
         if on_stage_change is not None:
             on_stage_change("ready")
 
-    def _ensure_runtime_dependencies(self):
-        if whisper is None:
-            raise HTTPException(
-                status_code=500,
-                detail=(
-                    "The 'openai-whisper' package is not installed in the "
-                    "current Python environment."
+    async def _load_model_blocking(
+        self, model_type: ModelType, engine: EngineType
+    ) -> Any:
+        """Load model in executor to avoid blocking event loop"""
+        get_engine(engine).ensure_available()
+        loop = asyncio.get_running_loop()
+
+        if settings.inference_mode == "process":
+            return await loop.run_in_executor(
+                None,
+                lambda: start_engine_process_pool(
+                    engine,
+                    model_type,
+                    size=workers_for_model(model_type),
+                    torch_threads=torch_threads_for_model(model_type),
+                    device=self.device,
                 ),
             )
 
-    async def _load_model_blocking(self, model_name: str) -> Any:
-        """Load Whisper model in executor to avoid blocking event loop"""
-        self._ensure_runtime_dependencies()
-        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None,
-            lambda: whisper.load_model(
-                model_name,
-                device=self.device,
-                download_root=settings.whisper_model_cache_dir,
-            ),
+            None, lambda: get_engine(engine).load(model_type, self.device)
         )
 
-    async def _get_model(self, model_type: ModelType) -> Any:
-        """Load and cache Whisper model with async loading and locking"""
-        model_name = model_type.value
+    @staticmethod
+    def _model_key(model_type: ModelType, engine: EngineType | None = None) -> str:
+        engine = resolve_engine(model_type, engine)
+        return f"{engine.value}:{model_type.value}"
 
-        # Map turbo to medium for memory efficiency (large-v3 is too big)
-        if model_name == "turbo":
-            model_name = "turbo"
+    async def _get_model(
+        self, model_type: ModelType, engine: EngineType | None = None
+    ) -> Any:
+        """Load and cache model with async loading and locking"""
+        engine = resolve_engine(model_type, engine)
+        model_key = self._model_key(model_type, engine)
 
         # Check if model is already loaded
-        if model_name not in self._models:
+        if model_key not in self._models:
             # Use lock to prevent multiple simultaneous loads of the same model
-            async with self._locks[model_name]:
+            async with self._locks[model_key]:
                 # Double-check pattern - model might have been loaded
                 # while waiting for lock
-                if model_name not in self._models:
+                if model_key not in self._models:
+                    estimated_bytes = estimate_model_bytes(engine, model_type)
+                    for victim in self._residency.plan_eviction(
+                        model_key, estimated_bytes
+                    ):
+                        await self._unload_model(victim)
+
                     try:
                         logger.info(
-                            f"Loading Whisper model '{model_name}' for first time..."
+                            f"Loading model '{model_key}' for first time..."
                         )
+                        started = time.perf_counter()
                         self._models[
-                            model_name
-                        ] = await self._load_model_blocking(model_name)
-                        logger.info(
-                            f"Successfully loaded Whisper model '{model_name}'"
+                            model_key
+                        ] = await self._load_model_blocking(model_type, engine)
+                        MODEL_LOAD_SECONDS.observe(
+                            time.perf_counter() - started,
+                            model=model_type,
+                            engine=engine,
                         )
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to load model {model_name}: {str(e)}"
+                        self._residency.loaded(
+                            model_key, engine, model_type, estimated_bytes
                         )
+                        logger.info(f"Successfully loaded model '{model_key}'")
+                    except Exception as e:
+                        logger.error(f"Failed to load model {model_key}: {str(e)}")
                         raise HTTPException(
                             status_code=500,
-                            detail=f"Failed to load model {model_name}: {str(e)}",
+                            detail=f"Failed to load model {model_key}: {str(e)}",
                         )
                 else:
                     logger.debug(
-                        f"Model '{model_name}' already loaded by another request"
+                        f"Model '{model_key}' already loaded by another request"
                     )
         else:
-            logger.debug(f"Using cached model '{model_name}'")
+            logger.debug(f"Using cached model '{model_key}'")
+
+        return self._models[model_key]
+
+    async def _unload_model(self, model_key: str) -> None:
+        """Drop a loaded model and everything holding a reference to it"""
+        # Nothing is awaited until the model is removed, so no request can
+        # pin it between the residency check and the removal.
+        if not self._residency.is_idle(model_key):
+            return
+
+        model = self._models.pop(model_key, None)
+        self._residency.evicted(model_key)
+        if model is None:
+            return
+
+        for batcher_key in [key for key in self._batchers if key[0] == id(model)]:
+            del self._batchers[batcher_key]
+        if isinstance(model, ProcessModelPool):
+            # Joining the worker processes can take seconds; keep it off the loop
+            await asyncio.get_running_loop().run_in_executor(None, model.close)
+
+        del model
+        gc.collect()
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def model_residency(self) -> ModelResidencyResponse:
+        return self._residency.stats()
 
-        return self._models[model_name]
+    async def _run_inference(
+        self,
+        model: Any,
+        audio: np.ndarray,
+        task: str,
+        model_type: ModelType,
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        initial_prompt: str | None = None,
+        wait: bool = False,
+        cancel_event: threading.Event | None = None,
+    ) -> dict:
+        """Run one inference on the model's dedicated workers
+
+        With ``wait`` (or inside a background job) the inference waits for a
+        worker slot instead of being rejected when the model's queue is full.
+        Once ``cancel_event`` is set, decoding stops at the next segment.
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise InferenceCancelled("Transcription cancelled")
+
+        wait = wait or waits_for_slot.get()
+        # A batch decodes every clip without context, so prompted clips run
+        # alone; so do cancellable ones, which a shared batch can't stop
+        if (
+            settings.enable_batching
+            and len(audio) <= WINDOW_SAMPLES
+            and not initial_prompt
+            and cancel_event is None
+        ):
+            batcher = self._get_batcher(model_type, model, task, wait)
+            # Shared with the other clips of the batch, collection included
+            with span("batch"):
+                result = await batcher.submit(audio)
+            if segment_callback is not None:
+                for segment in result.get("segments", []):
+                    segment_callback(segment)
+            if progress_callback is not None:
+                progress_callback(1.0)
+            return result
+
+        progress_callback = self._cancellable(progress_callback, cancel_event)
+        options = {"task": task}
+        if progress_callback is not None:
+            options["progress_callback"] = progress_callback
+        if segment_callback is not None:
+            options["segment_callback"] = segment_callback
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+
+        trace = current_trace.get()
+
+        def transcribe() -> dict:
+            # Timed on the worker, so the wait for a slot is not included
+            call = Trace("inference") if trace is not None else None
+            started = time.perf_counter()
+            with use_trace(call):
+                result = model.transcribe(audio, **options)
+            elapsed = time.perf_counter() - started
+            _record_inference(model_type, task, len(audio), elapsed)
+            if trace is not None:
+                _trace_inference(trace, call, elapsed)
+            return result
+
+        return await self._scheduler.run(model_type, transcribe, wait=wait)
 
     async def _transcribe_with_model(
         self,
         model: Any,
-        file_path: str,
+        audio: np.ndarray,
         action: ActionType,
-    ) -> str:
-        """Execute transcription with model in executor to avoid blocking"""
+        model_type: ModelType,
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        cancel_event: threading.Event | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict:
+        """Execute transcription on the model's dedicated inference workers
+
+        Returns the ``{"text", "segments"}`` result. ``progress_callback``
+        receives the fraction of ``audio`` decoded so far and
+        ``segment_callback`` each segment as soon as it is final; both may be
+        called from an inference thread. Once ``cancel_event`` is set,
+        decoding stops at the next segment with ``InferenceCancelled``.
+        ``initial_prompt`` conditions the decoder on text preceding ``audio``;
+        it does not apply to long-form recordings, whose windows already
+        overlap.
+        """
+        task = "translate" if action == ActionType.TRANSLATE_ENGLISH else "transcribe"
+
+        if self._is_long_form(audio):
+            result = await self._transcribe_long_form(
+                model,
+                audio,
+                task,
+                model_type,
+                progress_callback,
+                segment_callback,
+                cancel_event,
+            )
+        else:
+            result = await self._run_inference(
+                model,
+                audio,
+                task,
+                model_type,
+                progress_callback,
+                segment_callback,
+                initial_prompt,
+                cancel_event=cancel_event,
+            )
+        return {
+            "text": result["text"].strip(),
+            "segments": result.get("segments") or [],
+        }
+
+    def _is_long_form(self, audio: np.ndarray) -> bool:
+        return (
+            settings.longform_enabled
+            and len(audio) > settings.longform_min_seconds * SAMPLE_RATE
+        )
+
+    async def _transcribe_long_form(
+        self,
+        model: Any,
+        audio: np.ndarray,
+        task: str,
+        model_type: ModelType,
+        progress_callback: ProgressCallback | None = None,
+        segment_callback: SegmentCallback | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> dict:
+        """Transcribe a long recording as concurrent windows cut at pauses
+
+        Segments are emitted window by window, in order, as soon as every
+        earlier window has finished too.
+        """
+        windows = plan_windows(
+            audio,
+            window_seconds=settings.longform_window_seconds,
+            overlap_seconds=settings.longform_overlap_seconds,
+            search_seconds=settings.longform_search_seconds,
+        )
+        # Keep every worker slot (and each micro-batch) busy without
+        # flooding the admission queue shared with other requests
+        concurrency = workers_for_model(model_type) * (
+            settings.batch_max_size
+            if settings.enable_batching and cancel_event is None
+            else 1
+        )
+
+        stitcher = WindowStitcher(windows)
+
+        def on_window_result(index: int, result: dict) -> None:
+            for segment in stitcher.add(index, result):
+                if segment_callback is not None:
+                    segment_callback(segment)
+
+        async def run_window(
+            window_audio: np.ndarray, window_progress: ProgressCallback
+        ) -> dict:
+            return await self._run_inference(
+                model,
+                window_audio,
+                task,
+                model_type,
+                window_progress,
+                # The recording was admitted as a whole; its windows queue
+                wait=True,
+                cancel_event=cancel_event,
+            )
+
+        await transcribe_windows(
+            audio,
+            windows,
+            run_window,
+            concurrency=concurrency,
+            on_progress=progress_callback,
+            on_window_result=on_window_result,
+        )
+        return stitcher.result()
+
+    @staticmethod
+    def _cancellable(
+        progress_callback: ProgressCallback | None,
+        cancel_event: threading.Event | None,
+    ) -> ProgressCallback | None:
+        """Progress callback that also stops decoding once cancelled.
+
+        Engines report progress between segments, so raising from the
+        callback is how a running inference is stopped cooperatively.
+        """
+        if cancel_event is None:
+            return progress_callback
+
+        def report(fraction: float) -> None:
+            if cancel_event.is_set():
+                raise InferenceCancelled("Transcription cancelled")
+            if progress_callback is not None:
+                progress_callback(fraction)
+
+        return report
+
+    @staticmethod
+    def _transcription_progress(
+        on_progress: Callable[[int, str], None] | None,
+        start_progress: int = 60,
+        end_progress: int = 94,
+    ) -> ProgressCallback | None:
+        """Map decoded fractions onto the job's progress range.
+
+        The returned callback is safe to call from inference threads: updates
+        are handed to the event loop, so job state is only ever written there,
+        and progress never moves backwards.
+        """
+        if on_progress is None:
+            return None
+
         loop = asyncio.get_running_loop()
+        reported = start_progress
+
+        def apply(fraction: float) -> None:
+            nonlocal reported
+            progress = start_progress + int((end_progress - start_progress) * fraction)
+            if progress > reported:
+                reported = progress
+                on_progress(progress, "transcribing")
+
+        def report(fraction: float) -> None:
+            loop.call_soon_threadsafe(apply, fraction)
+
+        return report
+
+    @staticmethod
+    def _to_segment(
+        segment: dict, speech: SpeechAudio | None, speed_factor: float = 1.0
+    ) -> TranscriptionSegment:
+        """A model segment, timed against the audio before the VAD trimmed it
+        and the speedup compressed it"""
+        start = float(segment["start"]) * speed_factor
+        end = float(segment["end"]) * speed_factor
+        if speech is not None:
+            start, end = speech.original_time(start), speech.original_time(end)
+        return TranscriptionSegment(
+            start=round(start, 3), end=round(end, 3), text=segment["text"].strip()
+        )
 
-        def _transcribe():
-            # Common parameters to avoid FP16 warnings
-            kwargs = {"fp16": False}
+    @classmethod
+    def _segment_reporter(
+        cls,
+        on_segment: Callable[[TranscriptionSegment], None] | None,
+        speech: SpeechAudio | None,
+        speed_factor: float = 1.0,
+    ) -> SegmentCallback | None:
+        """Hand finished segments from inference threads to the event loop"""
+        if on_segment is None:
+            return None
 
-            if action == ActionType.TRANSCRIBE:
-                return model.transcribe(file_path, **kwargs)
-            if action == ActionType.TRANSLATE_ENGLISH:
-                return model.transcribe(file_path, task="translate", **kwargs)
+        loop = asyncio.get_running_loop()
 
-            return model.transcribe(file_path, **kwargs)
+        def report(segment: dict) -> None:
+            loop.call_soon_threadsafe(
+                on_segment, cls._to_segment(segment, speech, speed_factor)
+            )
 
-        result = await loop.run_in_executor(None, _transcribe)
-        return result["text"].strip()
+        return report
+
+    def _get_batcher(
+        self, model_type: ModelType, model: Any, task: str, wait: bool = False
+    ) -> MicroBatcher:
+        # Callers that wait for a slot batch together, apart from the ones a
+        # full queue rejects
+        key = (id(model), task, wait)
+        batcher = self._batchers.get(key)
+
+        if batcher is None:
+
+            def transcribe_batch(audios: list) -> list[dict]:
+                started = time.perf_counter()
+                results = model.transcribe_batch(audios, task=task)
+                _record_inference(
+                    model_type,
+                    task,
+                    sum(len(audio) for audio in audios),
+                    time.perf_counter() - started,
+                )
+                return results
+
+            async def run_batch(audios: list) -> list[dict]:
+                return await self._scheduler.run(
+                    model_type, lambda: transcribe_batch(audios), wait=wait
+                )
+
+            batcher = MicroBatcher(
+                run_batch,
+                max_batch_size=settings.batch_max_size,
+                window_ms=settings.batch_window_ms,
+                name=f"{model_type.value} {task} batch",
+            )
+            self._batchers[key] = batcher
 
-    async def _emit_progress_heartbeat(
+        return batcher
+
+    def inference_stats(self) -> list[InferenceLaneStats]:
+        return self._scheduler.stats()
+
+    def shutdown(self) -> None:
+        """Release inference workers; lanes are recreated on next use."""
+        self._scheduler.shutdown()
+        self._batchers.clear()
+
+        for model_name, model in list(self._models.items()):
+            if isinstance(model, ProcessModelPool):
+                model.close()
+                del self._models[model_name]
+                self._residency.evicted(model_name)
+
+    def result_cache_stats(self) -> ResultCacheStats:
+        if self._result_cache is None:
+            return ResultCacheStats(enabled=False)
+        return ResultCacheStats(enabled=True, **self._result_cache.stats())
+
+    async def content_digest(self, digest: Callable[..., str], *args) -> str | None:
+        """Hash an upload off the event loop; ``None`` when caching is off"""
+        if self._result_cache is None:
+            return None
+        loop = asyncio.get_running_loop()
+        with span("hash"):
+            return await loop.run_in_executor(None, digest, *args)
+
+    def _result_cache_key(
         self,
-        on_progress: Callable[[int, str], None] | None,
-        stage: str,
-        start_progress: int,
-        end_progress: int,
-        stop_event: asyncio.Event,
-        interval_seconds: float = 0.35,
-    ) -> None:
-        if on_progress is None or end_progress <= start_progress:
-            return
+        content_digest: str,
+        model_type: ModelType,
+        action: ActionType,
+        engine: EngineType | None,
+    ) -> str:
+        return result_cache_key(
+            content_digest,
+            model=model_type.value,
+            action=action.value,
+            engine=resolve_engine(model_type, engine).value,
+            sample_rate=SAMPLE_RATE,
+            speed=self._speed_factor(model_type),
+            vad=(
+                [
+                    settings.vad_backend,
+                    settings.vad_threshold_db,
+                    settings.vad_silero_threshold,
+                    settings.vad_min_speech_ms,
+                    settings.vad_min_silence_ms,
+                    settings.vad_padding_ms,
+                ]
+                if settings.vad_enabled
+                else None
+            ),
+            # Batched clips decode without timestamps or prompt context
+            batching=settings.enable_batching,
+            longform=(
+                [
+                    settings.longform_min_seconds,
+                    settings.longform_window_seconds,
+                    settings.longform_overlap_seconds,
+                    settings.longform_search_seconds,
+                ]
+                if settings.longform_enabled
+                else None
+            ),
+        )
 
-        current_progress = start_progress
-        on_progress(current_progress, stage)
+    async def cached_result(
+        self,
+        content_digest: str | None,
+        model_type: ModelType,
+        action: ActionType,
+        engine: EngineType | None = None,
+    ) -> TranscriptionResponse | None:
+        """Previously computed transcription of the same audio and options"""
+        if self._result_cache is None or content_digest is None:
+            return None
 
-        while not stop_event.is_set():
-            await asyncio.sleep(interval_seconds)
-            if stop_event.is_set():
-                break
+        key = self._result_cache_key(content_digest, model_type, action, engine)
+        loop = asyncio.get_running_loop()
+        with span("cache_lookup"):
+            cached = await loop.run_in_executor(None, self._result_cache.get, key)
+        RESULT_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+        if cached is None:
+            return None
 
-            if current_progress < end_progress:
-                current_progress += 1
-                on_progress(current_progress, stage)
+        logger.info("Result cache hit for %s/%s", model_type.value, action.value)
+        return TranscriptionResponse(**cached)
+
+    async def _store_result(
+        self,
+        content_digest: str | None,
+        model_type: ModelType,
+        action: ActionType,
+        engine: EngineType | None,
+        response: TranscriptionResponse,
+    ) -> None:
+        if self._result_cache is None or content_digest is None:
+            return
+
+        key = self._result_cache_key(content_digest, model_type, action, engine)
+        loop = asyncio.get_running_loop()
+        # Timings describe the request that computed the result, not a hit
+        await loop.run_in_executor(
+            None,
+            self._result_cache.put,
+            key,
+            response.model_dump(exclude={"timings"}),
+        )
 
     def _validate_audio_file(
         self, filename: str | None, content_type: str | None
@@ -277,6 +756,92 @@ class WhisperService:
 
         return file_extension or ".wav"
 
+    async def _decode(self, decode: Callable[..., np.ndarray], *args) -> np.ndarray:
+        """Run an ffmpeg decode off the event loop"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            with span("decode"):
+                return await loop.run_in_executor(None, decode, *args)
+        finally:
+            DECODE_SECONDS.observe(time.perf_counter() - started)
+
+    async def _detect_speech(self, audio: np.ndarray) -> SpeechAudio:
+        """Run voice activity detection off the event loop"""
+        loop = asyncio.get_running_loop()
+        with span("vad"):
+            return await loop.run_in_executor(None, detect_speech, audio)
+
+    @staticmethod
+    def _speed_factor(model_type: ModelType) -> float:
+        """How much faster than real time the model is fed audio"""
+        if not settings.enable_speedup:
+            return 1.0
+        return max(1.0, getattr(settings, f"speed_{model_type.value}"))
+
+    async def _speed_up(
+        self, audio: np.ndarray, model_type: ModelType
+    ) -> tuple[np.ndarray, float]:
+        """Time-compress ``audio`` by the model's factor, off the event loop
+
+        Returns the audio and the factor actually applied; a failed stretch
+        leaves the audio at normal speed.
+        """
+        factor = self._speed_factor(model_type)
+        if factor == 1.0:
+            return audio, factor
+
+        loop = asyncio.get_running_loop()
+        try:
+            with span("speedup"):
+                stretched = await loop.run_in_executor(
+                    None, time_stretch, audio, factor
+                )
+            return stretched, factor
+        except Exception as e:
+            logger.warning(f"Audio speedup failed, transcribing at 1x: {str(e)}")
+            return audio, 1.0
+
+    async def _decode_and_transcribe(
+        self,
+        decode: Callable[[], np.ndarray],
+        content_digest: str | None,
+        model_type: ModelType,
+        action: ActionType,
+        on_progress: Callable[[int, str], None] | None,
+        engine: EngineType | None,
+        on_segment: Callable[[TranscriptionSegment], None] | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> TranscriptionResponse:
+        # A cache hit skips decoding and model loading altogether
+        cached = await self.cached_result(content_digest, model_type, action, engine)
+        if cached is not None:
+            return cached
+
+        if on_progress is not None:
+            on_progress(15, "audio_received")
+
+        try:
+            if on_progress is not None:
+                on_progress(20, "decoding_audio")
+            audio = await self._decode(decode)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Transcription failed: {str(e)}"
+            )
+
+        response = await self.transcribe_audio(
+            audio=audio,
+            model_type=model_type,
+            action=action,
+            on_progress=on_progress,
+            engine=engine,
+            on_segment=on_segment,
+            cancel_event=cancel_event,
+        )
+        await self._store_result(content_digest, model_type, action, engine, response)
+        return response
+
     async def transcribe_file_path(
         self,
         file_path: str,
@@ -285,9 +850,15 @@ class WhisperService:
         model_type: ModelType,
         action: ActionType,
         on_progress: Callable[[int, str], None] | None = None,
+        engine: EngineType | None = None,
+        content_digest: str | None = None,
+        on_segment: Callable[[TranscriptionSegment], None] | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> TranscriptionResponse:
         self.validate_model_action(model_type, action)
         file_extension = self._validate_audio_file(filename, content_type)
+        if content_digest is None:
+            content_digest = await self.content_digest(digest_file, file_path)
 
         if not file_path.endswith(file_extension) and filename:
             logger.debug(
@@ -296,50 +867,76 @@ class WhisperService:
                 filename,
             )
 
-        if on_progress is not None:
-            on_progress(15, "audio_received")
+        return await self._decode_and_transcribe(
+            partial(load_audio_file, file_path),
+            content_digest,
+            model_type,
+            action,
+            on_progress,
+            engine,
+            on_segment,
+            cancel_event,
+        )
+
+    async def transcribe_audio(
+        self,
+        audio: np.ndarray,
+        model_type: ModelType,
+        action: ActionType,
+        on_progress: Callable[[int, str], None] | None = None,
+        engine: EngineType | None = None,
+        on_segment: Callable[[TranscriptionSegment], None] | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> TranscriptionResponse:
+        """Transcribe decoded 16 kHz mono float32 PCM
 
+        ``on_segment`` is called on the event loop with every segment as soon
+        as it is final, in order, timed against ``audio``. Setting
+        ``cancel_event`` stops the inference at its next segment.
+        """
+        self.validate_model_action(model_type, action)
+        engine = resolve_engine(model_type, engine)
+        model_key = self._model_key(model_type, engine)
+        speech: SpeechAudio | None = None
+
+        if settings.vad_enabled:
+            speech = await self._detect_speech(audio)
+            if not speech.has_speech:
+                # Nothing to transcribe; the model is not even loaded
+                return TranscriptionResponse(
+                    model=model_type.value,
+                    action=action.value,
+                    text="",
+                    engine=engine.value,
+                )
+            audio = speech.audio
+
+        # Speech only: silences cut by the VAD are not stretched for nothing
+        audio, speed_factor = await self._speed_up(audio, model_type)
+
+        # Pinned models are never evicted while this request uses them
+        self._residency.pin(model_key)
         try:
             if on_progress is not None:
                 on_progress(25, "loading_model")
 
-            load_stop_event = asyncio.Event()
-            load_progress_task = asyncio.create_task(
-                self._emit_progress_heartbeat(
-                    on_progress=on_progress,
-                    stage="loading_model",
-                    start_progress=25,
-                    end_progress=54,
-                    stop_event=load_stop_event,
-                )
-            )
-            try:
-                model = await self._get_model(model_type)
-            finally:
-                load_stop_event.set()
-                await load_progress_task
+            with span("model_load"):
+                model = await self._get_model(model_type, engine)
 
             if on_progress is not None:
                 on_progress(55, "model_ready")
                 on_progress(60, "transcribing")
 
-            transcription_stop_event = asyncio.Event()
-            transcription_progress_task = asyncio.create_task(
-                self._emit_progress_heartbeat(
-                    on_progress=on_progress,
-                    stage="transcribing",
-                    start_progress=60,
-                    end_progress=94,
-                    stop_event=transcription_stop_event,
-                )
+            # Progress advances as the decoder finishes each 30-second window
+            result = await self._transcribe_with_model(
+                model,
+                audio,
+                action,
+                model_type,
+                self._transcription_progress(on_progress),
+                self._segment_reporter(on_segment, speech, speed_factor),
+                cancel_event=cancel_event,
             )
-            try:
-                text_result = await self._transcribe_with_model(
-                    model, file_path, action
-                )
-            finally:
-                transcription_stop_event.set()
-                await transcription_progress_task
 
             if on_progress is not None:
                 on_progress(95, "finalizing")
@@ -347,7 +944,13 @@ class WhisperService:
             return TranscriptionResponse(
                 model=model_type.value,
                 action=action.value,
-                text=text_result,
+                text=result["text"],
+                engine=engine.value,
+                segments=[
+                    self._to_segment(segment, speech, speed_factor)
+                    for segment in result["segments"]
+                ],
+                speed_factor=speed_factor,
             )
         except HTTPException:
             raise
@@ -355,92 +958,161 @@ class WhisperService:
             raise HTTPException(
                 status_code=500, detail=f"Transcription failed: {str(e)}"
             )
+        finally:
+            self._residency.unpin(model_key)
+
+    async def transcribe_bytes(
+        self,
+        content: bytes,
+        filename: str | None,
+        content_type: str | None,
+        model_type: ModelType,
+        action: ActionType,
+        on_progress: Callable[[int, str], None] | None = None,
+        engine: EngineType | None = None,
+    ) -> TranscriptionResponse:
+        """Transcribe an in-memory audio payload without touching the disk"""
+        file_extension = self._validate_audio_file(filename, content_type)
+        self.validate_model_action(model_type, action)
+
+        return await self._decode_and_transcribe(
+            partial(decode_audio_bytes, content, file_extension),
+            await self.content_digest(digest_bytes, content),
+            model_type,
+            action,
+            on_progress,
+            engine,
+        )
 
     async def transcribe_file(
         self,
         file: UploadFile,
         model_type: ModelType,
         action: ActionType,
+        engine: EngineType | None = None,
     ) -> TranscriptionResponse:
-        """Transcribe uploaded audio file"""
+        """Transcribe uploaded audio file, streaming it into the decoder"""
+        file_extension = self._validate_audio_file(file.filename, file.content_type)
+        self.validate_model_action(model_type, action)
 
-        file_extension = self._validate_audio_file(
-            file.filename, file.content_type
+        await file.seek(0)
+        return await self._decode_and_transcribe(
+            partial(decode_audio_stream, file.file, file_extension),
+            await self.content_digest(digest_stream, file.file),
+            model_type,
+            action,
+            None,
+            engine,
         )
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=file_extension
-        ) as temp_file:
-            try:
-                content = await file.read()
-                temp_file.write(content)
-                temp_file.flush()
-                return await self.transcribe_file_path(
-                    file_path=temp_file.name,
-                    filename=file.filename,
-                    content_type=file.content_type,
-                    model_type=model_type,
-                    action=action,
-                )
-            finally:
-                if os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
 
     async def transcribe_realtime_chunk(
         self,
-        audio_data: bytes,
+        audio_data: bytes | np.ndarray,
         model_type: ModelType,
         action: ActionType,
-    ) -> str:
-        """Transcribe real-time audio chunk"""
+        engine: EngineType | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict:
+        """Transcribe real-time audio chunk (container bytes or decoded PCM)
+
+        Returns the ``{"text", "segments"}`` result, segments timed against
+        ``audio_data``. ``initial_prompt`` is the text spoken just before it.
+        """
+        # Live sessions get worker slots ahead of upload and batch jobs
+        priority = current_priority.set(JobPriority.REALTIME)
+        try:
+            return await self._transcribe_realtime_chunk(
+                audio_data, model_type, action, engine, initial_prompt
+            )
+        finally:
+            current_priority.reset(priority)
+
+    async def _transcribe_realtime_chunk(
+        self,
+        audio_data: bytes | np.ndarray,
+        model_type: ModelType,
+        action: ActionType,
+        engine: EngineType | None = None,
+        initial_prompt: str | None = None,
+    ) -> dict:
 
         self.validate_model_action(model_type, action)
+        empty = {"text": "", "segments": []}
+        speech = None
 
-        logger.debug(f"Transcribing chunk of {len(audio_data)} bytes")
+        if not isinstance(audio_data, np.ndarray):
+            logger.debug(f"Transcribing chunk of {len(audio_data)} bytes")
 
-        # Validate minimum audio data size
-        if len(audio_data) < 1024:  # Less than 1KB
-            logger.warning(f"Audio chunk too small: {len(audio_data)} bytes")
-            return ""
+            # Validate minimum audio data size
+            if len(audio_data) < 1024:  # Less than 1KB
+                logger.warning(f"Audio chunk too small: {len(audio_data)} bytes")
+                return empty
 
-        # Create temporary file for audio chunk
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=".webm"
-        ) as temp_file:
+            # Decoded before VAD, which both input kinds go through
             try:
-                temp_file.write(audio_data)
-                temp_file.flush()
+                audio_data = await self._decode(
+                    decode_audio_bytes, audio_data, ".webm"
+                )
+            except Exception as e:
+                logger.error(f"Realtime chunk decoding failed: {str(e)}")
+                return empty
 
-                logger.debug(f"Wrote audio chunk to {temp_file.name}")
+        logger.debug(f"Transcribing chunk of {len(audio_data)} samples")
 
-                # Load model
-                model = await self._get_model(model_type)
+        # Less than 100 ms of audio carries no words
+        if len(audio_data) < SAMPLE_RATE // 10:
+            logger.warning(f"Audio chunk too short: {len(audio_data)} samples")
+            return empty
 
-                # Transcribe chunk with error handling
-                try:
-                    transcription = await self._transcribe_with_model(
-                        model, temp_file.name, action
-                    )
+        if settings.vad_enabled:
+            speech = await self._detect_speech(audio_data)
+            if not speech.has_speech:
+                logger.debug("Skipping realtime chunk without speech")
+                return empty
+            audio_data = speech.audio
 
-                    logger.debug(f"Transcription result: '{transcription}'")
+        model_key = self._model_key(model_type, engine)
+        self._residency.pin(model_key)
+        try:
+            # Load model
+            with span("model_load"):
+                model = await self._get_model(model_type, engine)
 
-                    return transcription
+            # Transcribe chunk with error handling
+            try:
+                result = await self._transcribe_with_model(
+                    model,
+                    audio_data,
+                    action,
+                    model_type,
+                    initial_prompt=initial_prompt,
+                )
 
-                except Exception as e:
-                    logger.error(f"Whisper transcription failed: {str(e)}")
-                    # Return empty string instead of raising exception
-                    return ""
+                logger.debug(f"Transcription result: '{result['text']}'")
 
+                return {
+                    "text": result["text"],
+                    "segments": [
+                        self._to_segment(segment, speech).model_dump()
+                        for segment in result["segments"]
+                    ],
+                }
+
+            except HTTPException:
+                # Overload rejections must reach the client
+                raise
             except Exception as e:
-                logger.error(f"Error processing audio chunk: {str(e)}")
-                raise Exception(f"Real-time transcription failed: {str(e)}")
-            finally:
-                # Clean up temporary file
-                try:
-                    if os.path.exists(temp_file.name):
-                        os.unlink(temp_file.name)
-                        logger.debug(f"Cleaned up temp file {temp_file.name}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup temp file: {str(e)}")
+                logger.error(f"Whisper transcription failed: {str(e)}")
+                # Return an empty result instead of raising exception
+                return empty
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing audio chunk: {str(e)}")
+            raise Exception(f"Real-time transcription failed: {str(e)}")
+        finally:
+            self._residency.unpin(model_key)
 
 
 # Global service instance (singleton)
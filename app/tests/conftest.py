@@ -1,10 +1,14 @@
 import importlib.util
 from pathlib import Path
 
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services.job_scheduler import JobScheduler
+from app.services.job_store import MemoryJobStore
+from app.services.result_cache import TranscriptionResultCache
 from app.services.whisper_service import whisper_service
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -21,12 +25,47 @@ def stub_model_preload(request, monkeypatch):
     ):
         return
 
-    async def fake_get_model(_model_type):
+    async def fake_get_model(_model_type, _engine=None):
         return object()
 
     monkeypatch.setattr(whisper_service, "_get_model", fake_get_model)
 
 
+@pytest.fixture(autouse=True)
+def disable_vad(request, monkeypatch):
+    """Fake audio in tests is silent; keep it from being dropped by the VAD
+    when it is enabled in the environment."""
+    if request.node.get_closest_marker("real_audio"):
+        return
+
+    monkeypatch.setattr("app.core.config.settings.vad_enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def isolated_result_cache(monkeypatch):
+    """Give every test an empty in-memory result cache."""
+    cache = TranscriptionResultCache(max_entries=16)
+    monkeypatch.setattr(whisper_service, "_result_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_store(monkeypatch):
+    """Give every test an empty in-memory job store."""
+    store = MemoryJobStore()
+    monkeypatch.setattr("app.routes.transcription.job_store", store)
+    monkeypatch.setattr("app.routes.models.job_store", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_scheduler(monkeypatch):
+    """Give every test an idle job scheduler."""
+    scheduler = JobScheduler(max_concurrent=2)
+    monkeypatch.setattr("app.routes.transcription.job_scheduler", scheduler)
+    return scheduler
+
+
 @pytest.fixture
 def client():
     """Test client fixture"""
@@ -62,3 +101,34 @@ def whisper_runtime_available():
             "Real audio smoke tests require the 'openai-whisper' package in the "
             "current Python environment."
         )
+
+
+class FakeStreamingDecoder:
+    """In-process stand-in for the ffmpeg streaming decoder: one sample per byte."""
+
+    def __init__(self, sample_rate=16000):
+        self.alive = True
+        self._pcm = []
+
+    def feed(self, data):
+        self._pcm.append(np.frombuffer(data, dtype=np.uint8).astype(np.float32))
+
+    def read(self):
+        pcm = np.concatenate(self._pcm) if self._pcm else np.zeros(0, np.float32)
+        self._pcm.clear()
+        return pcm
+
+    def drain(self):
+        return self.read()
+
+    def close(self):
+        self.alive = False
+        return self.read()
+
+
+@pytest.fixture
+def fake_streaming_decoder(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.realtime.StreamingDecoder", FakeStreamingDecoder
+    )
+    return FakeStreamingDecoder
@@ -39,7 +39,12 @@ def test_lifespan_skips_model_preload_when_disabled(monkeypatch):
         return object()
 
     monkeypatch.setattr("app.main.settings.disable_startup_preload", True)
-    monkeypatch.setattr("app.main.get_whisper_service", lambda: type("S", (), {"_get_model": fake_get_model})())
+    monkeypatch.setattr(
+        "app.main.get_whisper_service",
+        lambda: type(
+            "S", (), {"_get_model": fake_get_model, "shutdown": lambda self: None}
+        )(),
+    )
 
     async def run_lifespan():
         async with lifespan(None):
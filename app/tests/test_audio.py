@@ -0,0 +1,100 @@
+import io
+import subprocess
+import sys
+
+import numpy as np
+
+from app.services import audio
+
+
+def test_decode_audio_bytes_pipes_payload_through_ffmpeg(monkeypatch):
+    observed = {}
+
+    def fake_run(command, input=None, capture_output=False, check=False):
+        observed["command"] = command
+        observed["input"] = input
+        pcm = np.array([0, 16384, -32768], dtype=np.int16).tobytes()
+        return subprocess.CompletedProcess(command, 0, stdout=pcm)
+
+    monkeypatch.setattr(audio.subprocess, "run", fake_run)
+
+    samples = audio.decode_audio_bytes(b"webm-bytes", ".webm")
+
+    assert observed["input"] == b"webm-bytes"
+    assert observed["command"][observed["command"].index("-i") + 1] == "pipe:0"
+    assert samples.dtype == np.float32
+    assert samples.tolist() == [0.0, 0.5, -1.0]
+
+
+def test_decode_audio_bytes_uses_seekable_file_for_mp4_containers(monkeypatch):
+    observed = {}
+
+    def fake_run(command, input=None, capture_output=False, check=False):
+        source = command[command.index("-i") + 1]
+        observed["source"] = source
+        with open(source, "rb") as handle:
+            observed["content"] = handle.read()
+        return subprocess.CompletedProcess(command, 0, stdout=b"")
+
+    monkeypatch.setattr(audio.subprocess, "run", fake_run)
+
+    audio.decode_audio_bytes(b"m4a-bytes", ".m4a")
+
+    assert observed["source"].endswith(".m4a")
+    assert observed["content"] == b"m4a-bytes"
+
+
+def test_decode_audio_stream_feeds_ffmpeg_in_chunks(monkeypatch):
+    # Stand-in for ffmpeg: echo stdin back to stdout as 16-bit PCM
+    echo = [sys.executable, "-c", "import sys, shutil; shutil.copyfileobj(sys.stdin.buffer, sys.stdout.buffer)"]
+    monkeypatch.setattr(audio, "_ffmpeg_decode_command", lambda source, rate: echo)
+    monkeypatch.setattr(audio, "UPLOAD_CHUNK_SIZE", 4)
+    pcm = np.array([0, 16384, -32768] * 10, dtype=np.int16).tobytes()
+
+    samples = audio.decode_audio_stream(io.BytesIO(pcm), ".webm")
+
+    assert samples.tolist() == [0.0, 0.5, -1.0] * 10
+
+
+def test_decode_audio_stream_reports_ffmpeg_errors(monkeypatch):
+    failing = [sys.executable, "-c", "import sys; sys.stderr.write('bad data'); sys.exit(1)"]
+    monkeypatch.setattr(audio, "_ffmpeg_decode_command", lambda source, rate: failing)
+
+    try:
+        audio.decode_audio_stream(io.BytesIO(b"x" * 4096), ".webm")
+    except RuntimeError as exc:
+        assert "bad data" in str(exc)
+    else:
+        raise AssertionError("expected RuntimeError")
+
+
+def test_time_stretch_pipes_float_pcm_through_atempo(monkeypatch):
+    observed = {}
+
+    def fake_run(command, input=None, capture_output=False, check=False):
+        observed["command"] = command
+        observed["input"] = input
+        half = np.frombuffer(input, "<f4")[::2]
+        return subprocess.CompletedProcess(command, 0, stdout=half.tobytes())
+
+    monkeypatch.setattr(audio.subprocess, "run", fake_run)
+
+    stretched = audio.time_stretch(np.ones(8, dtype=np.float32), 2.5)
+
+    command = observed["command"]
+    assert command[command.index("-filter:a") + 1] == (
+        "atempo=2.000000,atempo=1.250000"
+    )
+    assert len(observed["input"]) == 8 * 4
+    assert stretched.dtype == np.float32
+    assert len(stretched) == 4
+
+
+def test_time_stretch_leaves_normal_speed_alone(monkeypatch):
+    def fail_run(*_args, **_kwargs):
+        raise AssertionError("ffmpeg must not run at 1x")
+
+    monkeypatch.setattr(audio.subprocess, "run", fail_run)
+    samples = np.ones(4, dtype=np.float32)
+
+    assert audio.time_stretch(samples, 1.0) is samples
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from app.schemas.transcription import ActionType, ModelType
+from app.services.batching import MicroBatcher
+from app.services.engines import InferenceCancelled
+from app.services.whisper_service import WhisperService
+
+
+def test_micro_batcher_groups_concurrent_submissions():
+    batches = []
+
+    async def run_batch(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=8, window_ms=20)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert asyncio.run(scenario()) == [0, 10, 20]
+    assert batches == [[0, 1, 2]]
+
+
+def test_micro_batcher_flushes_when_batch_is_full():
+    batches = []
+
+    async def run_batch(items):
+        batches.append(list(items))
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=2, window_ms=1000)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=0.5
+        )
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3]
+    assert batches == [[0, 1], [2, 3]]
+
+
+def test_micro_batcher_propagates_batch_failure():
+    async def run_batch(items):
+        raise RuntimeError("decoder exploded")
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=4, window_ms=1)
+        await batcher.submit("clip")
+
+    with pytest.raises(RuntimeError, match="decoder exploded"):
+        asyncio.run(scenario())
+
+
+def test_service_batches_short_clips_for_same_model(monkeypatch):
+    service = WhisperService()
+    calls = []
+
+    class FakeModel:
+        def transcribe_batch(self, audios, task):
+            calls.append((len(audios), task))
+            return [{"text": f" clip {len(audio)}"} for audio in audios]
+
+    monkeypatch.setattr("app.services.whisper_service.settings.enable_batching", True)
+    monkeypatch.setattr("app.services.whisper_service.settings.batch_window_ms", 20)
+    model = FakeModel()
+
+    async def scenario():
+        return await asyncio.gather(
+            service._transcribe_with_model(
+                model,
+                np.zeros(16000, dtype=np.float32),
+                ActionType.TRANSCRIBE,
+                ModelType.SMALL,
+            ),
+            service._transcribe_with_model(
+                model,
+                np.zeros(32000, dtype=np.float32),
+                ActionType.TRANSCRIBE,
+                ModelType.SMALL,
+            ),
+        )
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        service.shutdown()
+
+    assert [result["text"] for result in results] == ["clip 16000", "clip 32000"]
+    assert calls == [(2, "transcribe")]
+
+
+def test_service_decodes_prompted_clip_alone(monkeypatch):
+    service = WhisperService()
+    calls = []
+
+    class FakeModel:
+        def transcribe(self, audio, task, initial_prompt=None):
+            calls.append(initial_prompt)
+            return {"text": " mundo", "segments": []}
+
+        def transcribe_batch(self, audios, task):
+            raise AssertionError("prompted clips must not be batched")
+
+    monkeypatch.setattr("app.services.whisper_service.settings.enable_batching", True)
+
+    try:
+        result = asyncio.run(
+            service._transcribe_with_model(
+                FakeModel(),
+                np.zeros(16000, dtype=np.float32),
+                ActionType.TRANSCRIBE,
+                ModelType.SMALL,
+                initial_prompt="ola",
+            )
+        )
+    finally:
+        service.shutdown()
+
+    assert result["text"] == "mundo"
+    assert calls == ["ola"]
+
+
+def test_service_decodes_cancellable_clip_alone(monkeypatch):
+    service = WhisperService()
+    calls = []
+
+    class FakeModel:
+        def transcribe(self, audio, task, progress_callback=None):
+            progress_callback(1.0)
+            calls.append(len(audio))
+            return {"text": " ola", "segments": []}
+
+        def transcribe_batch(self, audios, task):
+            raise AssertionError("cancellable clips must not be batched")
+
+    monkeypatch.setattr("app.services.whisper_service.settings.enable_batching", True)
+    cancel_event = threading.Event()
+
+    async def transcribe():
+        return await service._transcribe_with_model(
+            FakeModel(),
+            np.zeros(16000, dtype=np.float32),
+            ActionType.TRANSCRIBE,
+            ModelType.SMALL,
+            cancel_event=cancel_event,
+        )
+
+    try:
+        result = asyncio.run(transcribe())
+        cancel_event.set()
+        with pytest.raises(InferenceCancelled):
+            asyncio.run(transcribe())
+    finally:
+        service.shutdown()
+
+    assert result["text"] == "ola"
+    assert calls == [16000]
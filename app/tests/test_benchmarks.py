@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.schemas.transcription import ActionType, EngineType, ModelType
+from app.services.audio import SAMPLE_RATE
+from app.services.whisper_service import WhisperService
+from benchmarks.load import Results, histogram, percentile, synthetic_sample
+from benchmarks.metrics import normalize_text
+from benchmarks.run import load_manifest
+
+
+def test_normalize_text_ignores_case_and_punctuation():
+    assert normalize_text("Olá, Mundo!  It's  'fine'.") == "olá mundo it's fine"
+
+
+def test_load_manifest_resolves_audio_and_references(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        json.dumps({"audio": "clips/a.ogg", "reference": "ola mundo"})
+        + "\n\n"
+        + json.dumps({"audio": "b.wav", "reference_translation": "hello world"})
+        + "\n"
+    )
+
+    first, second = load_manifest(manifest)
+
+    assert first.audio == tmp_path / "clips" / "a.ogg"
+    assert first.references == {ActionType.TRANSCRIBE: "ola mundo"}
+    assert second.references == {ActionType.TRANSLATE_ENGLISH: "hello world"}
+
+
+def _result(audio, duration_s, elapsed_s, wer, reference_words):
+    return {
+        "model": "small",
+        "action": "transcribe",
+        "engine": "faster-whisper",
+        "speed": 1.0,
+        "audio": audio,
+        "duration_s": duration_s,
+        "elapsed_s": elapsed_s,
+        "wer": wer,
+        "cer": wer / 2,
+        "reference_words": reference_words,
+        "reference_chars": reference_words * 5,
+        "load_s": 2.0,
+        "peak_rss_mb": 900.0,
+    }
+
+
+def test_summary_pools_error_rates_by_reference_length():
+    pd = pytest.importorskip("pandas")
+    from benchmarks.report import compare, summarize
+
+    results = pd.DataFrame(
+        [_result("a", 10.0, 5.0, 0.5, 10), _result("b", 30.0, 5.0, 0.1, 30)]
+    )
+
+    summary = summarize(results)
+    compared = compare(summary, summary.assign(wer=0.1, rtf=0.5))
+
+    assert summary.loc[0, "wer"] == pytest.approx(0.2)
+    assert summary.loc[0, "rtf"] == pytest.approx(0.25)
+    assert compared.loc[0, "wer_delta"] == pytest.approx(0.1)
+    assert compared.loc[0, "rtf_change"] == pytest.approx(-0.5)
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([], 0.5) is None
+
+
+def test_load_report_counts_rejections_as_errors():
+    results = Results()
+    results.succeeded(0.2, 10.0)
+    results.succeeded(0.4, 10.0)
+    results.outcomes["http_503"] += 2
+
+    summary = results.report(wall_seconds=2.0)
+
+    assert summary["error_rate"] == 0.5
+    assert summary["throughput_rps"] == 1.0
+    assert summary["audio_seconds_per_second"] == 10.0
+    assert "realtime" not in summary
+    assert "<=   0.25 s      1" in histogram(results.latencies)
+
+
+def test_synthetic_uploads_differ_so_none_is_a_cache_hit():
+    sample = synthetic_sample(0.5)
+
+    payloads = {sample.payload_for(request) for request in range(1, 4)}
+
+    assert len(payloads) == 3
+    assert all(len(payload) == len(sample.payload) for payload in payloads)
+
+
+def test_benchmark_unloads_each_model_before_the_next(tmp_path, monkeypatch):
+    from benchmarks import run
+
+    monkeypatch.setattr("app.core.config.settings.stub_engine_enabled", True)
+    monkeypatch.setattr("app.core.config.settings.stub_engine_rtf", 0.0)
+    monkeypatch.setattr("app.core.config.settings.result_cache_enabled", False)
+    monkeypatch.setattr(
+        run, "load_audio_file", lambda path: np.zeros(SAMPLE_RATE, np.float32)
+    )
+    service = WhisperService()
+    monkeypatch.setattr(service, "_models", {})
+    # conftest replaces _get_model on the shared instance; use the real one
+    monkeypatch.setattr(
+        service, "_get_model", WhisperService._get_model.__get__(service)
+    )
+    monkeypatch.setattr(run, "get_whisper_service", lambda: service)
+    loaded_before = []
+    prepare_model = service.prepare_model
+
+    async def recording_prepare_model(model_type, engine=None):
+        loaded_before.append(sorted(service._models))
+        await prepare_model(model_type, engine=engine)
+
+    monkeypatch.setattr(service, "prepare_model", recording_prepare_model)
+
+    rows = asyncio.run(
+        run.run_benchmark(
+            [run.Recording(tmp_path / "a.wav", {})],
+            [ModelType.SMALL, ModelType.MEDIUM],
+            [ActionType.TRANSCRIBE],
+            [EngineType.STUB],
+            [1.0],
+            1,
+            tmp_path / "results.csv",
+        )
+    )
+
+    assert rows == 2
+    assert loaded_before == [[], []]
+    assert service._models == {}
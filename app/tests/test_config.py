@@ -1,3 +1,6 @@
+import pytest
+from pydantic import ValidationError
+
 from app.core.config import Settings
 
 
@@ -38,3 +41,11 @@ def test_settings_include_desktop_origins(monkeypatch):
 
     assert "tauri://localhost" in settings.resolved_cors_allowed_origins
     assert "http://tauri.localhost" in settings.resolved_cors_allowed_origins
+
+
+def test_settings_reject_longform_overlap_as_long_as_window(monkeypatch):
+    monkeypatch.setenv("VBZ_LONGFORM_WINDOW_SECONDS", "10")
+    monkeypatch.setenv("VBZ_LONGFORM_OVERLAP_SECONDS", "10")
+
+    with pytest.raises(ValidationError, match="OVERLAP"):
+        Settings()
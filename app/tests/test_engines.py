@@ -0,0 +1,154 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.transcription import EngineType, ModelType
+from app.services import engines
+from app.services.engines import (
+    FasterWhisperModel,
+    OpenAIWhisperModel,
+    resolve_engine,
+)
+
+
+def test_resolve_engine_prefers_request_then_model_setting(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.engines.settings.whisper_engine", "openai-whisper"
+    )
+    monkeypatch.setattr(
+        "app.services.engines.settings.whisper_engine_small", "faster-whisper"
+    )
+
+    assert resolve_engine(ModelType.SMALL) == EngineType.FASTER_WHISPER
+    assert resolve_engine(ModelType.MEDIUM) == EngineType.OPENAI_WHISPER
+    assert (
+        resolve_engine(ModelType.SMALL, EngineType.OPENAI_WHISPER)
+        == EngineType.OPENAI_WHISPER
+    )
+
+
+def test_openai_whisper_adapter_disables_fp16_and_forwards_task():
+    calls = {}
+
+    class FakeWhisper:
+        def transcribe(self, audio, **options):
+            calls.update(options, audio=audio)
+            return {"text": " ola", "segments": []}
+
+    result = OpenAIWhisperModel(FakeWhisper()).transcribe("a.wav", task="translate")
+
+    assert result["text"] == " ola"
+    assert calls == {"audio": "a.wav", "task": "translate", "fp16": False}
+
+
+def test_faster_whisper_adapter_collects_lazy_segments():
+    class FakeCTranslate2Model:
+        def transcribe(self, audio, task, **options):
+            segments = (
+                SimpleNamespace(start=0.0, end=1.5, text=" Hello"),
+                SimpleNamespace(start=1.5, end=3.0, text=" world."),
+            )
+            return iter(segments), SimpleNamespace(language="en", duration=3.0)
+
+    progress = []
+    streamed = []
+    result = FasterWhisperModel(FakeCTranslate2Model()).transcribe(
+        "a.wav", progress_callback=progress.append, segment_callback=streamed.append
+    )
+
+    assert result["text"] == " Hello world."
+    assert result["language"] == "en"
+    assert result["segments"][1] == {"start": 1.5, "end": 3.0, "text": " world."}
+    assert progress == [0.5, 1.0]
+    assert streamed == result["segments"]
+
+
+def test_openai_whisper_adapter_reports_window_progress():
+    class FakeWhisper:
+        def transcribe(self, audio, **options):
+            # what whisper.transcribe does with its (patched) tqdm module
+            with engines._TqdmShim.tqdm(total=3000, unit="frames") as pbar:
+                pbar.update(3000 // 2)
+                pbar.update(3000 // 2)
+            return {"text": "", "segments": []}
+
+    progress = []
+    OpenAIWhisperModel(FakeWhisper()).transcribe(
+        "a.wav", progress_callback=progress.append
+    )
+    OpenAIWhisperModel(FakeWhisper()).transcribe("b.wav")
+
+    assert progress == [0.5, 1.0]
+
+
+def test_openai_whisper_adapter_reports_segments_of_the_result():
+    events = []
+
+    class FakeWhisper:
+        def transcribe(self, audio, **options):
+            with engines._TqdmShim.tqdm(total=3000, unit="frames") as pbar:
+                pbar.update(3000)
+            return {
+                "text": " janela 0 janela 1",
+                "segments": [
+                    {"start": 0.0, "end": 2.0, "text": " janela 0", "tokens": [1]},
+                    {"start": 30.0, "end": 32.0, "text": " janela 1", "tokens": [2]},
+                ],
+            }
+
+    OpenAIWhisperModel(FakeWhisper()).transcribe(
+        "a.wav",
+        progress_callback=lambda fraction: events.append(fraction),
+        segment_callback=lambda segment: events.append(segment),
+    )
+
+    assert events == [
+        1.0,
+        {"start": 0.0, "end": 2.0, "text": " janela 0"},
+        {"start": 30.0, "end": 32.0, "text": " janela 1"},
+    ]
+
+
+def test_stub_engine_requires_opt_in(monkeypatch):
+    monkeypatch.setattr("app.services.engines.settings.stub_engine_enabled", False)
+
+    with pytest.raises(HTTPException):
+        engines.get_engine(EngineType.STUB).load(ModelType.SMALL, "cpu")
+
+
+def test_stub_model_streams_one_segment_per_five_seconds(monkeypatch):
+    monkeypatch.setattr("app.services.engines.settings.stub_engine_enabled", True)
+    monkeypatch.setattr("app.services.engines.settings.stub_engine_rtf", 0.0)
+    model = engines.get_engine(EngineType.STUB).load(ModelType.SMALL, "cpu")
+
+    progress = []
+    streamed = []
+    result = model.transcribe(
+        np.zeros(12 * 16000, dtype=np.float32),
+        progress_callback=progress.append,
+        segment_callback=streamed.append,
+    )
+
+    assert result["text"] == " small transcribe 1 small transcribe 2 small transcribe 3"
+    assert [(segment["start"], segment["end"]) for segment in streamed] == [
+        (0.0, 5.0),
+        (5.0, 10.0),
+        (10.0, 12.0),
+    ]
+    assert progress[-1] == 1.0
+
+
+def test_engines_must_implement_the_whole_interface():
+    class PartialEngine(engines.WhisperEngine):
+        engine_type = EngineType.STUB
+        package_name = "partial"
+
+        def _module(self):
+            return object()
+
+    with pytest.raises(TypeError, match="is_model_downloaded"):
+        PartialEngine()
+    with pytest.raises(TypeError, match="transcribe_batch"):
+        type("PartialModel", (engines.WhisperModelAdapter,), {"transcribe": None})()
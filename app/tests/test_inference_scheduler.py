@@ -0,0 +1,163 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.transcription import JobPriority, ModelType
+from app.services.inference_scheduler import InferenceScheduler
+from app.services.job_scheduler import current_priority, waits_for_slot
+
+
+def test_run_executes_on_dedicated_model_worker():
+    scheduler = InferenceScheduler(max_queue_size=1)
+
+    try:
+        thread_name = asyncio.run(
+            scheduler.run(ModelType.SMALL, lambda: threading.current_thread().name)
+        )
+    finally:
+        scheduler.shutdown()
+
+    assert thread_name.startswith("whisper-small")
+
+
+def test_run_rejects_when_admission_queue_is_full(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.inference_scheduler.settings.inference_retry_after_seconds", 7
+    )
+    scheduler = InferenceScheduler(max_queue_size=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.create_task(scheduler.run(ModelType.SMALL, release.wait))
+        second = asyncio.create_task(scheduler.run(ModelType.SMALL, release.wait))
+        await asyncio.sleep(0.05)
+
+        stats = {lane.model: lane for lane in scheduler.stats()}
+        assert stats[ModelType.SMALL].active == 1
+        assert stats[ModelType.SMALL].queued == 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await scheduler.run(ModelType.SMALL, lambda: None)
+
+        # Other models keep their own capacity
+        assert await scheduler.run(ModelType.TURBO, lambda: "ok") == "ok"
+
+        release.set()
+        await asyncio.gather(first, second)
+        return exc_info.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        scheduler.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "7"
+
+
+def test_background_and_waiting_callers_queue_past_a_full_lane():
+    scheduler = InferenceScheduler(max_queue_size=0)
+    release = threading.Event()
+
+    async def background_job():
+        waits_for_slot.set(True)
+        return await scheduler.run(ModelType.SMALL, lambda: "job")
+
+    async def scenario():
+        blocker = asyncio.create_task(scheduler.run(ModelType.SMALL, release.wait))
+        await asyncio.sleep(0.05)
+        waiting = [
+            asyncio.create_task(background_job()),
+            asyncio.create_task(
+                scheduler.run(ModelType.SMALL, lambda: "window", wait=True)
+            ),
+        ]
+        await asyncio.sleep(0.05)
+
+        # Synchronous callers are still turned away
+        with pytest.raises(HTTPException):
+            await scheduler.run(ModelType.SMALL, lambda: None)
+        assert not any(task.done() for task in waiting)
+
+        release.set()
+        await blocker
+        return await asyncio.gather(*waiting)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        scheduler.shutdown()
+
+    assert results == ["job", "window"]
+
+
+def test_cancelled_caller_keeps_slot_until_worker_returns():
+    scheduler = InferenceScheduler(max_queue_size=1)
+    release = threading.Event()
+    started = []
+
+    async def scenario():
+        caller = asyncio.create_task(scheduler.run(ModelType.SMALL, release.wait))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+
+        waiting = asyncio.create_task(
+            scheduler.run(ModelType.SMALL, lambda: started.append("next"))
+        )
+        await asyncio.sleep(0.05)
+        # The first worker thread is still busy, so the next caller waits
+        # for its slot rather than queueing on the thread pool
+        stats = {lane.model: lane for lane in scheduler.stats()}
+        assert (stats[ModelType.SMALL].active, stats[ModelType.SMALL].queued) == (1, 1)
+        assert started == []
+
+        release.set()
+        await asyncio.wait_for(waiting, 1)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        scheduler.shutdown()
+
+    assert started == ["next"]
+
+
+def test_free_worker_slot_goes_to_highest_priority_waiter():
+    scheduler = InferenceScheduler(max_queue_size=4)
+    release = threading.Event()
+    started = []
+
+    async def run_at(priority, name):
+        current_priority.set(priority)
+        await scheduler.run(ModelType.SMALL, lambda: started.append(name))
+
+    async def scenario():
+        blocker = asyncio.create_task(scheduler.run(ModelType.SMALL, release.wait))
+        await asyncio.sleep(0.05)
+        waiting = [
+            asyncio.create_task(run_at(JobPriority.BATCH, "batch")),
+            asyncio.create_task(run_at(JobPriority.INTERACTIVE, "upload")),
+            asyncio.create_task(run_at(JobPriority.REALTIME, "live")),
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(blocker, *waiting)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        scheduler.shutdown()
+
+    assert started == ["live", "upload", "batch"]
+
+
+def test_inference_stats_endpoint_lists_every_model(client):
+    response = client.get("/api/v1/system/inference")
+
+    assert response.status_code == 200
+    models = [lane["model"] for lane in response.json()["models"]]
+    assert models == ["small", "medium", "turbo"]
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+
+from app.services.job_events import JobEventBroker
+
+
+def parse_sse(message: str) -> tuple[str, dict]:
+    lines = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_stream_sends_snapshot_then_updates_until_terminal_status():
+    broker = JobEventBroker()
+    state = {"status": "processing", "progress": 10}
+
+    async def snapshot():
+        return dict(state)
+
+    async def scenario():
+        messages = []
+
+        async def consume():
+            async for message in broker.stream("job-1", snapshot):
+                messages.append(parse_sse(message))
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        broker.publish("job-1", "status", {"status": "processing", "progress": 50})
+        broker.publish("job-2", "status", {"status": "completed"})
+        broker.publish("job-1", "status", {"status": "completed", "progress": 100})
+        await asyncio.wait_for(consumer, timeout=1)
+        return messages
+
+    messages = asyncio.run(scenario())
+
+    assert [data["progress"] for _, data in messages] == [10, 50, 100]
+    assert broker.subscriber_count("job-1") == 0
+
+
+def test_slow_subscriber_drops_oldest_updates():
+    broker = JobEventBroker(max_queued_events=2)
+
+    async def snapshot():
+        return {"status": "queued"}
+
+    async def scenario():
+        stream = broker.stream("job", snapshot)
+        first = await stream.__anext__()
+        for progress in (1, 2, 3):
+            broker.publish("job", "status", {"status": "processing", "progress": progress})
+        second = await stream.__anext__()
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert parse_sse(first)[1] == {"status": "queued"}
+    assert parse_sse(second)[1]["progress"] == 2
+
+
+def test_stream_polls_snapshot_of_job_running_elsewhere():
+    broker = JobEventBroker()
+    states = iter(
+        [
+            {"status": "processing", "progress": 10},
+            {"status": "processing", "progress": 10},
+            {"status": "processing", "progress": 60},
+            {"status": "completed", "progress": 100},
+        ]
+    )
+
+    async def snapshot():
+        return next(states)
+
+    async def scenario():
+        return [
+            parse_sse(message)[1]["progress"]
+            async for message in broker.stream(
+                "job", snapshot, poll_seconds=0.01
+            )
+        ]
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=1)) == [10, 60, 100]
+
+
+def test_upload_events_stream_finished_job(client, isolated_job_store):
+    isolated_job_store.create({
+        "job_id": "done-job",
+        "status": "completed",
+        "progress": 100,
+        "stage": "completed",
+        "model": "small",
+        "action": "transcribe",
+        "engine": "openai-whisper",
+        "text": "pronto",
+        "error": None,
+        "segments": [],
+        "created_at": time.time(),
+    })
+
+    with client.stream(
+        "GET", "/api/v1/transcribe/upload/events/done-job"
+    ) as response:
+        body = response.read().decode()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    event, data = parse_sse(body)
+    assert event == "status"
+    assert data["text"] == "pronto"
+
+
+def test_upload_events_unknown_job_returns_not_found(client):
+    response = client.get("/api/v1/transcribe/upload/events/missing")
+
+    assert response.status_code == 404
@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+from app.schemas.transcription import JobPriority
+from app.services.job_scheduler import JobScheduler, client_key, current_priority
+
+
+def test_jobs_start_by_priority_and_clients_take_turns():
+    scheduler = JobScheduler(max_concurrent=1)
+    started = []
+    positions = {}
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        def job(name):
+            async def run():
+                started.append((name, current_priority.get()))
+                await gate.wait()
+
+            return run
+
+        def submit(name, client, priority):
+            scheduler.submit(
+                name,
+                client,
+                priority,
+                job(name),
+                lambda position: positions.__setitem__(name, position),
+            )
+
+        submit("a1", "alice", JobPriority.INTERACTIVE)
+        submit("c1", "carol", JobPriority.BATCH)
+        submit("a2", "alice", JobPriority.INTERACTIVE)
+        submit("a3", "alice", JobPriority.INTERACTIVE)
+        submit("b1", "bob", JobPriority.INTERACTIVE)
+        snapshot = dict(positions)
+
+        gate.set()
+        while len(started) < 5:
+            await asyncio.sleep(0.01)
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+
+    assert [name for name, _ in started] == ["a1", "a2", "b1", "a3", "c1"]
+    assert started[-1][1] == JobPriority.BATCH
+    assert snapshot == {"a1": None, "a2": 0, "b1": 1, "a3": 2, "c1": 3}
+    assert all(position is None for position in positions.values())
+
+
+def test_cancel_removes_queued_job_and_moves_others_up():
+    scheduler = JobScheduler(max_concurrent=1)
+    positions = {}
+
+    async def scenario():
+        gate = asyncio.Event()
+        for name in ("running", "first", "second"):
+            scheduler.submit(
+                name,
+                name,
+                JobPriority.INTERACTIVE,
+                gate.wait,
+                lambda position, name=name: positions.__setitem__(name, position),
+            )
+        assert scheduler.position("second") == 1
+
+        assert scheduler.cancel("first")
+        assert not scheduler.cancel("running")
+        gate.set()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+
+    assert positions == {"running": None, "first": None, "second": None}
+    assert scheduler.stats()["running"] == 0
+
+
+def test_client_key_hashes_credentials():
+    key = client_key({"x-api-key": "s3cret"}, "10.0.0.1")
+
+    assert key.startswith("key:") and "s3cret" not in key
+    assert client_key({}, "10.0.0.1") == "addr:10.0.0.1"
+
+
+def test_cancel_endpoint_cancels_queued_job(client, isolated_job_store):
+    isolated_job_store.create(
+        {
+            "job_id": "queued-job",
+            "kind": "transcription",
+            "status": "queued",
+            "progress": 5,
+            "stage": "queued",
+            "model": "small",
+            "action": "transcribe",
+            "engine": None,
+            "text": None,
+            "error": None,
+            "segments": [],
+            "created_at": time.time(),
+        }
+    )
+
+    cancelled = client.delete("/api/v1/transcribe/upload/queued-job")
+    again = client.delete("/api/v1/transcribe/upload/queued-job")
+    missing = client.delete("/api/v1/transcribe/upload/missing")
+
+    assert cancelled.status_code == 200
+    assert cancelled.json()["status"] == "cancelled"
+    assert again.status_code == 409
+    assert missing.status_code == 404
+
+
+def test_shutdown_waits_for_running_jobs_and_drops_queued_ones():
+    scheduler = JobScheduler(max_concurrent=1)
+    finished = []
+
+    async def job(name):
+        await asyncio.sleep(0.05)
+        finished.append(name)
+
+    async def scenario():
+        for name, client in (("running", "a"), ("queued", "b")):
+            scheduler.submit(
+                name, client, JobPriority.INTERACTIVE, lambda name=name: job(name)
+            )
+        assert len(scheduler._tasks) == 1
+        await scheduler.shutdown(timeout=1)
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert finished == ["running"]
+    assert stats["running"] == 0
+    assert not scheduler._tasks
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.services.job_store import WORKER_ID, MemoryJobStore, SQLiteJobStore
+
+
+def make_job(job_id, created_at, kind="transcription", status="queued"):
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "status": status,
+        "progress": 5,
+        "created_at": created_at,
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryJobStore()
+        return
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_store_updates_and_appends_atomically(store):
+    store.create(make_job("job", time.time()))
+
+    store.update("job", status="processing", progress=40)
+    first = store.append_segment("job", {"start": 0.0, "end": 1.0, "text": "um"})
+    second = store.append_segment("job", {"start": 1.0, "end": 2.0, "text": "dois"})
+    store.transition("job", ("processing",), progress=60, stage="transcribing")
+
+    job = store.get("job")
+    assert (first, second) == (0, 1)
+    assert (job["status"], job["progress"], job["stage"], job["owner"]) == (
+        "processing",
+        60,
+        "transcribing",
+        WORKER_ID,
+    )
+    assert [segment["text"] for segment in job["segments"]] == ["um", "dois"]
+    assert store.transition("job", ("queued",), progress=70) is None
+    assert store.update("missing", status="failed") is None
+    assert store.append_segment("missing", {"text": "tres"}) is None
+
+
+def test_store_purges_only_expired_jobs_of_kind(store):
+    now = time.time()
+    store.create({**make_job("old", now - 7200), "finished_at": now - 7000})
+    store.update("old", status="completed")
+    store.create(make_job("old-model", now - 7200, kind="model", status="failed"))
+    store.create(make_job("fresh", now, status="completed"))
+
+    expired = store.purge_expired("transcription", now - 3600)
+
+    assert [job["job_id"] for job in expired] == ["old"]
+    assert store.get("old") is None
+    assert store.get("old-model") is not None
+    assert store.get("fresh") is not None
+
+
+def test_store_keeps_unfinished_jobs_and_expires_by_finish_time(store):
+    now = time.time()
+    store.create(make_job("waiting", now - 7200))
+    store.create(make_job("running", now - 7200, status="processing"))
+    store.create(make_job("just-finished", now - 7200))
+    store.update("just-finished", status="completed")
+
+    assert store.purge_expired("transcription", now - 3600) == []
+    assert store.get("just-finished")["finished_at"] >= now
+    assert store.get("waiting")["status"] == "queued"
+    assert store.get("running")["status"] == "processing"
+
+
+def test_store_counts_jobs_by_kind_and_status(store):
+    store.create(make_job("a", 1.0))
+    store.create(make_job("b", 2.0, status="completed"))
+    store.create(make_job("c", 3.0, status="completed"))
+    store.create(make_job("d", 4.0, kind="model_prepare"))
+
+    assert store.count_by_status() == {
+        ("transcription", "queued"): 1,
+        ("transcription", "completed"): 2,
+        ("model_prepare", "queued"): 1,
+    }
+
+
+def test_sqlite_store_migrates_segments_out_of_job_documents(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    job = {
+        **make_job("job", time.time(), status="processing"),
+        "segments": [{"start": 0.0, "end": 1.0, "text": "um"}],
+    }
+    # The schema before progress and segments moved out of the document
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            owner TEXT,
+            created_at REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            "job",
+            "transcription",
+            "processing",
+            None,
+            job["created_at"],
+            json.dumps(job),
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+    store = SQLiteJobStore(str(path))
+    try:
+        store.append_segment("job", {"start": 1.0, "end": 2.0, "text": "dois"})
+        migrated = store.get("job")
+    finally:
+        store.close()
+
+    assert migrated["progress"] == 5
+    assert [segment["text"] for segment in migrated["segments"]] == ["um", "dois"]
+
+
+def test_sqlite_store_purge_searches_the_finish_time_index(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    try:
+        plan = " ".join(
+            row[-1]
+            for row in store._conn.execute(
+                "EXPLAIN QUERY PLAN SELECT job_id FROM jobs"
+                " WHERE kind = ? AND finished_at < ?",
+                ("transcription", time.time()),
+            )
+        )
+    finally:
+        store.close()
+
+    assert "USING INDEX jobs_kind_finished_at (kind=? AND finished_at<?)" in plan
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = SQLiteJobStore(path), SQLiteJobStore(path)
+
+    try:
+        first.create(make_job("job", time.time()))
+        second.update("job", status="completed")
+        assert first.get("job")["status"] == "completed"
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_store_claims_jobs_of_stopped_workers(tmp_path):
+    # A pid that is certainly no longer running
+    probe = subprocess.Popen([sys.executable, "-c", "pass"])
+    probe.wait()
+    dead_owner = f"{socket.gethostname()}:{probe.pid}:deadbeef"
+
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    try:
+        store.create(make_job("live", time.time()))
+        store.create(make_job("orphan", time.time()))
+        store.create(make_job("done", time.time(), status="completed"))
+        store.update("orphan", owner=dead_owner)
+        store.update("done", owner=dead_owner)
+        # Same pid as this process but an earlier boot
+        store.create(make_job("restarted", time.time()))
+        store.update("restarted", owner=f"{socket.gethostname()}:{os.getpid()}:0ld")
+
+        claimed = store.claim_orphans("transcription")
+    finally:
+        store.close()
+
+    assert sorted(job["job_id"] for job in claimed) == ["orphan", "restarted"]
+    assert all(job["owner"] == WORKER_ID for job in claimed)
+
+
+def test_recovery_fails_orphaned_job_without_audio(tmp_path, monkeypatch):
+    from app.routes import transcription as transcription_routes
+
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(transcription_routes, "job_store", store)
+    try:
+        store.create(
+            {
+                **make_job("orphan", time.time()),
+                "stage": "queued",
+                "model": "small",
+                "action": "transcribe",
+                "engine": None,
+                "text": None,
+                "error": None,
+                "audio_path": str(tmp_path / "gone.wav"),
+            }
+        )
+        store.update("orphan", owner=None)
+
+        recovered = asyncio.run(transcription_routes.recover_transcription_jobs())
+        job = store.get("orphan")
+    finally:
+        store.close()
+
+    assert recovered == 0
+    assert job["status"] == "failed"
+    assert "restarted" in job["error"]
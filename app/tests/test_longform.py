@@ -0,0 +1,170 @@
+import asyncio
+import itertools
+
+import numpy as np
+import pytest
+
+from app.schemas.transcription import ActionType, ModelType
+from app.services.audio import SAMPLE_RATE
+from app.services.longform import (
+    AudioWindow,
+    plan_windows,
+    WindowStitcher,
+    stitch_windows,
+    transcribe_windows,
+)
+from app.services.whisper_service import WhisperService
+
+
+def speech_with_pauses(seconds: int, pause_every: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, seconds * SAMPLE_RATE).astype(np.float32)
+    for second in range(pause_every, seconds, pause_every):
+        audio[second * SAMPLE_RATE : second * SAMPLE_RATE + SAMPLE_RATE // 4] = 0
+    return audio
+
+
+def test_plan_windows_cuts_in_pauses_within_max_length():
+    audio = speech_with_pauses(95, pause_every=27)
+
+    windows = plan_windows(
+        audio, window_seconds=30, overlap_seconds=1, search_seconds=5
+    )
+
+    assert windows[0].audio_start == 0
+    assert windows[-1].end == len(audio)
+    for previous, window in zip(windows, windows[1:]):
+        assert window.start == previous.end
+        assert window.audio_start == window.start - SAMPLE_RATE
+        # every cut lands inside one of the silent stretches
+        assert not audio[window.start - 10 : window.start + 10].any()
+    assert all(
+        window.end - window.audio_start <= 30 * SAMPLE_RATE for window in windows
+    )
+
+
+def test_plan_windows_rejects_overlap_as_long_as_window():
+    audio = speech_with_pauses(95, pause_every=27)
+
+    with pytest.raises(ValueError, match="overlap_seconds"):
+        plan_windows(audio, window_seconds=5, overlap_seconds=5, search_seconds=1)
+
+
+def test_stitch_windows_shifts_timestamps_and_drops_overlap():
+    windows = [
+        AudioWindow(0, 0, 0, 10 * SAMPLE_RATE),
+        AudioWindow(1, 9 * SAMPLE_RATE, 10 * SAMPLE_RATE, 20 * SAMPLE_RATE),
+    ]
+    results = [
+        {"text": "", "segments": [{"start": 0.0, "end": 9.8, "text": " one two three"}]},
+        {
+            "text": "",
+            "segments": [
+                {"start": 0.0, "end": 0.6, "text": " ...three"},
+                {"start": 1.0, "end": 3.0, "text": " three four five"},
+            ],
+            "language": "en",
+        },
+    ]
+
+    stitched = stitch_windows(windows, results)
+
+    assert stitched["text"] == "one two three four five"
+    assert stitched["segments"][1] == {"start": 10.0, "end": 12.0, "text": "four five"}
+    assert stitched["language"] == "en"
+
+
+def test_window_stitcher_emits_segments_in_window_order():
+    ten_seconds = 10 * SAMPLE_RATE
+    windows = [
+        AudioWindow(index, index * ten_seconds, index * ten_seconds, (index + 1) * ten_seconds)
+        for index in range(3)
+    ]
+    stitcher = WindowStitcher(windows)
+
+    def result(text):
+        return {"text": text, "segments": [{"start": 1.0, "end": 2.0, "text": text}]}
+
+    assert stitcher.add(1, result(" beta")) == []
+    assert [segment["text"] for segment in stitcher.add(0, result(" alpha"))] == [
+        "alpha",
+        "beta",
+    ]
+    assert stitcher.add(2, result(" gamma")) == [
+        {"start": 21.0, "end": 22.0, "text": "gamma"}
+    ]
+    assert stitcher.result()["text"] == "alpha beta gamma"
+
+
+def test_transcribe_windows_limits_concurrency_and_reports_progress():
+    audio = np.zeros(4 * SAMPLE_RATE, dtype=np.float32)
+    windows = [
+        AudioWindow(i, i * SAMPLE_RATE, i * SAMPLE_RATE, (i + 1) * SAMPLE_RATE)
+        for i in range(4)
+    ]
+    running = 0
+    peak = 0
+    progress = []
+
+    async def run_window(window_audio, report):
+        report(0.5)
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"text": str(len(window_audio))}
+
+    results = asyncio.run(
+        transcribe_windows(
+            audio,
+            windows,
+            run_window,
+            concurrency=2,
+            on_progress=progress.append,
+        )
+    )
+
+    assert peak == 2
+    assert [result["text"] for result in results] == [str(SAMPLE_RATE)] * 4
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+
+
+def test_service_transcribes_long_audio_window_by_window(monkeypatch):
+    service = WhisperService()
+    settings = "app.services.whisper_service.settings"
+    monkeypatch.setattr(f"{settings}.longform_min_seconds", 60)
+    monkeypatch.setattr(f"{settings}.enable_batching", False)
+
+    calls = itertools.count()
+
+    class WindowModel:
+        def transcribe(self, audio, task="transcribe", progress_callback=None):
+            progress_callback(1.0)
+            text = f" window{next(calls)}"
+            seconds = len(audio) / SAMPLE_RATE
+            return {
+                "text": text,
+                "segments": [{"start": 0.0, "end": seconds, "text": text}],
+            }
+
+    async def fake_get_model(_model_type, _engine=None):
+        return WindowModel()
+
+    monkeypatch.setattr(service, "_get_model", fake_get_model)
+    progress = []
+
+    response = asyncio.run(
+        service.transcribe_audio(
+            speech_with_pauses(95, pause_every=27),
+            ModelType.SMALL,
+            ActionType.TRANSCRIBE,
+            on_progress=lambda value, stage: progress.append((value, stage)),
+        )
+    )
+
+    assert len(response.text.split()) == 4
+    transcribing = [value for value, stage in progress if stage == "transcribing"]
+    assert transcribing[-1] == 94
+    assert transcribing == sorted(transcribing)
@@ -0,0 +1,79 @@
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware.token import AppSecretMiddleware
+from app.schemas.transcription import ModelType
+from app.services.metrics import (
+    INFERENCE_REJECTED,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency", ("model",), buckets=(0.5, 1))
+    )
+    for value in (0.2, 0.7, 3.0):
+        latency.observe(value, model=ModelType.SMALL)
+
+    lines = registry.render().splitlines()
+
+    assert lines == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{model="small",le="0.5"} 1',
+        'latency_seconds_bucket{model="small",le="1"} 2',
+        'latency_seconds_bucket{model="small",le="+Inf"} 3',
+        'latency_seconds_count{model="small"} 3',
+        'latency_seconds_sum{model="small"} 3.9',
+    ]
+
+
+def test_counter_keeps_one_sample_per_label_set():
+    counter = Counter("lookups_total", "Lookups", ("result",))
+    counter.inc(result="hit")
+    counter.inc(result="hit")
+    counter.inc(result="miss")
+
+    assert counter.render()[2:] == [
+        'lookups_total{result="hit"} 2',
+        'lookups_total{result="miss"} 1',
+    ]
+
+
+def test_metrics_endpoint_reports_jobs_and_rejections(
+    client, isolated_job_store, monkeypatch
+):
+    monkeypatch.setattr("app.main.job_store", isolated_job_store)
+    for job_id in ("a", "b"):
+        isolated_job_store.create(
+            {"job_id": job_id, "kind": "transcription", "status": "queued"}
+        )
+    INFERENCE_REJECTED.inc(model=ModelType.TURBO)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'verbalaize_jobs{kind="transcription",status="queued"} 2' in response.text
+    assert 'verbalaize_inference_rejected_total{model="turbo"}' in response.text
+    assert "# TYPE verbalaize_decode_seconds histogram" in response.text
+
+
+def test_secret_middleware_exempts_only_configured_paths():
+    async def ok(_request):
+        return PlainTextResponse("ok")
+
+    def build(exempt_paths):
+        inner = Starlette(routes=[Route("/metrics", ok)])
+        return TestClient(AppSecretMiddleware(inner, "s3cret", exempt_paths))
+
+    assert build(()).get("/metrics").status_code == 401
+    assert build(("/metrics",)).get("/metrics").status_code == 200
+    authorized = build(()).get("/metrics", headers={"X-App-Secret": "s3cret"})
+    assert authorized.status_code == 200
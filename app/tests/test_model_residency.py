@@ -0,0 +1,132 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from app.schemas.transcription import ActionType, EngineType, ModelType
+from app.services.model_residency import (
+    ModelResidencyManager,
+    estimate_model_bytes,
+)
+from app.services.process_pool import ProcessModelPool
+from app.services.whisper_service import WhisperService
+
+GB = 1024 ** 3
+
+
+def test_estimate_follows_engine_precision(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.model_residency.settings.faster_whisper_compute_type", "int8"
+    )
+
+    fp32 = estimate_model_bytes(EngineType.OPENAI_WHISPER, ModelType.MEDIUM)
+    int8 = estimate_model_bytes(EngineType.FASTER_WHISPER, ModelType.MEDIUM)
+
+    assert fp32 == 4 * int8
+    assert estimate_model_bytes(
+        EngineType.OPENAI_WHISPER, ModelType.SMALL
+    ) < fp32
+
+
+def test_plan_eviction_picks_least_recently_used_idle_models():
+    manager = ModelResidencyManager(budget_bytes=3 * GB)
+    manager.loaded("a", EngineType.OPENAI_WHISPER, ModelType.SMALL, GB)
+    manager.loaded("b", EngineType.OPENAI_WHISPER, ModelType.MEDIUM, GB)
+    manager.loaded("c", EngineType.OPENAI_WHISPER, ModelType.TURBO, GB)
+    manager.pin("a")  # most recently used and busy
+    manager.unpin("a")
+    manager.pin("b")
+
+    assert manager.plan_eviction("d", GB) == ["c"]
+    assert manager.plan_eviction("d", 2 * GB) == ["c", "a"]
+
+
+def test_plan_eviction_never_touches_busy_models():
+    manager = ModelResidencyManager(budget_bytes=2 * GB)
+    manager.loaded("a", EngineType.OPENAI_WHISPER, ModelType.SMALL, GB)
+    manager.loaded("b", EngineType.OPENAI_WHISPER, ModelType.MEDIUM, GB)
+    manager.pin("a")
+    manager.pin("b")
+
+    assert manager.plan_eviction("c", GB) == []
+
+
+def test_service_unloads_idle_model_to_fit_budget(monkeypatch):
+    service = WhisperService()
+    monkeypatch.setattr(service, "_models", {})
+    monkeypatch.setattr(service, "_residency", ModelResidencyManager(budget_bytes=GB))
+    monkeypatch.setattr(
+        "app.services.whisper_service.estimate_model_bytes",
+        lambda engine, model_type: GB,
+    )
+    monkeypatch.setattr(
+        "app.services.whisper_service.resolve_engine",
+        lambda model_type, engine=None: EngineType.OPENAI_WHISPER,
+    )
+
+    async def fake_load(model_type, engine):
+        return f"loaded-{model_type.value}"
+
+    monkeypatch.setattr(service, "_load_model_blocking", fake_load)
+    # conftest replaces _get_model on the shared instance; use the real one
+    monkeypatch.setattr(
+        service, "_get_model", WhisperService._get_model.__get__(service)
+    )
+
+    async def fake_transcribe_with_model(
+        model,
+        audio,
+        action,
+        model_type,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_event=None,
+    ):
+        return {"text": model, "segments": []}
+
+    monkeypatch.setattr(service, "_transcribe_with_model", fake_transcribe_with_model)
+
+    async def scenario():
+        audio = np.zeros(16000, dtype=np.float32)
+        first = await service.transcribe_audio(
+            audio, ModelType.SMALL, ActionType.TRANSCRIBE
+        )
+        second = await service.transcribe_audio(
+            audio, ModelType.MEDIUM, ActionType.TRANSCRIBE
+        )
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert (first.text, second.text) == ("loaded-small", "loaded-medium")
+    assert list(service._models) == ["openai-whisper:medium"]
+    residency = service.model_residency()
+    assert [model.key for model in residency.models] == ["openai-whisper:medium"]
+    assert [event.event for event in residency.events] == ["load", "evict", "load"]
+    assert residency.models[0].in_flight == 0
+
+
+def test_evicted_process_pool_is_closed_off_the_event_loop(monkeypatch):
+    service = WhisperService()
+    closed_on = []
+
+    class FakePool(ProcessModelPool):
+        def __init__(self):
+            pass
+
+        def close(self):
+            closed_on.append(threading.current_thread())
+
+    pool = FakePool()
+    monkeypatch.setattr(service, "_models", {"openai-whisper:small": pool})
+    residency = ModelResidencyManager(budget_bytes=GB)
+    residency.loaded(
+        "openai-whisper:small", EngineType.OPENAI_WHISPER, ModelType.SMALL, GB
+    )
+    monkeypatch.setattr(service, "_residency", residency)
+
+    asyncio.run(service._unload_model("openai-whisper:small"))
+
+    assert service._models == {}
+    assert len(closed_on) == 1
+    assert closed_on[0] is not threading.main_thread()
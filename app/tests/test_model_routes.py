@@ -1,3 +1,5 @@
+import asyncio
+
 from app.routes import models as model_routes
 from app.schemas.transcription import ModelAvailability, ModelType
 
@@ -41,3 +43,32 @@ def test_prepare_model_job_status_returns_not_found(client):
     response = client.get("/api/v1/models/jobs/missing-job")
 
     assert response.status_code == 404
+
+
+def test_model_jobs_are_kept_until_they_finish(isolated_job_store, monkeypatch):
+    async def slow_prepare_model(model_type, on_stage_change=None, engine=None):
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(
+        model_routes.whisper_service, "prepare_model", slow_prepare_model
+    )
+    isolated_job_store.create(
+        {
+            "job_id": "job",
+            "kind": "model",
+            "model": "small",
+            "status": "queued",
+            "stage": "checking_cache",
+            "error": None,
+        }
+    )
+
+    async def scenario():
+        model_routes._start_prepare_model_job("job", ModelType.SMALL, None)
+        running = len(model_routes._running_jobs)
+        await model_routes.wait_for_model_jobs(timeout=1)
+        return running
+
+    assert asyncio.run(scenario()) == 1
+    assert model_routes._running_jobs == set()
+    assert isolated_job_store.get("job")["status"] == "completed"
@@ -0,0 +1,138 @@
+import os
+import time
+
+import pytest
+
+from app.services.engines import InferenceCancelled
+from app.services.process_pool import InferenceWorkerCrashed, ProcessModelPool
+
+
+class EchoModel:
+    def transcribe(self, audio, **options):
+        if audio == "crash":
+            os._exit(1)
+        progress_callback = options.pop("progress_callback", None)
+        if audio == "slow":
+            for step in range(1, 101):
+                time.sleep(0.01)
+                progress_callback(step / 100)
+        if progress_callback is not None:
+            progress_callback(0.25)
+            progress_callback(1.0)
+        segment_callback = options.pop("segment_callback", None)
+        if segment_callback is not None:
+            segment_callback({"start": 0.0, "end": 1.0, "text": audio})
+        return {
+            "text": f"{audio}:{options.get('task', 'transcribe')}:{os.getpid()}",
+            "segments": [{"id": 0, "start": 0.0, "end": 1.0, "text": audio}],
+            "language": "en",
+        }
+
+
+def load_echo_model(name):
+    return EchoModel()
+
+
+def load_broken_model(name):
+    raise RuntimeError("weights missing")
+
+
+def test_pool_runs_transcription_in_worker_process():
+    pool = ProcessModelPool(
+        "echo", size=1, torch_threads=1, loader=load_echo_model, loader_args=("echo",)
+    ).start()
+
+    try:
+        result = pool.transcribe("hello", task="translate")
+    finally:
+        pool.close()
+
+    text, task, pid = result["text"].split(":")
+    assert (text, task) == ("hello", "translate")
+    assert int(pid) != os.getpid()
+    assert result["segments"] == [{"start": 0.0, "end": 1.0, "text": "hello"}]
+
+
+def test_pool_forwards_progress_from_worker_process():
+    pool = ProcessModelPool(
+        "echo", size=1, torch_threads=1, loader=load_echo_model, loader_args=("echo",)
+    ).start()
+    progress = []
+
+    try:
+        result = pool.transcribe("hello", progress_callback=progress.append)
+    finally:
+        pool.close()
+
+    assert progress == [0.25, 1.0]
+    assert result["text"].startswith("hello:transcribe:")
+
+
+def test_pool_forwards_segments_from_worker_process():
+    pool = ProcessModelPool(
+        "echo", size=1, torch_threads=1, loader=load_echo_model, loader_args=("echo",)
+    ).start()
+    segments = []
+
+    try:
+        pool.transcribe("hello", segment_callback=segments.append)
+    finally:
+        pool.close()
+
+    assert segments == [{"start": 0.0, "end": 1.0, "text": "hello"}]
+
+
+def test_pool_cancels_running_inference_from_progress_callback():
+    pool = ProcessModelPool(
+        "echo", size=1, torch_threads=1, loader=load_echo_model, loader_args=("echo",)
+    ).start()
+    progress = []
+
+    def cancel_after_first(fraction):
+        progress.append(fraction)
+        raise InferenceCancelled("stop")
+
+    try:
+        started = time.monotonic()
+        with pytest.raises(InferenceCancelled):
+            pool.transcribe("slow", progress_callback=cancel_after_first)
+        elapsed = time.monotonic() - started
+        # The worker is free for the next request
+        result = pool.transcribe("after")
+    finally:
+        pool.close()
+
+    assert progress == [0.01]
+    assert elapsed < 0.5
+    assert result["text"].startswith("after:")
+    assert pool.restarts == 0
+
+
+def test_pool_restarts_crashed_worker():
+    pool = ProcessModelPool(
+        "echo", size=1, torch_threads=1, loader=load_echo_model, loader_args=("echo",)
+    ).start()
+
+    try:
+        with pytest.raises(InferenceWorkerCrashed):
+            pool.transcribe("crash")
+
+        result = pool.transcribe("after")
+    finally:
+        pool.close()
+
+    assert result["text"].startswith("after:")
+    assert pool.restarts == 1
+
+
+def test_pool_start_surfaces_model_load_errors():
+    pool = ProcessModelPool(
+        "broken",
+        size=1,
+        torch_threads=1,
+        loader=load_broken_model,
+        loader_args=("broken",),
+    )
+
+    with pytest.raises(RuntimeError, match="weights missing"):
+        pool.start()
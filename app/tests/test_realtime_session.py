@@ -0,0 +1,273 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from app.services import realtime
+from app.schemas.transcription import RealtimeAudioFormat
+from app.services.realtime import RealtimeAudioSession
+
+WEBM_HEADER = b"\x1a\x45\xdf\xa3"
+
+
+def test_session_reuses_one_decoder_for_continuous_stream(
+    monkeypatch, fake_streaming_decoder
+):
+    started = []
+
+    class RecordingDecoder(fake_streaming_decoder):
+        def __init__(self, sample_rate=16000):
+            super().__init__(sample_rate)
+            started.append(self)
+
+    monkeypatch.setattr(realtime, "StreamingDecoder", RecordingDecoder)
+    session = RealtimeAudioSession()
+
+    async def scenario():
+        await session.feed(WEBM_HEADER + b"a" * 10)
+        await session.feed(b"b" * 20)
+        return await session.take_audio()
+
+    audio = asyncio.run(scenario())
+
+    assert len(started) == 1
+    assert len(audio) == 34
+    assert not session.has_audio
+
+
+def test_session_restarts_decoder_when_client_sends_new_header(
+    monkeypatch, fake_streaming_decoder
+):
+    started = []
+
+    class RecordingDecoder(fake_streaming_decoder):
+        def __init__(self, sample_rate=16000):
+            super().__init__(sample_rate)
+            started.append(self)
+
+    monkeypatch.setattr(realtime, "StreamingDecoder", RecordingDecoder)
+    session = RealtimeAudioSession()
+
+    async def scenario():
+        await session.feed(WEBM_HEADER + b"a" * 10)
+        await session.feed(WEBM_HEADER + b"b" * 10)
+        await session.finish()
+        return await session.take_audio(drain=True)
+
+    audio = asyncio.run(scenario())
+
+    assert len(started) == 2
+    assert started[0].alive is False
+    assert len(audio) == 28
+
+
+
+def _passes(*results):
+    """A window transcriber answering with ``results`` in turn, recording calls."""
+    calls = []
+    results = iter(results)
+
+    async def transcribe(audio, initial_prompt):
+        calls.append((len(audio), initial_prompt))
+        segments = next(results)
+        return {
+            "text": " ".join(text for _, _, text in segments),
+            "segments": [
+                {"start": start, "end": end, "text": text}
+                for start, end, text in segments
+            ],
+        }
+
+    return transcribe, calls
+
+
+def _seconds(value):
+    return np.zeros(int(value * 16000), dtype=np.float32)
+
+
+def test_local_agreement_commits_prefix_shared_by_consecutive_passes():
+    agreement = realtime.LocalAgreement()
+
+    def words(text, end):
+        return realtime._timed_words([{"start": 0.0, "end": end, "text": text}], 0.0)
+
+    assert agreement.insert(words("the cat", 1.0)) == []
+    committed = agreement.insert(words("the cat sat", 1.5))
+    # The committed words come back re-decoded; only the new ones count
+    later = agreement.insert(words("the cat sat on", 2.0))
+
+    assert [word.text for word in committed] == ["the", "cat"]
+    assert [word.text for word in later] == ["sat"]
+    assert [word.text for word in agreement.pending] == ["on"]
+
+
+def test_streamer_trims_window_at_committed_segment_and_prompts_with_it():
+    streamer = realtime.StreamingTranscriber(
+        trim_seconds=3.0, max_window_seconds=10.0
+    )
+    transcribe, calls = _passes(
+        [(0.0, 2.0, "hello there"), (2.0, 3.0, "gen")],
+        [(0.0, 2.0, "hello there"), (2.0, 4.0, "general kenobi")],
+        [(0.0, 2.0, "general kenobi")],
+    )
+
+    async def scenario():
+        streamer.append(_seconds(3.0))
+        first = await streamer.process(transcribe)
+        streamer.append(_seconds(1.0))
+        second = await streamer.process(transcribe)
+        third = await streamer.process(transcribe)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert (first, second, third) == ("", "hello there", "general kenobi")
+    # The agreed first segment left the window and became the prompt
+    assert calls == [(48000, None), (64000, None), (32000, "hello there")]
+    assert streamer.partial_text == ""
+
+
+def test_streamer_commits_unsettled_window_at_its_limit():
+    streamer = realtime.StreamingTranscriber(trim_seconds=1.0, max_window_seconds=2.0)
+    transcribe, _ = _passes([(0.0, 2.5, "never the same")])
+
+    async def scenario():
+        streamer.append(_seconds(2.5))
+        return await streamer.process(transcribe)
+
+    assert asyncio.run(scenario()) == "never the same"
+    assert streamer.window_seconds == 0
+    assert streamer.prompt() == "never the same"
+
+
+def test_streamer_finish_commits_pending_words():
+    streamer = realtime.StreamingTranscriber()
+    transcribe, _ = _passes([(0.0, 1.0, "almost")], [(0.0, 1.5, "almost done")])
+
+    async def scenario():
+        streamer.append(_seconds(1.0))
+        await streamer.process(transcribe)
+        streamer.append(_seconds(0.5))
+        return await streamer.finish(transcribe)
+
+    assert asyncio.run(scenario()) == "almost done"
+    assert streamer.partial_text == ""
+
+
+def test_streamer_drops_silence_from_window():
+    streamer = realtime.StreamingTranscriber()
+    transcribe, _ = _passes([])
+
+    async def scenario():
+        streamer.append(_seconds(4.0))
+        await streamer.process(transcribe)
+
+    asyncio.run(scenario())
+
+    assert streamer.window_seconds == 1.0
+
+
+def test_backlog_merges_queued_audio_and_drops_oldest_beyond_limit():
+    backlog = realtime.AudioBacklog(sample_rate=10, max_seconds=1.0)
+
+    assert backlog.put(np.arange(6, dtype=np.float32)) == 0.0
+    dropped = backlog.put(np.arange(6, 12, dtype=np.float32))
+
+    async def scenario():
+        return await backlog.get()
+
+    audio = asyncio.run(scenario())
+
+    assert dropped == 0.2
+    # One get returns everything queued, oldest samples dropped
+    assert audio.tolist() == list(range(2, 12))
+    assert backlog.seconds == 0
+
+
+def test_backlog_get_returns_none_once_closed():
+    backlog = realtime.AudioBacklog(sample_rate=10, max_seconds=1.0)
+    backlog.put(np.ones(3, dtype=np.float32))
+    backlog.close()
+
+    assert asyncio.run(backlog.get()) is None
+    assert len(backlog.take_all()) == 3
+
+
+def test_session_takes_raw_pcm_frames_without_a_decoder(monkeypatch):
+    def no_decoder(*_args):
+        raise AssertionError("raw PCM must not be decoded")
+
+    monkeypatch.setattr(realtime, "StreamingDecoder", no_decoder)
+    session = RealtimeAudioSession(audio_format=RealtimeAudioFormat.PCM_S16LE)
+    frame = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+
+    async def scenario():
+        # A frame boundary splitting a sample is carried to the next frame
+        await session.feed(frame[:3])
+        await session.feed(frame[3:])
+        return await session.take_audio()
+
+    audio = asyncio.run(scenario())
+
+    assert audio.tolist() == [0.0, 0.5, -1.0]
+
+
+def test_session_views_float32_frames_in_place():
+    session = RealtimeAudioSession(audio_format=RealtimeAudioFormat.PCM_F32LE)
+    frame = np.array([0.25, -0.5], dtype="<f4").tobytes()
+
+    asyncio.run(session.feed(frame))
+
+    assert session.pending_seconds == 2 / 16000
+    assert np.shares_memory(session._pcm[0], np.frombuffer(frame, "<f4"))
+
+
+def test_switching_to_pcm_closes_the_decoder_off_the_event_loop(
+    monkeypatch, fake_streaming_decoder
+):
+    closed_on = []
+
+    class RecordingDecoder(fake_streaming_decoder):
+        def close(self):
+            closed_on.append(threading.current_thread())
+            return super().close()
+
+    monkeypatch.setattr(realtime, "StreamingDecoder", RecordingDecoder)
+    session = RealtimeAudioSession()
+    frame = np.array([0.25, -0.5], dtype="<f4").tobytes()
+
+    async def scenario():
+        await session.feed(WEBM_HEADER + b"a" * 10)
+        await session.set_format(RealtimeAudioFormat.PCM_F32LE)
+        await session.feed(frame)
+        return await session.take_audio()
+
+    audio = asyncio.run(scenario())
+
+    assert len(closed_on) == 1
+    assert closed_on[0] is not threading.main_thread()
+    # The webm audio decoded so far is kept, followed by the PCM frame
+    assert audio[-2:].tolist() == [0.25, -0.5]
+
+
+def test_streamer_skips_audio_dropped_from_the_backlog():
+    backlog = realtime.AudioBacklog(sample_rate=16000, max_seconds=1.0)
+    streamer = realtime.StreamingTranscriber()
+    transcribe, _ = _passes([(0.0, 1.0, "before")], [(0.0, 0.5, "after")])
+
+    async def scenario():
+        streamer.append(_seconds(1.0))
+        await streamer.process(transcribe)
+        backlog.put(_seconds(1.0))
+        backlog.put(_seconds(0.5))
+        audio = await backlog.get()
+        skipped = streamer.skip(backlog.gap_seconds)
+        streamer.append(audio)
+        return skipped, await streamer.finish(transcribe)
+
+    skipped, after = asyncio.run(scenario())
+
+    assert backlog.gap_seconds == 0.5
+    assert (skipped, after) == ("before", "after")
+    # Words after the gap are timed against the session, dropped audio included
+    assert streamer._agreement.committed[-1].end == 2.0
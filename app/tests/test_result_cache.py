@@ -0,0 +1,65 @@
+import os
+import time
+
+from app.services.result_cache import (
+    TranscriptionResultCache,
+    digest_bytes,
+    result_cache_key,
+)
+
+
+def test_result_cache_key_depends_on_content_and_options():
+    digest = digest_bytes(b"audio")
+
+    key = result_cache_key(digest, model="small", action="transcribe")
+
+    assert key == result_cache_key(digest, action="transcribe", model="small")
+    assert key != result_cache_key(digest, model="medium", action="transcribe")
+    assert key != result_cache_key(
+        digest_bytes(b"other"), model="small", action="transcribe"
+    )
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TranscriptionResultCache(max_entries=2)
+    cache.put("a", {"text": "a"})
+    cache.put("b", {"text": "b"})
+    cache.get("a")
+    cache.put("c", {"text": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"text": "a"}
+    assert cache.get("c") == {"text": "c"}
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = TranscriptionResultCache(max_entries=4, ttl_seconds=60)
+    cache.put("a", {"text": "a"})
+
+    later = time.time() + 120
+    monkeypatch.setattr("app.services.result_cache.time.time", lambda: later)
+
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_new_instance_and_respects_size(tmp_path):
+    cache = TranscriptionResultCache(
+        max_entries=4, disk_dir=str(tmp_path), disk_max_bytes=60
+    )
+    cache.put("old", {"text": "x" * 20})
+    stale = time.time() - 10
+    os.utime(tmp_path / "old.json", (stale, stale))
+    cache.put("new", {"text": "y" * 20})
+
+    restarted = TranscriptionResultCache(
+        max_entries=4, disk_dir=str(tmp_path), disk_max_bytes=60
+    )
+
+    assert restarted.get("old") is None
+    assert restarted.get("new") == {"text": "y" * 20}
+    stats = restarted.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["disk_entries"] == 1
+    assert stats["memory_entries"] == 1
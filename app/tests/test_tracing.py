@@ -0,0 +1,53 @@
+import json
+import logging
+
+from app.services.tracing import Trace, span, start_trace, traced, use_trace
+
+
+def test_spans_add_up_per_stage_only_while_traced():
+    trace = Trace("test")
+
+    with span("decode"):
+        pass
+    with use_trace(trace):
+        with span("decode"):
+            pass
+        with span("decode"):
+            pass
+    with span("decode"):
+        pass
+
+    assert set(trace.stages()) == {"decode"}
+    assert set(trace.timings()) == {"decode", "total"}
+
+
+def test_traced_proxy_times_calls_and_passes_attributes_through():
+    class FeatureExtractor:
+        hop_length = 160
+
+        def __call__(self, audio):
+            return len(audio)
+
+    extractor = traced("mel", FeatureExtractor())
+    trace = Trace("test")
+
+    with use_trace(trace):
+        assert extractor([0.0] * 4) == 4
+
+    assert extractor.hop_length == 160
+    assert "mel" in trace.stages()
+    assert traced("mel", extractor) is extractor
+
+
+def test_trace_is_opt_in_and_logged_as_json(monkeypatch, caplog):
+    monkeypatch.setattr("app.core.config.settings.request_tracing", False)
+    assert start_trace("upload") is None
+
+    trace = start_trace("upload", requested=True, model="small")
+    trace.add("decode", 0.25)
+    with caplog.at_level(logging.INFO, logger="app.services.tracing"):
+        timings = trace.log()
+
+    logged = json.loads(caplog.records[-1].getMessage().removeprefix("trace "))
+    assert logged == {"trace": "upload", "model": "small", "timings": timings}
+    assert timings["decode"] == 0.25
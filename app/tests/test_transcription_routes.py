@@ -1,5 +1,23 @@
+import asyncio
+import threading
+import time
+
+from fastapi import FastAPI, Request
+
+from app.middleware.upload_limit import (
+    MULTIPART_OVERHEAD_BYTES,
+    UploadSizeLimitMiddleware,
+)
 from app.routes import transcription as transcription_routes
-from app.schemas.transcription import TranscriptionResponse
+from app.schemas.transcription import (
+    ActionType,
+    ModelType,
+    TranscriptionResponse,
+    TranscriptionSegment,
+)
+from app.services.engines import InferenceCancelled
+from app.services.metrics import UPLOAD_RECEIVED_BYTES
+from app.services.tracing import span
 
 
 def test_transcription_upload_missing_file(client):
@@ -29,7 +47,7 @@ def test_transcription_upload_rejects_unsupported_action(
 
 
 def test_transcription_upload_success(client, monkeypatch, sample_audio_file):
-    async def fake_transcribe_file(file, model_type, action):
+    async def fake_transcribe_file(file, model_type, action, engine=None):
         assert file.filename == "test.wav"
         assert model_type.value == "turbo"
         assert action.value == "transcribe"
@@ -97,3 +115,369 @@ def test_transcription_upload_status_returns_not_found(client):
     )
 
     assert response.status_code == 404
+
+
+def test_job_queued_past_ttl_is_not_purged_before_it_runs(
+    monkeypatch, isolated_job_store
+):
+    async def fake_transcribe_file_path(**kwargs):
+        return TranscriptionResponse(model="small", action="transcribe", text="ok")
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_file_path",
+        fake_transcribe_file_path,
+    )
+    monkeypatch.setattr(transcription_routes, "_last_cleanup", 0.0)
+    isolated_job_store.create({
+        "job_id": "late-job",
+        "kind": "transcription",
+        "status": "queued",
+        "progress": 5,
+        "stage": "queued",
+        "model": "small",
+        "action": "transcribe",
+        "engine": None,
+        "text": None,
+        "error": None,
+        "segments": [],
+        "filename": "audio.wav",
+        "content_type": "audio/wav",
+        "audio_path": None,
+        "created_at": time.time() - 2 * transcription_routes._JOB_TTL_SECONDS,
+    })
+
+    asyncio.run(transcription_routes._cleanup_expired_jobs())
+    asyncio.run(
+        transcription_routes._run_transcription_job(
+            "late-job", ModelType.SMALL, ActionType.TRANSCRIBE
+        )
+    )
+
+    job = isolated_job_store.get("late-job")
+    assert (job["status"], job["text"]) == ("completed", "ok")
+
+
+def test_transcription_job_exposes_segments_from_cursor(
+    client, monkeypatch, isolated_job_store
+):
+    segments = [
+        TranscriptionSegment(start=0.0, end=2.0, text="primeiro"),
+        TranscriptionSegment(start=2.0, end=4.5, text="segundo"),
+    ]
+
+    async def fake_transcribe_file_path(on_segment=None, **kwargs):
+        for segment in segments:
+            on_segment(segment)
+        return TranscriptionResponse(
+            model="small", action="transcribe", text="primeiro segundo"
+        )
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_file_path",
+        fake_transcribe_file_path,
+    )
+    isolated_job_store.create({
+        "job_id": "segment-job",
+        "status": "queued",
+        "progress": 5,
+        "stage": "queued",
+        "model": "small",
+        "action": "transcribe",
+        "engine": None,
+        "text": None,
+        "error": None,
+        "segments": [],
+        "filename": "audio.wav",
+        "content_type": "audio/wav",
+        "audio_path": None,
+        "created_at": time.time(),
+    })
+
+    asyncio.run(
+        transcription_routes._run_transcription_job(
+            "segment-job", ModelType.SMALL, ActionType.TRANSCRIBE
+        )
+    )
+    url = "/api/v1/transcribe/upload/status/segment-job"
+    without_cursor = client.get(url).json()
+    from_second = client.get(url, params={"segments_from": 1}).json()
+
+    assert without_cursor["segments"] == []
+    assert without_cursor["segment_count"] == 2
+    assert from_second["segments"] == [
+        {"start": 2.0, "end": 4.5, "text": "segundo"}
+    ]
+    assert from_second["status"] == "completed"
+
+
+def test_transcription_upload_forwards_requested_engine(
+    client, monkeypatch, sample_audio_file
+):
+    async def fake_transcribe_file(file, model_type, action, engine=None):
+        return TranscriptionResponse(
+            model=model_type.value,
+            action=action.value,
+            text="ok",
+            engine=engine.value,
+        )
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_file",
+        fake_transcribe_file,
+    )
+
+    response = client.post(
+        "/api/v1/transcribe/upload",
+        data={"model": "small", "action": "transcribe", "engine": "faster-whisper"},
+        files=sample_audio_file,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["engine"] == "faster-whisper"
+
+
+def test_transcription_upload_rejects_oversized_file(
+    client, monkeypatch, sample_audio_file
+):
+    monkeypatch.setattr(transcription_routes.settings, "max_file_size", 1024)
+
+    response = client.post(
+        "/api/v1/transcribe/upload",
+        data={"model": "small", "action": "transcribe"},
+        files=sample_audio_file,
+    )
+
+    assert response.status_code == 413
+
+
+def test_upload_limit_middleware_rejects_large_content_length(client):
+    response = client.post(
+        "/api/v1/transcribe/upload/start",
+        headers={
+            "content-type": "multipart/form-data; boundary=x",
+            "content-length": str(10 * 1024 * 1024 * 1024),
+        },
+        content=b"",
+    )
+
+    assert response.status_code == 413
+    assert "limit" in response.json()["detail"]
+
+
+def test_upload_limit_middleware_aborts_streamed_body_past_limit(monkeypatch):
+    inner = FastAPI()
+    chunks_read = []
+
+    @inner.post("/api/v1/transcribe/upload")
+    async def upload(request: Request):
+        async for chunk in request.stream():
+            chunks_read.append(len(chunk))
+        return {"ok": True}
+
+    app = UploadSizeLimitMiddleware(
+        inner, max_file_size=1024, path_prefixes=("/api/v1/transcribe/upload",)
+    )
+    chunk = b"x" * 16 * 1024
+    total_chunks = 100
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < total_chunks - 1}
+        for i in range(total_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/transcribe/upload",
+        "headers": [],
+        "query_string": b"",
+    }
+    received_before = UPLOAD_RECEIVED_BYTES.value()
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert sum(chunks_read) <= 1024 + MULTIPART_OVERHEAD_BYTES
+    assert messages  # the rest of the body was never pulled
+    # Counted as read, the chunk that crossed the limit included
+    pulled = total_chunks - len(messages)
+    assert UPLOAD_RECEIVED_BYTES.value() - received_before == pulled * len(chunk)
+
+
+def test_transcription_upload_start_returns_cached_result(
+    client, monkeypatch, sample_audio_file
+):
+    async def fake_cached_result(content_digest, model_type, action, engine=None):
+        assert content_digest
+        return TranscriptionResponse(
+            model=model_type.value, action=action.value, text="ja transcrito"
+        )
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service, "cached_result", fake_cached_result
+    )
+
+    response = client.post(
+        "/api/v1/transcribe/upload/start",
+        data={"model": "small", "action": "transcribe"},
+        files=sample_audio_file,
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == "completed"
+    status = client.get(f"/api/v1/transcribe/upload/status/{payload['job_id']}")
+    assert status.json()["text"] == "ja transcrito"
+
+
+def test_cancelling_running_job_stops_inference_and_removes_audio(
+    monkeypatch, isolated_job_store, tmp_path
+):
+    audio_path = tmp_path / "upload.wav"
+    audio_path.write_bytes(b"audio")
+    inference_stopped = threading.Event()
+
+    def decode_until_cancelled(cancel_event):
+        # Stands in for an engine checking for cancellation between segments
+        while not cancel_event.wait(0.01):
+            pass
+        inference_stopped.set()
+        raise InferenceCancelled("Transcription cancelled")
+
+    async def fake_transcribe_file_path(cancel_event=None, on_progress=None, **kwargs):
+        on_progress(60, "transcribing")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, decode_until_cancelled, cancel_event)
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_file_path",
+        fake_transcribe_file_path,
+    )
+    isolated_job_store.create(
+        {
+            "job_id": "running-job",
+            "kind": "transcription",
+            "status": "queued",
+            "progress": 5,
+            "stage": "queued",
+            "model": "small",
+            "action": "transcribe",
+            "engine": None,
+            "text": None,
+            "error": None,
+            "segments": [],
+            "filename": "upload.wav",
+            "content_type": "audio/wav",
+            "audio_path": str(audio_path),
+            "created_at": time.time(),
+        }
+    )
+
+    async def scenario():
+        task = asyncio.create_task(
+            transcription_routes._run_transcription_job(
+                "running-job", ModelType.SMALL, ActionType.TRANSCRIBE
+            )
+        )
+        while isolated_job_store.get("running-job")["progress"] != 60:
+            await asyncio.sleep(0.01)
+
+        status = await transcription_routes.cancel_transcription_upload("running-job")
+        # The job is not torn down; it stops at the next segment on its own
+        await asyncio.wait_for(task, 1)
+        return status, task.cancelled()
+
+    status, task_cancelled = asyncio.run(scenario())
+
+    assert status.status == "cancelled"
+    assert not task_cancelled
+    assert inference_stopped.is_set()
+    assert not audio_path.exists()
+    assert isolated_job_store.get("running-job")["status"] == "cancelled"
+    assert "running-job" not in transcription_routes._active_jobs
+
+
+def test_traced_upload_returns_stage_timings(client, monkeypatch, sample_audio_file):
+    async def fake_transcribe_file(file, model_type, action, engine=None):
+        with span("decode"):
+            pass
+        return TranscriptionResponse(
+            model=model_type.value, action=action.value, text="ok"
+        )
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_file",
+        fake_transcribe_file,
+    )
+
+    traced = client.post(
+        "/api/v1/transcribe/upload",
+        data={"model": "small", "action": "transcribe", "trace": "true"},
+        files=sample_audio_file,
+    ).json()
+    untraced = client.post(
+        "/api/v1/transcribe/upload",
+        data={"model": "small", "action": "transcribe"},
+        files=sample_audio_file,
+    ).json()
+
+    assert set(traced["timings"]) == {"upload_read", "decode", "total"}
+    assert untraced["timings"] is None
+
+
+def test_traced_job_reports_submission_and_run_stages(
+    client, monkeypatch, isolated_job_store
+):
+    async def fake_transcribe_file_path(**kwargs):
+        with span("model_load"):
+            pass
+        return TranscriptionResponse(model="small", action="transcribe", text="ok")
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_file_path",
+        fake_transcribe_file_path,
+    )
+    isolated_job_store.create({
+        "job_id": "traced-job",
+        "status": "queued",
+        "progress": 5,
+        "stage": "queued",
+        "model": "small",
+        "action": "transcribe",
+        "engine": None,
+        "text": None,
+        "error": None,
+        "segments": [],
+        "filename": "audio.wav",
+        "content_type": "audio/wav",
+        "audio_path": None,
+        "created_at": time.time() - 2.0,
+        "trace": True,
+        "upload_timings": {"upload_read": 0.5, "temp_file_write": 0.25},
+    })
+
+    asyncio.run(
+        transcription_routes._run_transcription_job(
+            "traced-job", ModelType.SMALL, ActionType.TRANSCRIBE
+        )
+    )
+    timings = client.get("/api/v1/transcribe/upload/status/traced-job").json()[
+        "timings"
+    ]
+
+    assert timings["upload_read"] == 0.5
+    assert timings["temp_file_write"] == 0.25
+    assert timings["job_queue"] >= 2.0
+    assert timings["total"] >= timings["job_queue"]
+    assert "model_load" in timings
@@ -1,12 +1,16 @@
 import asyncio
 import os
+import time
 from io import BytesIO
 
+import numpy as np
 import pytest
 from fastapi import HTTPException, UploadFile
 from starlette.datastructures import Headers
 
+from app.core.config import settings
 from app.schemas.transcription import ActionType, ModelType
+from app.services.tracing import Trace, span, use_trace
 from app.services.whisper_service import WhisperService
 
 
@@ -26,16 +30,30 @@ def test_transcribe_file_accepts_extension_fallback(monkeypatch):
     service = WhisperService()
     observed = {}
 
-    async def fake_get_model(_model_type):
+    async def fake_get_model(_model_type, _engine=None):
         return object()
 
-    async def fake_transcribe_with_model(model, file_path, action):
-        observed["file_path"] = file_path
-        assert os.path.exists(file_path)
+    def fake_decode_audio_stream(stream, extension):
+        observed["extension"] = extension
+        return np.zeros(len(stream.read()), dtype=np.float32)
+
+    async def fake_transcribe_with_model(
+        model,
+        audio,
+        action,
+        model_type,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_event=None,
+    ):
+        observed["samples"] = len(audio)
         assert action == ActionType.TRANSCRIBE
-        return "texto transcrito"
+        return {"text": "texto transcrito", "segments": []}
 
     monkeypatch.setattr(service, "_get_model", fake_get_model)
+    monkeypatch.setattr(
+        "app.services.whisper_service.decode_audio_stream", fake_decode_audio_stream
+    )
     monkeypatch.setattr(
         service, "_transcribe_with_model", fake_transcribe_with_model
     )
@@ -50,7 +68,7 @@ def test_transcribe_file_accepts_extension_fallback(monkeypatch):
 
     assert response.text == "texto transcrito"
     assert response.model == "turbo"
-    assert not os.path.exists(observed["file_path"])
+    assert observed == {"extension": ".opus", "samples": len(b"audio-bytes" * 256)}
 
 
 def test_transcribe_file_rejects_invalid_type():
@@ -69,18 +87,51 @@ def test_transcribe_file_rejects_invalid_type():
     assert "Unsupported file type" in exc_info.value.detail
 
 
-def test_transcribe_file_cleans_up_temp_file_on_failure(monkeypatch):
+def test_transcribe_file_reports_decode_failure(monkeypatch):
     service = WhisperService()
-    observed = {}
 
-    async def fake_get_model(_model_type):
+    def fake_decode_audio_stream(stream, extension):
+        raise RuntimeError("Failed to load audio: invalid data")
+
+    monkeypatch.setattr(
+        "app.services.whisper_service.decode_audio_stream", fake_decode_audio_stream
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            service.transcribe_file(
+                file=build_upload_file("sample.wav", "audio/wav"),
+                model_type=ModelType.SMALL,
+                action=ActionType.TRANSCRIBE,
+            )
+        )
+
+    assert exc_info.value.status_code == 500
+    assert "Transcription failed" in exc_info.value.detail
+
+
+def test_transcribe_file_reports_model_failure(monkeypatch):
+    service = WhisperService()
+
+    async def fake_get_model(_model_type, _engine=None):
         return object()
 
-    async def fake_transcribe_with_model(model, file_path, action):
-        observed["file_path"] = file_path
+    async def fake_transcribe_with_model(
+        model,
+        audio,
+        action,
+        model_type,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_event=None,
+    ):
         raise RuntimeError("transcription failed")
 
     monkeypatch.setattr(service, "_get_model", fake_get_model)
+    monkeypatch.setattr(
+        "app.services.whisper_service.decode_audio_stream",
+        lambda stream, extension: np.zeros(16000, dtype=np.float32),
+    )
     monkeypatch.setattr(
         service, "_transcribe_with_model", fake_transcribe_with_model
     )
@@ -96,7 +147,6 @@ def test_transcribe_file_cleans_up_temp_file_on_failure(monkeypatch):
 
     assert exc_info.value.status_code == 500
     assert "Transcription failed" in exc_info.value.detail
-    assert not os.path.exists(observed["file_path"])
 
 
 def test_transcribe_realtime_chunk_ignores_tiny_audio():
@@ -110,7 +160,7 @@ def test_transcribe_realtime_chunk_ignores_tiny_audio():
         )
     )
 
-    assert result == ""
+    assert result == {"text": "", "segments": []}
 
 
 def test_validate_model_action_rejects_turbo_translation():
@@ -136,3 +186,146 @@ def test_configure_runtime_environment_prepends_ffmpeg_dir(monkeypatch, tmp_path
     service._configure_runtime_environment()
 
     assert os.environ["PATH"].split(os.pathsep)[0] == ffmpeg_dir
+
+
+def test_transcribe_file_cache_hit_skips_decode_and_model(monkeypatch):
+    service = WhisperService()
+    calls = {"decode": 0, "model": 0}
+
+    async def fake_get_model(_model_type, _engine=None):
+        calls["model"] += 1
+        return object()
+
+    def fake_decode_audio_stream(stream, extension):
+        calls["decode"] += 1
+        return np.zeros(16000, dtype=np.float32)
+
+    async def fake_transcribe_with_model(
+        model,
+        audio,
+        action,
+        model_type,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_event=None,
+    ):
+        return {"text": "texto em cache", "segments": []}
+
+    monkeypatch.setattr(service, "_get_model", fake_get_model)
+    monkeypatch.setattr(
+        "app.services.whisper_service.decode_audio_stream", fake_decode_audio_stream
+    )
+    monkeypatch.setattr(
+        service, "_transcribe_with_model", fake_transcribe_with_model
+    )
+
+    async def transcribe_twice():
+        results = []
+        for _ in range(2):
+            results.append(
+                await service.transcribe_file(
+                    file=build_upload_file("sample.wav", "audio/wav"),
+                    model_type=ModelType.SMALL,
+                    action=ActionType.TRANSCRIBE,
+                )
+            )
+        return results
+
+    first, second = asyncio.run(transcribe_twice())
+
+    assert first == second
+    assert calls == {"decode": 1, "model": 1}
+    assert service.result_cache_stats().hits == 1
+
+
+def test_result_cache_key_changes_with_batching_and_longform_settings(monkeypatch):
+    service = WhisperService()
+
+    def key():
+        return service._result_cache_key(
+            "digest", ModelType.SMALL, ActionType.TRANSCRIBE, None
+        )
+
+    keys = [key()]
+    for name, value in (
+        ("enable_batching", not settings.enable_batching),
+        ("longform_window_seconds", settings.longform_window_seconds + 5),
+        ("longform_overlap_seconds", settings.longform_overlap_seconds + 1),
+        ("longform_min_seconds", settings.longform_min_seconds + 60),
+    ):
+        monkeypatch.setattr(settings, name, value)
+        keys.append(key())
+
+    assert len(set(keys)) == len(keys)
+
+
+def test_transcribe_audio_speeds_up_audio_and_reports_original_times(monkeypatch):
+    service = WhisperService()
+    observed = {}
+    monkeypatch.setattr("app.services.whisper_service.settings.vad_enabled", False)
+    monkeypatch.setattr("app.services.whisper_service.settings.enable_speedup", True)
+    monkeypatch.setattr("app.services.whisper_service.settings.speed_small", 1.5)
+    monkeypatch.setattr(
+        "app.services.whisper_service.time_stretch",
+        lambda audio, factor: audio[: int(len(audio) / factor)],
+    )
+
+    async def fake_get_model(_model_type, _engine=None):
+        return object()
+
+    async def fake_transcribe_with_model(
+        model, audio, action, model_type, *args, **kwargs
+    ):
+        observed["samples"] = len(audio)
+        return {
+            "text": "ola",
+            "segments": [{"start": 1.0, "end": 2.0, "text": " ola"}],
+        }
+
+    monkeypatch.setattr(service, "_get_model", fake_get_model)
+    monkeypatch.setattr(service, "_transcribe_with_model", fake_transcribe_with_model)
+
+    response = asyncio.run(
+        service.transcribe_audio(
+            np.zeros(48000, dtype=np.float32), ModelType.SMALL, ActionType.TRANSCRIBE
+        )
+    )
+
+    assert observed["samples"] == 32000
+    assert response.speed_factor == 1.5
+    assert (response.segments[0].start, response.segments[0].end) == (1.5, 3.0)
+
+
+def test_traced_inference_splits_engine_stages(monkeypatch):
+    service = WhisperService()
+
+    class FakeModel:
+        def transcribe(self, audio, **options):
+            with span("mel"):
+                time.sleep(0.01)
+            with span("encoder"):
+                time.sleep(0.02)
+            time.sleep(0.01)
+            return {"text": "ola", "segments": []}
+
+    async def fake_get_model(_model_type, _engine=None):
+        return FakeModel()
+
+    monkeypatch.setattr(service, "_get_model", fake_get_model)
+    trace = Trace("test")
+
+    async def run():
+        with use_trace(trace):
+            return await service.transcribe_audio(
+                np.zeros(16000, dtype=np.float32),
+                ModelType.SMALL,
+                ActionType.TRANSCRIBE,
+            )
+
+    assert asyncio.run(run()).text == "ola"
+    stages = trace.stages()
+    assert {"model_load", "queue_wait", "mel", "encoder", "decoder"} <= set(stages)
+    assert stages["encoder"] >= 0.02
+    assert stages["decoder"] == pytest.approx(
+        stages["inference"] - stages["mel"] - stages["encoder"]
+    )
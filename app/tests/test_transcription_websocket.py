@@ -1,4 +1,8 @@
+import asyncio
 import json
+import threading
+
+import numpy as np
 
 from app.routes import transcription as transcription_routes
 
@@ -72,14 +76,23 @@ def test_websocket_rejects_turbo_translation_configuration(client):
     )
 
 
-def test_websocket_transcribes_after_two_chunks(
-    client, monkeypatch, sample_audio_bytes
+def _segments(text, seconds=1.0):
+    return {"text": text, "segments": [{"start": 0.0, "end": seconds, "text": text}]}
+
+
+def test_websocket_sends_partials_and_commits_agreed_words(
+    client, monkeypatch, sample_audio_bytes, fake_streaming_decoder
 ):
-    async def fake_transcribe_realtime_chunk(audio_data, model_type, action):
-        assert len(audio_data) >= len(sample_audio_bytes) * 2
+    hypotheses = iter(["ola mu", "ola mundo", "ola mundo inteiro"])
+    calls = []
+
+    async def fake_transcribe_realtime_chunk(
+        audio_data, model_type, action, engine=None, initial_prompt=None
+    ):
+        calls.append(len(audio_data))
         assert model_type.value == "medium"
         assert action.value == "transcribe"
-        return "segmento concluido"
+        return _segments(next(hypotheses))
 
     monkeypatch.setattr(
         transcription_routes.whisper_service,
@@ -95,19 +108,123 @@ def test_websocket_transcribes_after_two_chunks(
 
         websocket.send_bytes(sample_audio_bytes)
         websocket.send_bytes(sample_audio_bytes)
+        first = websocket.receive_json()
+
+        websocket.send_bytes(sample_audio_bytes)
+        websocket.send_bytes(sample_audio_bytes)
+        committed = websocket.receive_json()
+        partial = websocket.receive_json()
+
+    assert first == {"text": "ola mu", "is_partial": True, "is_final_segment": False}
+    assert committed == {"text": "ola", "is_partial": False, "is_final_segment": False}
+    assert partial["text"] == "mundo"
+    assert partial["is_partial"] is True
+    # The second pass decodes the whole window again, not just the new chunks
+    assert calls[1] == calls[0] * 2
+
+
+def test_websocket_keeps_receiving_while_window_is_decoded(
+    client, monkeypatch, sample_audio_bytes, fake_streaming_decoder
+):
+    release = threading.Event()
+
+    async def fake_transcribe_realtime_chunk(
+        audio_data, model_type, action, engine=None, initial_prompt=None
+    ):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return _segments("depois")
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_realtime_chunk",
+        fake_transcribe_realtime_chunk,
+    )
+
+    with client.websocket_connect("/api/v1/transcribe/realtime") as websocket:
+        config = {"type": "config", "model": "small", "action": "transcribe"}
+        websocket.send_text(json.dumps(config))
+        assert websocket.receive_json()["type"] == "config_ack"
+
+        websocket.send_bytes(sample_audio_bytes)
+        websocket.send_bytes(sample_audio_bytes)
+        # Decoding is stuck, yet the next message is answered
+        websocket.send_text(json.dumps(config))
+        acknowledged = websocket.receive_json()
+        release.set()
+        partial = websocket.receive_json()
+
+    assert acknowledged["type"] == "config_ack"
+    assert partial["text"] == "depois"
+
+
+def test_websocket_accepts_negotiated_raw_pcm(client, monkeypatch):
+    received = []
+
+    async def fake_transcribe_realtime_chunk(
+        audio_data, model_type, action, engine=None, initial_prompt=None
+    ):
+        received.append(audio_data)
+        return _segments("pcm")
+
+    monkeypatch.setattr(
+        transcription_routes.whisper_service,
+        "transcribe_realtime_chunk",
+        fake_transcribe_realtime_chunk,
+    )
+    monkeypatch.setattr(
+        transcription_routes.settings, "realtime_pcm_step_seconds", 0.5
+    )
+    frame = np.full(4000, 0.1, dtype="<f4").tobytes()  # 250 ms
+
+    with client.websocket_connect("/api/v1/transcribe/realtime") as websocket:
+        websocket.send_text(
+            json.dumps(
+                {
+                    "type": "config",
+                    "model": "small",
+                    "action": "transcribe",
+                    "format": "pcm_f32le",
+                }
+            )
+        )
+        assert websocket.receive_json()["format"] == "pcm_f32le"
+
+        websocket.send_bytes(frame)
+        websocket.send_bytes(frame)
+        partial = websocket.receive_json()
+
+    assert partial["text"] == "pcm"
+    assert len(received[0]) == 8000
+    assert np.allclose(received[0], 0.1)
+
+
+def test_websocket_rejects_unknown_audio_format(client):
+    with client.websocket_connect("/api/v1/transcribe/realtime") as websocket:
+        websocket.send_text(
+            json.dumps(
+                {
+                    "type": "config",
+                    "model": "small",
+                    "action": "transcribe",
+                    "format": "mp3",
+                }
+            )
+        )
         response = websocket.receive_json()
 
-    assert response["text"] == "segmento concluido"
-    assert response["is_partial"] is False
-    assert response["is_final_segment"] is False
+    assert response["type"] == "error"
+    assert response["message"].startswith("Invalid configuration: Unsupported format")
 
 
 def test_websocket_flushes_remaining_audio(
-    client, monkeypatch, sample_audio_bytes
+    client, monkeypatch, sample_audio_bytes, fake_streaming_decoder
 ):
-    async def fake_transcribe_realtime_chunk(audio_data, model_type, action):
+    async def fake_transcribe_realtime_chunk(
+        audio_data, model_type, action, engine=None, initial_prompt=None
+    ):
         assert len(audio_data) >= len(sample_audio_bytes)
-        return "segmento final"
+        return _segments("segmento final")
 
     monkeypatch.setattr(
         transcription_routes.whisper_service,
@@ -130,3 +247,23 @@ def test_websocket_flushes_remaining_audio(
     assert final_segment["text"] == "segmento final"
     assert final_segment["is_final_segment"] is True
     assert done_signal["type"] == "done"
+
+
+def test_websocket_rejects_unsupported_engine(client):
+    with client.websocket_connect("/api/v1/transcribe/realtime") as websocket:
+        websocket.send_text(
+            json.dumps(
+                {
+                    "type": "config",
+                    "model": "small",
+                    "action": "transcribe",
+                    "engine": "whisper-cpp",
+                }
+            )
+        )
+        response = websocket.receive_json()
+
+    assert response["type"] == "error"
+    assert response["message"].startswith(
+        "Invalid configuration: Unsupported engine: whisper-cpp."
+    )
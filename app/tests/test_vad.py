@@ -0,0 +1,131 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.schemas.transcription import ActionType, ModelType
+from app.services import vad
+from app.services.audio import SAMPLE_RATE
+from app.services.vad import VadStats, detect_speech
+from app.core.config import Settings
+from app.services.whisper_service import WhisperService
+
+
+@pytest.fixture
+def vad_settings(monkeypatch):
+    prefix = "app.services.vad.settings"
+    monkeypatch.setattr(f"{prefix}.vad_backend", "energy")
+    monkeypatch.setattr(f"{prefix}.vad_threshold_db", -45.0)
+    monkeypatch.setattr(f"{prefix}.vad_min_speech_ms", 250)
+    monkeypatch.setattr(f"{prefix}.vad_min_silence_ms", 2000)
+    monkeypatch.setattr(f"{prefix}.vad_padding_ms", 100)
+    monkeypatch.setattr("app.services.vad.vad_stats", VadStats())
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_detect_speech_cuts_long_silences_only(vad_settings):
+    audio = np.concatenate(
+        [silence(3), tone(1), silence(0.5), tone(1), silence(5), tone(1)]
+    )
+
+    speech = detect_speech(audio)
+
+    # the short pause stays, the leading and long silences go
+    assert len(speech.regions) == 2
+    assert speech.regions[0][0] == pytest.approx(2.9 * SAMPLE_RATE, abs=480)
+    assert len(speech.audio) / SAMPLE_RATE == pytest.approx(2.7 + 1.1, abs=0.05)
+    assert speech.skipped_seconds == pytest.approx(11.5 - 3.8, abs=0.05)
+
+
+def test_detect_speech_maps_times_back_to_input(vad_settings):
+    audio = np.concatenate([silence(4), tone(1), silence(4), tone(1)])
+
+    speech = detect_speech(audio)
+
+    assert speech.original_time(0.0) == pytest.approx(3.9, abs=0.03)
+    assert speech.original_time(1.3) == pytest.approx(8.9 + 0.1, abs=0.03)
+
+
+def test_detect_speech_reports_silent_input(vad_settings):
+    speech = detect_speech(silence(2))
+
+    assert not speech.has_speech
+    assert vad.vad_stats.snapshot() == {
+        "input_seconds": 2.0,
+        "skipped_seconds": 2.0,
+        "silent_inputs": 1,
+    }
+
+
+def test_silent_upload_skips_model_loading(vad_settings, monkeypatch):
+    service = WhisperService()
+    monkeypatch.setattr("app.services.whisper_service.settings.vad_enabled", True)
+
+    async def fail_get_model(_model_type, _engine=None):
+        raise AssertionError("model must not be loaded for silence")
+
+    monkeypatch.setattr(service, "_get_model", fail_get_model)
+
+    response = asyncio.run(
+        service.transcribe_audio(silence(5), ModelType.SMALL, ActionType.TRANSCRIBE)
+    )
+
+    assert response.text == ""
+
+
+def test_quiet_speech_reaches_the_model_with_default_settings(monkeypatch):
+    service = WhisperService()
+    monkeypatch.setattr(
+        "app.services.whisper_service.settings.vad_enabled",
+        Settings.model_fields["vad_enabled"].default,
+    )
+    # Far below the energy threshold, but not silence
+    quiet = tone(3) * 0.005
+    seen = []
+
+    async def fake_get_model(_model_type, _engine=None):
+        return object()
+
+    async def fake_transcribe_with_model(model, audio, *args, **kwargs):
+        seen.append(len(audio))
+        return {"text": "baixinho", "segments": []}
+
+    monkeypatch.setattr(service, "_get_model", fake_get_model)
+    monkeypatch.setattr(service, "_transcribe_with_model", fake_transcribe_with_model)
+
+    response = asyncio.run(
+        service.transcribe_audio(quiet, ModelType.SMALL, ActionType.TRANSCRIBE)
+    )
+
+    assert response.text == "baixinho"
+    assert seen == [len(quiet)]
+
+
+def test_silent_realtime_container_chunk_skips_model_loading(vad_settings, monkeypatch):
+    service = WhisperService()
+    monkeypatch.setattr("app.services.whisper_service.settings.vad_enabled", True)
+    monkeypatch.setattr(
+        "app.services.whisper_service.decode_audio_bytes",
+        lambda data, extension: silence(3),
+    )
+
+    async def fail_get_model(_model_type, _engine=None):
+        raise AssertionError("model must not be loaded for silence")
+
+    monkeypatch.setattr(service, "_get_model", fail_get_model)
+
+    result = asyncio.run(
+        service.transcribe_realtime_chunk(
+            b"webm" * 1024, ModelType.SMALL, ActionType.TRANSCRIBE
+        )
+    )
+
+    assert result == {"text": "", "segments": []}
@@ -0,0 +1,7 @@
+"""Accuracy-vs-speed benchmarks for the transcription service.
+
+``python -m benchmarks.run`` transcribes a manifest of local recordings
+across models, actions, engines and speedup factors and records the
+results to CSV; ``python -m benchmarks.report`` summarises and compares
+those CSVs.
+"""
@@ -0,0 +1,409 @@
+"""Load-test a running server over HTTP and WebSocket.
+
+Scenarios:
+
+- ``upload``: ``POST /api/v1/transcribe/upload``; latency is the response time.
+- ``job``: ``POST /upload/start`` then status polling; latency runs until
+  the job completes.
+- ``realtime``: WebSocket sessions streaming raw PCM in chunks paced at
+  real time, then a flush. Each session reports its final lag (flush to
+  ``done``), the gaps between transcript updates and any audio the server
+  dropped under backpressure.
+
+Without ``--rate``, ``--concurrency`` clients run back to back (closed
+loop). With ``--rate``, arrivals are Poisson at that many per second, at
+most ``--concurrency`` in flight (open loop). Latency is then measured
+from the scheduled arrival, so time spent waiting for a free client
+counts and saturation shows up instead of being hidden.
+
+Synthetic audio gets fresh noise for every upload, so no request is a
+result cache hit; an ``--audio`` file is sent as is, so run the server with
+``VBZ_RESULT_CACHE_ENABLED=false`` for it. To find saturation points
+without a GPU, run the server with the stub engine::
+
+    VBZ_STUB_ENGINE_ENABLED=true VBZ_WHISPER_ENGINE=stub \\
+        VBZ_RESULT_CACHE_ENABLED=false python -m app.main
+    PYTHONPATH=. python -m benchmarks.load upload --rate 4 --duration 60
+    PYTHONPATH=. python -m benchmarks.load realtime --concurrency 8 --seconds 30
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import mimetypes
+import random
+import sys
+import time
+import wave
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - depends on local runtime
+    websockets = None
+
+SAMPLE_RATE = 16000
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+# Upper bounds of the latency histogram buckets, in seconds
+HISTOGRAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 60, 120, math.inf)
+QUANTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+
+
+@dataclass
+class Sample:
+    """The audio every request sends, as an upload and as PCM."""
+
+    name: str
+    payload: bytes
+    content_type: str
+    pcm: np.ndarray
+    # Synthetic audio gets fresh noise per request, so no upload is a
+    # result cache hit
+    synthetic: bool = False
+
+    @property
+    def seconds(self) -> float:
+        return len(self.pcm) / SAMPLE_RATE
+
+    def payload_for(self, request: int) -> bytes:
+        if not self.synthetic:
+            return self.payload
+        return _wav_bytes(_synthetic_pcm(self.seconds, seed=request))
+
+
+def _wav_bytes(pcm: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(pcm, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _synthetic_pcm(seconds: float, seed: int) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    rng = np.random.default_rng(seed)
+    pcm = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))
+    return pcm.astype(np.float32)
+
+
+def synthetic_sample(seconds: float) -> Sample:
+    """A tone with noise, loud enough to pass the server's VAD."""
+    pcm = _synthetic_pcm(seconds, seed=0)
+    return Sample("synthetic.wav", _wav_bytes(pcm), "audio/wav", pcm, synthetic=True)
+
+
+def load_sample(path: Path) -> Sample:
+    payload = path.read_bytes()
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path)) as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (
+                SAMPLE_RATE,
+                1,
+                2,
+            ):
+                raise SystemExit(f"{path}: realtime replay needs 16 kHz mono 16-bit WAV")
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), "<i2")
+        pcm = pcm.astype(np.float32) / 32768.0
+    else:
+        # Anything else is decoded the way the server does it (needs ffmpeg)
+        from app.services.audio import load_audio_file
+
+        pcm = load_audio_file(str(path))
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return Sample(path.name, payload, content_type, pcm)
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    """Nearest-rank percentile; None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def histogram(values: list[float], width: int = 40) -> str:
+    counts = Counter(
+        next(bound for bound in HISTOGRAM_BUCKETS if value <= bound)
+        for value in values
+    )
+    most = max(counts.values(), default=1)
+    lines = []
+    for bound in HISTOGRAM_BUCKETS:
+        if not counts[bound]:
+            continue
+        label = "   inf" if bound == math.inf else f"{bound:>6g}"
+        bar = "#" * max(1, round(counts[bound] / most * width))
+        lines.append(f"  <= {label} s {counts[bound]:>6}  {bar}")
+    return "\n".join(lines)
+
+
+@dataclass
+class Results:
+    latencies: list[float] = field(default_factory=list)
+    outcomes: Counter = field(default_factory=Counter)
+    audio_seconds: float = 0.0
+    # Realtime sessions only
+    final_lags: list[float] = field(default_factory=list)
+    update_gaps: list[float] = field(default_factory=list)
+    dropped_seconds: float = 0.0
+
+    def succeeded(self, latency: float, audio_seconds: float) -> None:
+        self.latencies.append(latency)
+        self.audio_seconds += audio_seconds
+        self.outcomes["ok"] += 1
+
+    def report(self, wall_seconds: float) -> dict:
+        total = sum(self.outcomes.values())
+        summary = {
+            "requests": total,
+            "outcomes": dict(self.outcomes),
+            "error_rate": (total - self.outcomes["ok"]) / total if total else 0.0,
+            "throughput_rps": self.outcomes["ok"] / wall_seconds,
+            "audio_seconds_per_second": self.audio_seconds / wall_seconds,
+            "latency_s": {
+                name: percentile(self.latencies, fraction)
+                for name, fraction in QUANTILES
+            },
+        }
+        if self.final_lags or self.update_gaps:
+            summary["realtime"] = {
+                "final_lag_s": {
+                    name: percentile(self.final_lags, fraction)
+                    for name, fraction in QUANTILES
+                },
+                "update_gap_p95_s": percentile(self.update_gaps, 0.95),
+                "dropped_audio_s": self.dropped_seconds,
+            }
+        return summary
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, sample: Sample):
+        self.args = args
+        self.sample = sample
+        self.results = Results()
+        self.base_url = args.url.rstrip("/")
+        self.headers = {"X-App-Secret": args.secret} if args.secret else {}
+        self._uploads = 0
+
+    def _form(self) -> dict:
+        form = {"model": self.args.model, "action": self.args.action}
+        if self.args.engine:
+            form["engine"] = self.args.engine
+        return form
+
+    def _files(self) -> dict:
+        self._uploads += 1
+        payload = self.sample.payload_for(self._uploads)
+        return {"file": (self.sample.name, payload, self.sample.content_type)}
+
+    def _fail(self, outcome: str) -> None:
+        self.results.outcomes[outcome] += 1
+
+    async def upload(self, client: httpx.AsyncClient, scheduled: float) -> None:
+        response = await client.post(
+            "/api/v1/transcribe/upload", data=self._form(), files=self._files()
+        )
+        if response.status_code != 200:
+            return self._fail(f"http_{response.status_code}")
+        self.results.succeeded(time.perf_counter() - scheduled, self.sample.seconds)
+
+    async def job(self, client: httpx.AsyncClient, scheduled: float) -> None:
+        response = await client.post(
+            "/api/v1/transcribe/upload/start", data=self._form(), files=self._files()
+        )
+        if response.status_code != 200:
+            return self._fail(f"http_{response.status_code}")
+
+        job_id = response.json()["job_id"]
+        status = response.json()["status"]
+        while status not in TERMINAL_STATUSES:
+            await asyncio.sleep(self.args.poll_interval)
+            response = await client.get(f"/api/v1/transcribe/upload/status/{job_id}")
+            if response.status_code != 200:
+                return self._fail(f"http_{response.status_code}")
+            status = response.json()["status"]
+
+        if status != "completed":
+            return self._fail(f"job_{status}")
+        self.results.succeeded(time.perf_counter() - scheduled, self.sample.seconds)
+
+    async def realtime(self, _client: httpx.AsyncClient, scheduled: float) -> None:
+        url = self.base_url.replace("http", "ws", 1) + "/api/v1/transcribe/realtime"
+        if self.args.secret:
+            url += f"?secret={self.args.secret}"
+        chunk = int(self.args.chunk_seconds * SAMPLE_RATE)
+        frames = (self.sample.pcm * 32767).astype("<i2")
+
+        async with websockets.connect(url, max_size=None) as socket:
+            config = {**self._form(), "type": "config", "format": "pcm_s16le"}
+            await socket.send(json.dumps(config))
+            ack = json.loads(await socket.recv())
+            if ack.get("type") != "config_ack":
+                return self._fail("ws_config_rejected")
+
+            updates: list[float] = []
+            errors: list[str] = []
+            done = asyncio.Event()
+
+            async def receive() -> None:
+                async for raw in socket:
+                    message = json.loads(raw)
+                    kind = message.get("type")
+                    if kind == "done":
+                        done.set()
+                        return
+                    if kind == "error":
+                        errors.append(message.get("message", ""))
+                    elif kind == "backpressure":
+                        self.results.dropped_seconds += message["dropped_seconds"]
+                    elif "text" in message:
+                        updates.append(time.perf_counter())
+
+            receiver = asyncio.create_task(receive())
+            started = time.perf_counter()
+            try:
+                for offset in range(0, len(frames), chunk):
+                    await socket.send(frames[offset : offset + chunk].tobytes())
+                    # Pace the stream like a live microphone
+                    sent_until = started + (offset + chunk) / SAMPLE_RATE
+                    await asyncio.sleep(max(0.0, sent_until - time.perf_counter()))
+
+                flushed = time.perf_counter()
+                await socket.send(json.dumps({"type": "flush"}))
+                await asyncio.wait_for(done.wait(), timeout=self.args.timeout)
+            finally:
+                receiver.cancel()
+
+        final_lag = time.perf_counter() - flushed
+        self.results.final_lags.append(final_lag)
+        self.results.update_gaps.extend(
+            later - earlier for earlier, later in zip(updates, updates[1:])
+        )
+        if errors:
+            return self._fail("ws_error")
+        self.results.succeeded(time.perf_counter() - scheduled, self.sample.seconds)
+
+    async def _measure(self, scenario, client: httpx.AsyncClient, scheduled: float):
+        try:
+            await scenario(client, scheduled)
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            self._fail("timeout")
+        except Exception as exc:
+            self._fail(type(exc).__name__)
+
+    async def run(self) -> float:
+        """Drive the scenario until the duration or request count is reached."""
+        scenario = getattr(self, self.args.scenario)
+        deadline = time.perf_counter() + self.args.duration
+        remaining = self.args.requests or math.inf
+
+        def more() -> bool:
+            nonlocal remaining
+            if remaining <= 0 or time.perf_counter() >= deadline:
+                return False
+            remaining -= 1
+            return True
+
+        limits = httpx.Limits(max_connections=self.args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=self.args.timeout,
+            limits=limits,
+        ) as client:
+            started = time.perf_counter()
+            if self.args.rate:
+                slots = asyncio.Semaphore(self.args.concurrency)
+                tasks = []
+
+                async def arrival(scheduled: float) -> None:
+                    async with slots:
+                        await self._measure(scenario, client, scheduled)
+
+                scheduled = time.perf_counter()
+                while more():
+                    tasks.append(asyncio.create_task(arrival(scheduled)))
+                    scheduled += random.expovariate(self.args.rate)
+                    await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await asyncio.gather(*tasks)
+            else:
+
+                async def client_loop() -> None:
+                    while more():
+                        await self._measure(scenario, client, time.perf_counter())
+
+                await asyncio.gather(
+                    *(client_loop() for _ in range(self.args.concurrency))
+                )
+            return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario", choices=("upload", "job", "realtime"))
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--secret", help="VBZ_APP_SECRET of the server, if set")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, help="arrivals per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--requests", type=int, help="stop after this many")
+    parser.add_argument("--audio", type=Path, help="audio file to send")
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=10.0,
+        help="length of the synthetic audio sent without --audio",
+    )
+    parser.add_argument("--model", default="turbo")
+    parser.add_argument("--action", default="transcribe")
+    parser.add_argument("--engine")
+    parser.add_argument("--chunk-seconds", type=float, default=0.5)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--json", type=Path, help="also write the summary here")
+    args = parser.parse_args(argv)
+
+    if args.scenario == "realtime" and websockets is None:
+        raise SystemExit("The 'websockets' package is required for realtime load")
+
+    sample = load_sample(args.audio) if args.audio else synthetic_sample(args.seconds)
+    if args.audio and args.scenario != "realtime":
+        print(
+            f"warning: every request uploads the same {args.audio.name}; unless the "
+            "server runs with VBZ_RESULT_CACHE_ENABLED=false, all but the first "
+            "are result cache hits and measure the cache, not inference",
+            file=sys.stderr,
+        )
+    load_test = LoadTest(args, sample)
+    wall_seconds = asyncio.run(load_test.run())
+    summary = {
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "audio_seconds": sample.seconds,
+        "wall_seconds": wall_seconds,
+        **load_test.results.report(wall_seconds),
+    }
+
+    print(json.dumps(summary, indent=2))
+    if load_test.results.latencies:
+        print("\nLatency histogram:")
+        print(histogram(load_test.results.latencies))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 0 if load_test.results.outcomes["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
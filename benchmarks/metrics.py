@@ -0,0 +1,94 @@
+import os
+import re
+import resource
+import sys
+import threading
+import time
+
+try:
+    import jiwer
+except ImportError:  # pragma: no cover - depends on local runtime
+    jiwer = None
+
+_PUNCTUATION = re.compile(r"[^\w\s']|(?<!\w)'|'(?!\w)")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace.
+
+    Whisper's casing and punctuation vary between models and engines; they
+    are not what the error rates are meant to measure.
+    """
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def error_rates(reference: str, hypothesis: str) -> tuple[float, float]:
+    """Word and character error rate of ``hypothesis`` against ``reference``."""
+    if jiwer is None:
+        raise RuntimeError("The 'jiwer' package is required to score transcripts")
+
+    reference = normalize_text(reference)
+    hypothesis = normalize_text(hypothesis)
+    if not reference:
+        raise ValueError("Empty reference transcript")
+    return jiwer.wer(reference, hypothesis), jiwer.cer(reference, hypothesis)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size; the peak so far where that is all there is."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakMemory:
+    """Highest resident set size of this process while the block runs.
+
+    Sampled by a background thread, so short spikes between samples can
+    be missed. Memory of inference worker processes is not included.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / (1024 * 1024)
+
+    def _sample(self) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, _rss_bytes())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "PeakMemory":
+        self.peak_bytes = _rss_bytes()
+        self._thread = threading.Thread(
+            target=self._sample, name="benchmark-rss", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> bool:
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, _rss_bytes())
+        return False
+
+
+class Stopwatch:
+    def __enter__(self) -> "Stopwatch":
+        self._start = time.perf_counter()
+        self.seconds = 0.0
+        return self
+
+    def __exit__(self, *_exc) -> bool:
+        self.seconds = time.perf_counter() - self._start
+        return False
@@ -0,0 +1,158 @@
+"""Summarise benchmark CSVs and compare them against a baseline.
+
+Rows are grouped by model, action, engine and speedup factor. Error
+rates are pooled over the corpus: each recording's rate is weighted by the
+length of its reference. Speed is reported as the total real-time factor
+(processing time over audio time). Example::
+
+    PYTHONPATH=. python -m benchmarks.report benchmarks/results/new.csv \\
+        --baseline benchmarks/results/main.csv --max-wer-increase 0.005
+
+With ``--baseline``, each configuration is compared with the same
+configuration in the baseline. The command exits with status 1 when any
+configuration's WER grew by more than ``--max-wer-increase`` (absolute),
+so a performance change that costs accuracy cannot pass unnoticed.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - depends on local runtime
+    pd = None
+
+try:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:  # pragma: no cover - depends on local runtime
+    plt = None
+
+CONFIGURATION = ["model", "action", "engine", "speed"]
+
+
+def _pooled(values, weights):
+    mask = values.notna() & weights.notna()
+    if not mask.any():
+        return float("nan")
+    return float((values[mask] * weights[mask]).sum() / weights[mask].sum())
+
+
+def summarize(results: "pd.DataFrame") -> "pd.DataFrame":
+    """One row per configuration with pooled error rates and speed."""
+    rows = []
+    for key, group in results.groupby(CONFIGURATION, sort=True):
+        rows.append(
+            {
+                **dict(zip(CONFIGURATION, key)),
+                "recordings": group["audio"].nunique(),
+                "audio_s": group["duration_s"].sum(),
+                "wer": _pooled(group["wer"], group["reference_words"]),
+                "cer": _pooled(group["cer"], group["reference_chars"]),
+                "rtf": group["elapsed_s"].sum() / group["duration_s"].sum(),
+                "load_s": group["load_s"].max(),
+                "peak_rss_mb": group["peak_rss_mb"].max(),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def compare(summary: "pd.DataFrame", baseline: "pd.DataFrame") -> "pd.DataFrame":
+    """``summary`` with the baseline's WER and RTF and the change in each."""
+    merged = summary.merge(
+        baseline[CONFIGURATION + ["wer", "rtf"]],
+        on=CONFIGURATION,
+        how="left",
+        suffixes=("", "_baseline"),
+    )
+    merged["wer_delta"] = merged["wer"] - merged["wer_baseline"]
+    merged["rtf_change"] = merged["rtf"] / merged["rtf_baseline"] - 1
+    return merged
+
+
+def to_markdown(table: "pd.DataFrame") -> str:
+    def cell(value) -> str:
+        if isinstance(value, float):
+            return "-" if value != value else f"{value:.4g}"
+        return str(value)
+
+    lines = [
+        "| " + " | ".join(table.columns) + " |",
+        "|" + "---|" * len(table.columns),
+    ]
+    lines.extend(
+        "| " + " | ".join(cell(value) for value in row) + " |"
+        for row in table.itertuples(index=False)
+    )
+    return "\n".join(lines) + "\n"
+
+
+def plot(summary: "pd.DataFrame", path: Path) -> None:
+    """Scatter of real-time factor against WER, one point per configuration."""
+    figure, axes = plt.subplots(figsize=(8, 5))
+    for (model, engine), group in summary.groupby(["model", "engine"]):
+        axes.plot(group["rtf"], group["wer"], marker="o", label=f"{engine} {model}")
+        for row in group.itertuples():
+            axes.annotate(
+                f"x{row.speed:g} {row.action}",
+                (row.rtf, row.wer),
+                fontsize=7,
+                xytext=(3, 3),
+                textcoords="offset points",
+            )
+    axes.set_xlabel("real-time factor (lower is faster)")
+    axes.set_ylabel("WER")
+    axes.legend(fontsize=8)
+    axes.grid(alpha=0.3)
+    figure.tight_layout()
+    figure.savefig(path, dpi=120)
+    plt.close(figure)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("results", type=Path, nargs="+", help="benchmark CSVs")
+    parser.add_argument("--baseline", type=Path, nargs="*", default=[])
+    parser.add_argument(
+        "--max-wer-increase",
+        type=float,
+        default=None,
+        help="fail when a configuration's WER grows by more than this",
+    )
+    parser.add_argument("--output-dir", type=Path, default=Path("benchmarks/reports"))
+    args = parser.parse_args(argv)
+
+    if pd is None:
+        raise SystemExit("The 'pandas' package is required for benchmark reports")
+
+    summary = summarize(pd.concat(map(pd.read_csv, args.results)))
+    if args.baseline:
+        summary = compare(
+            summary, summarize(pd.concat(map(pd.read_csv, args.baseline)))
+        )
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(args.output_dir / "summary.csv", index=False)
+    markdown = to_markdown(summary)
+    (args.output_dir / "summary.md").write_text(markdown, encoding="utf-8")
+    if plt is not None:
+        plot(summary, args.output_dir / "rtf_vs_wer.png")
+    print(markdown)
+
+    if args.max_wer_increase is not None and "wer_delta" in summary:
+        regressed = summary[summary["wer_delta"] > args.max_wer_increase]
+        if not regressed.empty:
+            print(
+                f"WER grew by more than {args.max_wer_increase} for:\n"
+                + to_markdown(regressed[CONFIGURATION + ["wer_baseline", "wer"]]),
+                file=sys.stderr,
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
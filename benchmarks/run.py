@@ -0,0 +1,283 @@
+"""Run the transcription benchmark matrix over a manifest of recordings.
+
+The manifest is a JSON Lines file, one recording per line::
+
+    {"audio": "clips/meeting.ogg", "reference": "...", "reference_translation": "..."}
+
+``audio`` is resolved against the manifest's directory. ``reference`` is
+the transcript in the spoken language (scored for ``transcribe``) and the
+optional ``reference_translation`` its English translation (scored for
+``translate_english``). Recordings without the reference for an action are
+still timed, with empty error rates.
+
+Every combination of model, action, engine and speedup factor is run on
+every recording and appended to the output CSV as it finishes. Combinations
+the service rejects (turbo cannot translate) and engines that are not
+installed are skipped. Example::
+
+    PYTHONPATH=. python -m benchmarks.run --manifest bench/manifest.jsonl \\
+        --models small,turbo --engines faster-whisper --speeds 1.0,1.25,1.5
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.schemas.transcription import ActionType, EngineType, ModelType
+from app.services.audio import SAMPLE_RATE, load_audio_file
+from app.services.engines import get_engine
+from app.services.whisper_service import get_whisper_service
+from benchmarks.metrics import PeakMemory, Stopwatch, error_rates
+
+logger = logging.getLogger("benchmarks")
+
+# Manifest field holding the reference scored for each action
+REFERENCE_FIELDS = {
+    ActionType.TRANSCRIBE: "reference",
+    ActionType.TRANSLATE_ENGLISH: "reference_translation",
+}
+
+COLUMNS = [
+    "run_id",
+    "audio",
+    "duration_s",
+    "model",
+    "action",
+    "engine",
+    "speed",
+    "speed_applied",
+    "vad_enabled",
+    "inference_mode",
+    "repeat",
+    "load_s",
+    "elapsed_s",
+    "rtf",
+    "wer",
+    "cer",
+    "reference_words",
+    "reference_chars",
+    "peak_rss_mb",
+    "hypothesis",
+]
+
+
+@dataclass(frozen=True)
+class Recording:
+    audio: Path
+    references: dict[ActionType, str]
+
+
+def load_manifest(path: Path) -> list[Recording]:
+    recordings = []
+    with path.open(encoding="utf-8") as manifest:
+        for number, line in enumerate(manifest, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "audio" not in entry:
+                raise ValueError(f"{path}:{number}: missing 'audio'")
+            recordings.append(
+                Recording(
+                    audio=(path.parent / entry["audio"]).resolve(),
+                    references={
+                        action: entry[field]
+                        for action, field in REFERENCE_FIELDS.items()
+                        if entry.get(field)
+                    },
+                )
+            )
+    return recordings
+
+
+def _parse_list(value: str, kind):
+    return [kind(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def _installed_engines(engines: list[EngineType]) -> list[EngineType]:
+    installed = []
+    for engine in engines:
+        try:
+            get_engine(engine).ensure_available()
+        except HTTPException as exc:
+            logger.warning("Skipping %s: %s", engine.value, exc.detail)
+            continue
+        installed.append(engine)
+    return installed
+
+
+def _set_speed(model_type: ModelType, speed: float) -> None:
+    settings.enable_speedup = speed != 1.0
+    setattr(settings, f"speed_{model_type.value}", speed)
+
+
+async def run_benchmark(
+    recordings: list[Recording],
+    models: list[ModelType],
+    actions: list[ActionType],
+    engines: list[EngineType],
+    speeds: list[float],
+    repeat: int,
+    output: Path,
+) -> int:
+    """Run the matrix, appending one CSV row per transcription; returns the row count."""
+    service = get_whisper_service()
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    original_speedup = (
+        settings.enable_speedup,
+        {model: getattr(settings, f"speed_{model.value}") for model in ModelType},
+    )
+
+    # Decoding is not what is measured; every recording is decoded once
+    audio = {
+        recording.audio: load_audio_file(str(recording.audio))
+        for recording in recordings
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not output.exists() or output.stat().st_size == 0
+    rows = 0
+    with output.open("a", newline="", encoding="utf-8") as results:
+        writer = csv.DictWriter(results, fieldnames=COLUMNS)
+        if write_header:
+            writer.writeheader()
+
+        try:
+            for engine, model_type in itertools.product(engines, models):
+                runnable = []
+                for action in actions:
+                    try:
+                        service.validate_model_action(model_type, action)
+                    except HTTPException as exc:
+                        logger.info("Skipping %s: %s", model_type.value, exc.detail)
+                        continue
+                    runnable.append(action)
+                if not runnable:
+                    continue
+
+                logger.info("Loading %s/%s", engine.value, model_type.value)
+                with Stopwatch() as load:
+                    await service.prepare_model(model_type, engine=engine)
+
+                for speed, action, recording, attempt in itertools.product(
+                    speeds, runnable, recordings, range(1, repeat + 1)
+                ):
+                    _set_speed(model_type, speed)
+                    samples = audio[recording.audio]
+                    duration = len(samples) / SAMPLE_RATE
+
+                    with PeakMemory() as memory, Stopwatch() as elapsed:
+                        response = await service.transcribe_audio(
+                            np.copy(samples), model_type, action, engine=engine
+                        )
+
+                    reference = recording.references.get(action)
+                    wer = cer = None
+                    if reference:
+                        wer, cer = error_rates(reference, response.text)
+
+                    writer.writerow(
+                        {
+                            "run_id": run_id,
+                            "audio": str(recording.audio),
+                            "duration_s": round(duration, 3),
+                            "model": model_type.value,
+                            "action": action.value,
+                            "engine": engine.value,
+                            "speed": speed,
+                            "speed_applied": response.speed_factor,
+                            "vad_enabled": settings.vad_enabled,
+                            "inference_mode": settings.inference_mode,
+                            "repeat": attempt,
+                            "load_s": round(load.seconds, 3),
+                            "elapsed_s": round(elapsed.seconds, 3),
+                            "rtf": round(elapsed.seconds / duration, 4)
+                            if duration
+                            else None,
+                            "wer": wer,
+                            "cer": cer,
+                            "reference_words": len(reference.split())
+                            if reference
+                            else None,
+                            "reference_chars": len(reference) if reference else None,
+                            "peak_rss_mb": round(memory.peak_mb, 1),
+                            "hypothesis": response.text,
+                        }
+                    )
+                    results.flush()
+                    rows += 1
+                    logger.info(
+                        "%s %s/%s %s x%.2f: rtf=%.3f wer=%s",
+                        recording.audio.name,
+                        engine.value,
+                        model_type.value,
+                        action.value,
+                        speed,
+                        elapsed.seconds / duration if duration else 0.0,
+                        "-" if wer is None else f"{wer:.3f}",
+                    )
+
+                # Each model is measured alone, loaded from cold
+                await service._unload_model(service._model_key(model_type, engine))
+        finally:
+            settings.enable_speedup = original_speedup[0]
+            for model_type, speed in original_speedup[1].items():
+                setattr(settings, f"speed_{model_type.value}", speed)
+            service.shutdown()
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--manifest", type=Path, required=True)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results")
+        / f"{time.strftime('%Y%m%d-%H%M%S')}.csv",
+        help="CSV to append results to",
+    )
+    parser.add_argument(
+        "--models", default=",".join(model.value for model in ModelType)
+    )
+    parser.add_argument(
+        "--actions", default=",".join(action.value for action in ActionType)
+    )
+    parser.add_argument(
+        "--engines", default=",".join(engine.value for engine in EngineType)
+    )
+    parser.add_argument(
+        "--speeds", default="1.0", help="speedup factors, e.g. 1.0,1.25,1.5"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="runs of each recording per combination"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    rows = asyncio.run(
+        run_benchmark(
+            load_manifest(args.manifest),
+            _parse_list(args.models, ModelType),
+            _parse_list(args.actions, ActionType),
+            _installed_engines(_parse_list(args.engines, EngineType)),
+            _parse_list(args.speeds, float),
+            max(1, args.repeat),
+            args.output,
+        )
+    )
+    logger.info("Wrote %d result(s) to %s", rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ export const getStageLabel = (stage: string, action: string) => {
       return 'Preparando transcrição';
     case 'audio_received':
       return 'Áudio recebido';
+    case 'decoding_audio':
+      return 'Decodificando áudio';
     case 'loading_model':
       return 'Carregando modelo';
     case 'model_ready':
@@ -22,6 +22,7 @@ const RealTimeTranscription = () => {
   const segmentsRef = useRef<string[]>([]);
   const partialTextRef = useRef('');
   const activeModelRef = useRef<WhisperModel>('turbo');
+  const lastBackpressureRef = useRef(0);
 
   const { model, action } = useTranscriptionStore();
   const { entries, selectedId, addEntry, selectEntry } = useHistoryStore();
@@ -72,10 +73,6 @@ const RealTimeTranscription = () => {
       if (websocketRef.current) websocketRef.current.close();
       if (audioStreamRef.current)
         audioStreamRef.current.getTracks().forEach(t => t.stop());
-      if (mediaRecorderRef.current) {
-        const mr = mediaRecorderRef.current as MediaRecorder & { __sliceTimer?: ReturnType<typeof setTimeout> };
-        if (mr.__sliceTimer) clearInterval(mr.__sliceTimer);
-      }
     };
   }, []);
 
@@ -172,20 +169,27 @@ const RealTimeTranscription = () => {
               return;
             }
 
-            if (data.text) {
-              if (data.is_final_segment) {
-                updateSegments(prev => [...prev, data.text]);
-                updatePartialText('');
-              } else if (data.is_partial) {
-                updatePartialText(data.text);
-              } else {
-                updateSegments(prev => {
-                  const last = prev[prev.length - 1] || '';
-                  if (last.endsWith(data.text.trim())) return prev;
-                  return [...prev, data.text];
+            if (data.type === 'backpressure') {
+              // The server is dropping audio it could not transcribe in time
+              const now = Date.now();
+              if (now - lastBackpressureRef.current > 10000) {
+                lastBackpressureRef.current = now;
+                toast({
+                  title: 'Transcrição atrasada',
+                  description: `O servidor descartou ${data.dropped_seconds}s de áudio para acompanhar a gravação.`,
+                  variant: 'destructive',
                 });
-                updatePartialText('');
               }
+              return;
+            }
+
+            if (data.is_partial && !data.is_final_segment) {
+              // The hypothesis for audio not yet committed; replaces the last one
+              updatePartialText(data.text || '');
+            } else if (data.text) {
+              // Committed text is never sent twice
+              updateSegments(prev => [...prev, data.text]);
+              updatePartialText('');
             }
           } catch {
             // ignore parse errors
@@ -265,26 +269,10 @@ const RealTimeTranscription = () => {
       await connectWebSocket(resolvedModel);
       activeModelRef.current = resolvedModel;
 
-      mediaRecorder.start();
-
+      // One continuous recording sliced by timeslice: the backend keeps a
+      // streaming decoder per session, so chunks need no header of their own.
       const SLICE_MS = 3000;
-      let isSlicing = false;
-
-      const sliceTimer = setInterval(() => {
-        if (mediaRecorder.state === 'recording' && !isSlicing) {
-          isSlicing = true;
-          mediaRecorder.stop();
-        }
-      }, SLICE_MS);
-
-      mediaRecorder.onstop = () => {
-        if (mediaRecorderRef.current && isSlicing) {
-          mediaRecorder.start();
-          isSlicing = false;
-        }
-      };
-
-      (mediaRecorder as MediaRecorder & { __sliceTimer?: ReturnType<typeof setTimeout> }).__sliceTimer = sliceTimer;
+      mediaRecorder.start(SLICE_MS);
 
       setIsRecording(true);
       startTimer();
@@ -309,12 +297,6 @@ const RealTimeTranscription = () => {
   const stopRecording = async () => {
     if (!mediaRecorderRef.current || !isRecording) return;
 
-    const mediaRecorder = mediaRecorderRef.current as MediaRecorder & { __sliceTimer?: ReturnType<typeof setTimeout> };
-    if (mediaRecorder.__sliceTimer) {
-      clearInterval(mediaRecorder.__sliceTimer);
-      mediaRecorder.__sliceTimer = undefined;
-    }
-
     mediaRecorderRef.current.requestData();
     mediaRecorderRef.current.stop();
     setIsRecording(false);
@@ -8,7 +8,7 @@ import { Textarea } from '@/components/ui/textarea';
 import { Progress } from '@/components/ui/progress';
 import { Upload, FileAudio, X, Loader2, Copy, Download, Trash2 } from 'lucide-react';
 import { toast } from '@/hooks/use-toast';
-import { ApiService } from '@/services/api';
+import { ApiService, TranscriptionJobStatus, TranscriptionSegment } from '@/services/api';
 import { isFfmpegMissingError } from '@/lib/transcriptionErrors';
 import { getStageLabel } from '@/lib/transcriptionProgress';
 
@@ -23,6 +23,8 @@ const UploadTranscription = () => {
   const [transcriptionResult, setTranscriptionResult] = useState('');
   const [ffmpegNotice, setFfmpegNotice] = useState<string | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  const segmentsRef = useRef<string[]>([]);
+  const jobIdRef = useRef<string | null>(null);
 
   const { model, action } = useTranscriptionStore();
   const { entries, selectedId, addEntry } = useHistoryStore();
@@ -110,29 +112,63 @@ const UploadTranscription = () => {
     if (fileInputRef.current) fileInputRef.current.value = '';
   };
 
-  const pollTranscriptionJob = async (jobId: string) => {
-    while (true) {
-      const status = await ApiService.getTranscriptionJobStatus(jobId);
+  const isFinished = (status: TranscriptionJobStatus) =>
+    status.status === 'completed' || status.status === 'failed' || status.status === 'cancelled';
 
-      setProgress(status.progress);
-      setStageLabel(getStageLabel(status.stage, status.action));
+  const applyJobStatus = (status: TranscriptionJobStatus) => {
+    setProgress(status.progress);
+    const label = getStageLabel(status.stage, status.action);
+    setStageLabel(
+      status.queue_position != null ? `${label} (${status.queue_position + 1}º da fila)` : label,
+    );
+  };
 
-      if (status.status === 'completed') {
-        if (!status.text) {
-          throw new Error('A transcrição foi concluída sem conteúdo retornado.');
-        }
+  // Finished segments are shown while the rest of the file is transcribed
+  const applySegment = (segment: TranscriptionSegment & { index: number }) => {
+    segmentsRef.current[segment.index] = segment.text;
+    setTranscriptionResult(segmentsRef.current.filter(Boolean).join(' '));
+  };
 
-        return status;
-      }
+  const pollTranscriptionJob = async (jobId: string) => {
+    while (true) {
+      const offset = segmentsRef.current.length;
+      const status = await ApiService.getTranscriptionJobStatus(jobId, offset);
+      applyJobStatus(status);
+      status.segments.forEach((segment, i) => applySegment({ ...segment, index: offset + i }));
 
-      if (status.status === 'failed') {
-        throw new Error(status.error || 'Transcription failed');
+      if (isFinished(status)) {
+        return status;
       }
 
       await new Promise((resolve) => window.setTimeout(resolve, JOB_POLL_INTERVAL_MS));
     }
   };
 
+  const waitForTranscriptionJob = async (jobId: string) => {
+    // Updates are pushed over SSE; polling is only a fallback for a dropped stream
+    segmentsRef.current = [];
+    let status = await ApiService.streamTranscriptionJob(jobId, applyJobStatus, applySegment).catch(
+      () => null,
+    );
+    if (!status || !isFinished(status)) {
+      status = await pollTranscriptionJob(jobId);
+    }
+
+    if (status.status === 'failed') {
+      throw new Error(status.error || 'Transcription failed');
+    }
+
+    if (status.status === 'cancelled') {
+      throw new Error('A transcrição foi cancelada.');
+    }
+
+    if (!status.text) {
+      throw new Error('A transcrição foi concluída sem conteúdo retornado.');
+    }
+
+    return status;
+  };
+
   const transcribeFile = async () => {
     if (!selectedFile) return;
 
@@ -147,10 +183,11 @@ const UploadTranscription = () => {
         model,
         action,
       });
+      jobIdRef.current = job.job_id;
       setProgress(job.progress);
       setStageLabel(getStageLabel(job.status, action));
 
-      const response = await pollTranscriptionJob(job.job_id);
+      const response = await waitForTranscriptionJob(job.job_id);
 
       setProgress(100);
       setStageLabel(getStageLabel('completed', response.action));
@@ -179,11 +216,18 @@ const UploadTranscription = () => {
         variant: 'destructive',
       });
     } finally {
+      jobIdRef.current = null;
       setIsLoading(false);
       setStageLabel('');
     }
   };
 
+  // The server stops decoding; the pending wait then ends as cancelled
+  const cancelTranscription = async () => {
+    if (!jobIdRef.current) return;
+    await ApiService.cancelTranscriptionJob(jobIdRef.current).catch(() => undefined);
+  };
+
   const processingTitle =
     action === 'translate_english' ? 'Traduzindo áudio' : 'Transcrevendo áudio';
   const submitLabel =
@@ -292,6 +336,9 @@ const UploadTranscription = () => {
             stageLabel={stageLabel}
           />
           <Progress value={progress} className="h-1" />
+          <Button variant="ghost" size="sm" onClick={cancelTranscription} className="h-7 px-2 text-xs">
+            Cancelar
+          </Button>
         </div>
       )}
 
@@ -34,6 +34,19 @@ function wsUrl(path: string): string {
   return APP_SECRET ? `${base}?secret=${encodeURIComponent(APP_SECRET)}` : base;
 }
 
+/** Splits a Server-Sent Events message into its event name and data. */
+function parseSseMessage(message: string): { event: string; data: string } | null {
+  let event = 'message';
+  const data: string[] = [];
+
+  for (const line of message.split('\n')) {
+    if (line.startsWith('event:')) event = line.slice(6).trim();
+    else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+  }
+
+  return data.length ? { event, data: data.join('\n') } : null;
+}
+
 export interface TranscriptionResponse {
   model: string;
   action: string;
@@ -46,15 +59,27 @@ export interface TranscriptionJobAccepted {
   progress: number;
 }
 
+export interface TranscriptionSegment {
+  start: number;
+  end: number;
+  text: string;
+}
+
 export interface TranscriptionJobStatus {
   job_id: string;
-  status: 'queued' | 'processing' | 'completed' | 'failed';
+  status: 'queued' | 'processing' | 'completed' | 'failed' | 'cancelled';
   progress: number;
   stage: string;
   model: string;
   action: string;
   text?: string | null;
   error?: string | null;
+  speed_factor?: number | null;
+  timings?: Record<string, number> | null;
+  segments: TranscriptionSegment[];
+  segment_count: number;
+  priority?: 'interactive' | 'batch' | null;
+  queue_position?: number | null;
 }
 
 export interface ModelAvailabilityResponse {
@@ -110,8 +135,10 @@ export class ApiService {
     return response.json();
   }
 
-  static async getTranscriptionJobStatus(jobId: string): Promise<TranscriptionJobStatus> {
-    const response = await fetch(`${API_BASE_URL}/api/v1/transcribe/upload/status/${jobId}`, {
+  /** Cancels a queued or running job; a running one stops at its next segment. */
+  static async cancelTranscriptionJob(jobId: string): Promise<TranscriptionJobStatus> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/transcribe/upload/${jobId}`, {
+      method: 'DELETE',
       headers: secretHeaders(),
     });
 
@@ -123,6 +150,73 @@ export class ApiService {
     return response.json();
   }
 
+  /** Pass `segmentsFrom` (the previous `segment_count`) to also receive the
+   *  segments transcribed since. */
+  static async getTranscriptionJobStatus(
+    jobId: string,
+    segmentsFrom?: number,
+  ): Promise<TranscriptionJobStatus> {
+    const query = segmentsFrom === undefined ? '' : `?segments_from=${segmentsFrom}`;
+    const response = await fetch(`${API_BASE_URL}/api/v1/transcribe/upload/status/${jobId}${query}`, {
+      headers: secretHeaders(),
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }));
+      throw new Error(errorData.detail || `HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    return response.json();
+  }
+
+  /** Follows a transcription job through its Server-Sent Events stream.
+   *  Uses fetch rather than EventSource so the desktop secret header is sent.
+   *  Resolves with the last status received when the server closes the stream. */
+  static async streamTranscriptionJob(
+    jobId: string,
+    onStatus: (status: TranscriptionJobStatus) => void,
+    onSegment?: (segment: TranscriptionSegment & { index: number }) => void,
+  ): Promise<TranscriptionJobStatus> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/transcribe/upload/events/${jobId}`, {
+      headers: { Accept: 'text/event-stream', ...secretHeaders() },
+    });
+
+    if (!response.ok || !response.body) {
+      const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }));
+      throw new Error(errorData.detail || `HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    let lastStatus: TranscriptionJobStatus | null = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+
+      buffer += value;
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const message = parseSseMessage(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        if (message?.event === 'status') {
+          lastStatus = JSON.parse(message.data) as TranscriptionJobStatus;
+          onStatus(lastStatus);
+        } else if (message?.event === 'segment') {
+          onSegment?.(JSON.parse(message.data));
+        }
+      }
+    }
+
+    if (!lastStatus) {
+      throw new Error('Job event stream closed without a status');
+    }
+
+    return lastStatus;
+  }
+
   static async listModels(): Promise<ModelListResponse> {
     const response = await fetch(`${API_BASE_URL}/api/v1/models`, {
       headers: secretHeaders(),